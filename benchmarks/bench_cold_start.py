@@ -0,0 +1,86 @@
+'''
+Cold start of one uvicorn worker: import time of the app module, time until it answers,
+and first-request against steady-state latency per route, with and without the
+startup warm-up (TASKMASTER_WARMUP).
+
+    python -m benchmarks.bench_cold_start --runs 3
+'''
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROUTES = ("/", "/manage/version", "/manage/jobs", "/openapi.json")
+
+
+def import_seconds(module):
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         env={**os.environ, "TASKMASTER_RATE_LIMIT": "0"})
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get_ms(url):
+    start = time.perf_counter()
+    requests.get(url, timeout=30).raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def cold_start(app, warmup):
+    port = _free_port()
+    env = {**os.environ, "TASKMASTER_WARMUP": "1" if warmup else "0", "TASKMASTER_RATE_LIMIT": "0"}
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+                            env=env)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.05).close()
+                break
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.01)
+        result = {"ready_ms": round((time.perf_counter() - started) * 1000, 1)}
+        for route in ROUTES:
+            first = _get_ms(base + route)
+            steady = statistics.median(_get_ms(base + route) for _ in range(20))
+            result[route] = {"first_ms": round(first, 2), "steady_ms": round(steady, 2)}
+        return result
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="src.server:app")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    module = args.app.split(":")[0]
+    report = {"import_s": round(statistics.median(import_seconds(module) for _ in range(args.runs)), 3)}
+    for warmup in (False, True):
+        runs = [cold_start(args.app, warmup) for _ in range(args.runs)]
+        summary = {"ready_ms": statistics.median(r["ready_ms"] for r in runs)}
+        for route in ROUTES:
+            summary[route] = {k: statistics.median(r[route][k] for r in runs) for k in ("first_ms", "steady_ms")}
+        report["warmup" if warmup else "no_warmup"] = summary
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
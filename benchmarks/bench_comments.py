@@ -0,0 +1,97 @@
+'''
+Comment thread latency on one very busy task: the first page, "load older" deep into
+the thread (keyset) against the same page fetched with OFFSET, and the old
+fetch-everything query.
+
+    python -m benchmarks.bench_comments --comments 100000 --limit 50
+'''
+import argparse
+import json
+import statistics
+import time
+
+from src.db import threads
+from src.db.swen610_db_utils import connect, exec_get_all
+
+SQL_OFFSET_PAGE = """
+    SELECT c.id AS comment_id, m.username AS author, c.message AS content, c.created_on AS timestamp
+    FROM dev.task_comments c LEFT JOIN dev.member m ON m.id = c.author_id
+    WHERE c.task_id = %(task_id)s
+    ORDER BY c.created_on DESC, c.id DESC
+    OFFSET %(offset)s LIMIT %(limit)s;
+"""
+
+SQL_ALL = """
+    SELECT c.id, m.username, c.message, c.created_on
+    FROM dev.task_comments c LEFT JOIN dev.member m ON m.id = c.author_id
+    WHERE c.task_id = %(task_id)s ORDER BY c.created_on;
+"""
+
+
+def setup(comments):
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("INSERT INTO dev.task (board_id, workspace_id, title) "
+                "SELECT id, workspace_id, 'bench_comments' FROM dev.board ORDER BY id LIMIT 1 RETURNING id;")
+    task_id = cur.fetchone()[0]
+    cur.execute("""INSERT INTO dev.task_comments (task_id, author_id, message, created_on)
+                   SELECT %s, (SELECT MIN(id) FROM dev.member), repeat('comment ', 10) || n,
+                          TIMESTAMP '2030-01-01' + make_interval(secs => n)
+                   FROM generate_series(1, %s) n;""", (task_id, comments))
+    cur.execute("ANALYZE dev.task_comments;")
+    conn.commit()
+    conn.close()
+    return task_id
+
+
+def teardown(task_id):
+    conn = connect()
+    conn.cursor().execute("DELETE FROM dev.task WHERE id = %s;", (task_id,))
+    conn.commit()
+    conn.close()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    task_id = setup(args.comments)
+    try:
+        # Walk "load older" to the middle of the thread to get a deep cursor
+        depth = args.comments // 2
+        page = threads.comments_page(task_id, limit=args.limit)
+        cursor, walked = page["older"], args.limit
+        while walked < depth:
+            page = threads.comments_page(task_id, before=cursor, limit=1000)
+            cursor, walked = page["older"], walked + 1000
+
+        results = {
+            "comments": args.comments,
+            "limit": args.limit,
+            "first_page_ms": timed(lambda: threads.comments_page(task_id, limit=args.limit), args.repeat),
+            "keyset_page_at_%d_ms" % walked: timed(
+                lambda: threads.comments_page(task_id, before=cursor, limit=args.limit), args.repeat),
+            "offset_page_at_%d_ms" % walked: timed(
+                lambda: exec_get_all(SQL_OFFSET_PAGE, {"task_id": task_id, "offset": walked, "limit": args.limit}),
+                args.repeat),
+            "fetch_all_ms": timed(lambda: exec_get_all(SQL_ALL, {"task_id": task_id}), max(1, args.repeat // 5)),
+        }
+    finally:
+        teardown(task_id)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+'''
+Job queue throughput: enqueue N no-op jobs, drain them with W worker processes and
+report jobs/sec for each claim batch size.
+
+    python -m benchmarks.bench_jobs --jobs 5000 --workers 4 --batch-sizes 1,10
+'''
+import argparse
+import json
+import time
+from multiprocessing import Pool
+
+from src.db import jobs
+from src.db.swen610_db_utils import connect
+
+KIND = "bench_noop"
+
+
+@jobs.handler(KIND)
+def noop(payload, job):
+    pass
+
+
+def fill(n):
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM dev.job WHERE kind = %s;", (KIND,))
+    cur.execute("INSERT INTO dev.job (kind, payload) SELECT %s, jsonb_build_object('n', n) "
+                "FROM generate_series(1, %s) n;", (KIND, n))
+    conn.commit()
+    conn.close()
+
+
+def drain(batch_size):
+    return jobs.Worker(kinds=[KIND], batch_size=batch_size).run(idle_exit=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-sizes", default="1,10")
+    args = parser.parse_args()
+
+    results = []
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        fill(args.jobs)
+        with Pool(args.workers) as pool:
+            start = time.perf_counter()
+            done = sum(pool.map(drain, [batch_size] * args.workers))
+            elapsed = time.perf_counter() - start
+        results.append({"workers": args.workers, "batch_size": batch_size, "jobs": done,
+                        "seconds": round(elapsed, 2), "jobs_per_s": round(done / elapsed, 1)})
+    fill(0)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+'''
+Overhead of the metrics layer: raw histogram/counter cost and a full pass through
+MetricsMiddleware around a no-op ASGI app.
+
+    python -m benchmarks.bench_metrics --iterations 100000
+'''
+import argparse
+import asyncio
+import json
+import time
+
+from src.api.middleware import MetricsMiddleware
+from utils import metrics
+
+SQL = "SELECT id, title FROM dev.task WHERE board_id = %(board_id)s AND id = %(task_id)s;"
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def drive(app, n):
+    scope = {"type": "http", "method": "GET", "path": "/w/1/b/1/t"}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def per_call_us(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    bare = asyncio.run(drive(noop_app, n))
+    wrapped = asyncio.run(drive(MetricsMiddleware(noop_app), n))
+    print(json.dumps({
+        "histogram_observe_us": round(per_call_us(lambda: metrics.HTTP_LATENCY.observe(0.01, "GET", "/x"), n), 3),
+        "counter_inc_us": round(per_call_us(lambda: metrics.HTTP_REQUESTS.inc("GET", "/x", "200"), n), 3),
+        "observe_query_us": round(per_call_us(lambda: metrics.observe_query(SQL, 0.002, 1), n), 3),
+        "middleware_overhead_us": round((wrapped - bare) * 1e6 / n, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
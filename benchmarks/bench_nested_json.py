@@ -0,0 +1,77 @@
+'''
+"My boards" payload: joined rows grouped in Python vs. a document built by Postgres.
+
+Reports the bytes coming back from the DB (text-protocol size of the returned values)
+and the API-side CPU time per call. Needs the database from config/db.yml.
+
+    python -m benchmarks.bench_nested_json --member 1 --repeat 200
+'''
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.api.responses import RawJSONResponse
+from src.db import documents
+from src.db.swen610_db_utils import exec_get_all
+from src.models.board import BoardUsers
+from src.models.user import User
+
+SQL_MEMBER_BOARDS_ROWS = """
+    SELECT b.id, b.title, b.description, w.name,
+           m.id, m.username, m.first_name, m.last_name,
+           (SELECT COUNT(*) FROM dev.task t WHERE t.board_id = b.id) AS task_count
+    FROM dev.member_board mb
+    JOIN dev.board b ON b.id = mb.board_id
+    JOIN dev.workspace w ON w.id = b.workspace_id
+    JOIN dev.member_board mbu ON mbu.board_id = b.id
+    JOIN dev.member m ON m.id = mbu.member_id
+    WHERE mb.member_id = %(member_id)s
+    ORDER BY b.id, m.username;
+"""
+
+
+def rows_approach(member_id):
+    rows, _ = exec_get_all(SQL_MEMBER_BOARDS_ROWS, {"member_id": member_id})
+    wire = sum(len(str(v).encode()) for row in rows for v in row if v is not None)
+    boards = {}
+    for bid, title, desc, ws, mid, uname, first, last, count in rows:
+        board = boards.setdefault(bid, {"id": bid, "name": title, "description": desc,
+                                        "workspaceName": ws, "users": [], "taskCount": count})
+        board["users"].append(User(id=mid, username=uname, first_name=first, last_name=last))
+    body = JSONResponse(jsonable_encoder([BoardUsers(**b) for b in boards.values()])).body
+    return wire, body
+
+
+def document_approach(member_id):
+    doc = documents.member_boards_json(member_id)
+    return len(doc), RawJSONResponse(doc).body
+
+
+def measure(fn, member_id, repeat):
+    fn(member_id)
+    wall = cpu = 0.0
+    for _ in range(repeat):
+        w0, c0 = time.perf_counter(), time.process_time()
+        wire, body = fn(member_id)
+        wall += time.perf_counter() - w0
+        cpu += time.process_time() - c0
+    return {"db_bytes": wire, "response_bytes": len(body),
+            "api_cpu_ms": round(cpu * 1000 / repeat, 3), "wall_ms": round(wall * 1000 / repeat, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--member", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps({
+        "rows": measure(rows_approach, args.member, args.repeat),
+        "postgres_json": measure(document_approach, args.member, args.repeat),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+'''
+Registered hot queries run as plain SQL text against PREPARE/EXECUTE on the same
+connection: session validation, task by id, nested path validation and the member
+permission snapshot.
+
+    python -m benchmarks.bench_prepared --repeat 2000
+'''
+import argparse
+import json
+import statistics
+import time
+
+import psycopg2
+
+from src.db import fieldsets, hierarchy, permissions, sessions, statements
+from src.db.swen610_db_utils import _connect_args, connect
+
+
+def setup():
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("SELECT b.workspace_id, b.id, (SELECT MIN(id) FROM dev.member) FROM dev.board b ORDER BY b.id LIMIT 1;")
+    workspace_id, board_id, member_id = cur.fetchone()
+    cur.execute("INSERT INTO dev.task (board_id, workspace_id, title, created_by, assigned_to, priority, status_id) "
+                "VALUES (%s, %s, 'bench_prepared', %s, %s, 1, 1) RETURNING id;",
+                (board_id, workspace_id, member_id, member_id))
+    task_id = cur.fetchone()[0]
+    cur.execute("INSERT INTO dev.auth_sessions (member_id, token, expires_at) "
+                "VALUES (%s, 'bench_prepared', now() + interval '1 hour');", (member_id,))
+    conn.commit()
+    conn.close()
+    return {"workspace_id": workspace_id, "board_id": board_id, "task_id": task_id, "member_id": member_id}
+
+
+def teardown(ids):
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM dev.task WHERE id = %s;", (ids["task_id"],))
+    cur.execute("DELETE FROM dev.auth_sessions WHERE token = 'bench_prepared';")
+    conn.commit()
+    conn.close()
+
+
+def median_us(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return round(statistics.median(samples), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    ids = setup()
+    cases = {
+        "session_member": (sessions.SESSION_MEMBER, {"token": "bench_prepared"}),
+        "task_by_id": (fieldsets.TASK_BY_ID, ids),
+        "resolve_path": (hierarchy.RESOLVE_PATH, {**ids, "comment_id": None}),
+        "member_snapshot": (permissions.MEMBER_SNAPSHOT, ids),
+    }
+    conn = psycopg2.connect(**_connect_args(), connection_factory=statements.PreparingConnection)
+    conn.autocommit = True
+    cur = conn.cursor()
+    results = {}
+    try:
+        for name, (statement, params) in cases.items():
+            def text():
+                cur.execute(statement.sql, params)
+                cur.fetchall()
+
+            def prepared():
+                statements.execute(cur, statement, params)
+                cur.fetchall()
+            # Warm both paths (and let Postgres settle on its plan choice) before timing
+            for _ in range(10):
+                text()
+                prepared()
+            text_us, prepared_us = median_us(text, args.repeat), median_us(prepared, args.repeat)
+            results[name] = {"text_us": text_us, "prepared_us": prepared_us,
+                             "saved_pct": round(100 * (1 - prepared_us / text_us), 1)}
+        plans = statements.stats(cur)
+        for name in cases:
+            results[name]["plans"] = plans[name].get("plans")
+    finally:
+        conn.close()
+        teardown(ids)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+'''
+CPU time to serialize a 10k-task list response: Pydantic + default encoder vs. the fast path.
+
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 20
+'''
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from src.api.responses import rows_response
+
+TASK_COLUMNS = ["id", "board_id", "workspace_id", "title", "description", "points",
+                "priority", "status", "created_by", "created_on", "assigned_to", "due_date"]
+
+
+class TaskRow(BaseModel):
+    id: int
+    board_id: int
+    workspace_id: int
+    title: str
+    description: str
+    points: Optional[int]
+    priority: str
+    status: str
+    created_by: int
+    created_on: datetime
+    assigned_to: Optional[int]
+    due_date: date
+
+
+def make_rows(n):
+    base = datetime(2025, 1, 1)
+    return [
+        (i, i % 50 + 1, 1, f"Task {i}", "Generated for the serialization benchmark", i % 13,
+         "high", "To Do", 1, base + timedelta(minutes=i), i % 7 + 1, date(2030, 1, 1))
+        for i in range(n)
+    ]
+
+
+def current_path(rows, columns):
+    dicts = [dict(zip(columns, r)) for r in rows]
+    models = [TaskRow(**d) for d in dicts]
+    return JSONResponse(jsonable_encoder({"status": "success", "total": len(models), "tasks": models})).body
+
+
+def fast_path(rows, columns):
+    return rows_response(rows, columns, key="tasks", status="success", total=len(rows)).body
+
+
+def cpu_ms(fn, rows, repeat):
+    fn(rows, TASK_COLUMNS)  # warm-up
+    start = time.process_time()
+    for _ in range(repeat):
+        body = fn(rows, TASK_COLUMNS)
+    return (time.process_time() - start) * 1000 / repeat, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    before_ms, before_bytes = cpu_ms(current_path, rows, args.repeat)
+    after_ms, after_bytes = cpu_ms(fast_path, rows, args.repeat)
+    print(json.dumps({
+        "rows": args.rows,
+        "before": {"cpu_ms_per_response": round(before_ms, 2), "bytes": before_bytes},
+        "after": {"cpu_ms_per_response": round(after_ms, 2), "bytes": after_bytes},
+        "speedup": round(before_ms / after_ms, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
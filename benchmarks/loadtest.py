@@ -0,0 +1,227 @@
+'''
+Concurrent mixed-workload load test against a running API server.
+
+    python -m benchmarks.loadtest --seed                      # rebuild + generated data first
+    python -m benchmarks.loadtest --concurrency 32 --duration 60 --out bench_output.json
+    python -m benchmarks.loadtest --baseline main.json --out pr.json   # non-zero exit on regression
+
+Each virtual user logs in as a synthetic member (see src/db/datagen.py) and
+loops over a weighted mix of login, board open, task edit and comment post. The report
+is JSON: throughput plus p50/p95/p99 latency per endpoint.
+'''
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from src.db import datagen
+from src.db.swen610_db_utils import exec_get_all
+
+JSON_HDR = {"Content-Type": "application/json", "Accept": "application/json"}
+DEFAULT_MIX = "login=5,board_open=50,task_edit=25,comment_post=20"
+
+SQL_SAMPLE_TARGETS = """
+    SELECT m.username, b.workspace_id, b.id,
+           ARRAY(SELECT t.id FROM dev.task t WHERE t.board_id = b.id ORDER BY t.id LIMIT 20)
+    FROM dev.member m
+    JOIN dev.member_board mb ON mb.member_id = m.id
+    JOIN dev.board b ON b.id = mb.board_id
+    WHERE m.username LIKE 'gen\\_%%' AND b.deleted_at IS NULL
+    ORDER BY md5(m.username || b.id::text)
+    LIMIT %(limit)s;
+"""
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, ms, ok):
+        with self._lock:
+            self.samples[endpoint].append(ms)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        total = 0
+        for endpoint, values in sorted(self.samples.items()):
+            values.sort()
+            total += len(values)
+            endpoints[endpoint] = {
+                "count": len(values),
+                "errors": self.errors[endpoint],
+                "rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+            }
+        return {"elapsed_s": round(elapsed, 2), "total_requests": total,
+                "rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+class VirtualUser:
+    def __init__(self, base, target, lookups, recorder, rng):
+        self.base = base
+        self.username, self.workspace_id, self.board_id, self.task_ids = target
+        self.status, self.priority = lookups
+        self.recorder = recorder
+        self.rng = rng
+        self.http = requests.Session()
+        self.http.headers.update(JSON_HDR)
+
+    def call(self, endpoint, method, path, body=None):
+        start = time.perf_counter()
+        try:
+            res = self.http.request(method, self.base + path, data=json.dumps(body) if body else None)
+            ok = res.status_code < 400
+        except requests.RequestException:
+            res, ok = None, False
+        self.recorder.add(endpoint, (time.perf_counter() - start) * 1000, ok)
+        return res
+
+    def login(self):
+        res = self.call("POST /login", "POST", "/login", {"username": self.username, "password": datagen.GEN_PASSWORD})
+        if res is not None and res.ok:
+            self.http.headers["Authorization"] = f"Bearer {res.json()['session_key']}"
+
+    def board_open(self):
+        w, b = self.workspace_id, self.board_id
+        self.call("GET /w/{w}/b/{b}", "GET", f"/w/{w}/b/{b}")
+        self.call("GET /w/{w}/b/{b}/t", "GET", f"/w/{w}/b/{b}/t")
+
+    def task_edit(self):
+        if not self.task_ids:
+            return
+        w, b, t = self.workspace_id, self.board_id, self.rng.choice(self.task_ids)
+        self.call("PUT /w/{w}/b/{b}/t/{t}/update", "PUT", f"/w/{w}/b/{b}/t/{t}/update", {
+            "title": f"Edited by {self.username}",
+            "description": "Load test edit",
+            "points": self.rng.randint(0, 13),
+            "status": self.status,
+            "priority": self.priority,
+            "assignee": self.username,
+            "dueDate": "2030-01-01",
+        })
+
+    def comment_post(self):
+        if not self.task_ids:
+            return
+        w, b, t = self.workspace_id, self.board_id, self.rng.choice(self.task_ids)
+        self.call("POST /w/{w}/b/{b}/t/{t}/comments", "POST", f"/w/{w}/b/{b}/t/{t}/comments",
+                  {"content": f"Load test comment {self.rng.random():.6f}"})
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, weight = part.split("=")
+        if name not in ("login", "board_open", "task_edit", "comment_post"):
+            raise ValueError(f"Unknown operation in mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def lookup_values(base):
+    statuses = requests.get(f"{base}/w/t/status", headers=JSON_HDR).json().get("statuses") or []
+    priorities = requests.get(f"{base}/w/t/priorities", headers=JSON_HDR).json().get("task_priorities") or []
+    return statuses[0]["name"], priorities[0]["level"]
+
+
+def run(base, concurrency, duration, warmup, mix, seed_value, users):
+    rng = random.Random(seed_value)
+    worker_seeds = [rng.random() for _ in range(concurrency)]
+    targets, _ = exec_get_all(SQL_SAMPLE_TARGETS, {"limit": users})
+    if not targets:
+        raise SystemExit("No synthetic members found; run with --seed first")
+    lookups = lookup_values(base)
+    ops, weights = zip(*mix.items())
+
+    recorder = Recorder()
+    stop_at = time.monotonic() + warmup + duration
+    measure_from = time.monotonic() + warmup
+    warm = Recorder()
+
+    def worker(i):
+        user = VirtualUser(base, targets[i % len(targets)], lookups, warm, random.Random(worker_seeds[i]))
+        user.login()
+        while time.monotonic() < stop_at:
+            if user.recorder is warm and time.monotonic() >= measure_from:
+                user.recorder = recorder
+            getattr(user, user.rng.choices(ops, weights)[0])()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder.report(duration)
+
+
+def compare(report, baseline, tolerance):
+    '''Returns a list of regressions (p95 up or throughput down by more than tolerance)'''
+    regressions = []
+    for endpoint, cur in report["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(endpoint)
+        if not base:
+            continue
+        if cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {base['p95_ms']} -> {cur['p95_ms']} ms")
+    if report["rps"] < baseline["rps"] * (1 - tolerance):
+        regressions.append(f"throughput {baseline['rps']} -> {report['rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="http://localhost:5001")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--users", type=int, default=500, help="distinct synthetic members to log in as")
+    parser.add_argument("--random-seed", type=int, default=610)
+    parser.add_argument("--seed", action="store_true", help="rebuild tables and load generated data first")
+    parser.add_argument("--preset", default="medium", choices=sorted(datagen.PRESETS), help="data volume for --seed")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.seed:
+        scale = datagen.Scale(**datagen.PRESETS[args.preset])
+        datagen.generate(scale, seed=args.random_seed, rebuild=True)
+
+    report = run(args.base, args.concurrency, args.duration, args.warmup, parse_mix(args.mix),
+                 args.random_seed, args.users)
+    report["config"] = {"concurrency": args.concurrency, "duration_s": args.duration, "mix": args.mix}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
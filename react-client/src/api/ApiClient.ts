@@ -1,8 +1,79 @@
+export interface GetOptions {
+  /** Serve a cached copy younger than this many ms without asking the server (default 0). */
+  maxAge?: number;
+  /** Resolve with a cached copy at once, however old, and refresh it in the background (not after a write). */
+  staleWhileRevalidate?: boolean;
+  /** Send together with the other batchable reads made in the same tick, as one POST /batch. */
+  batch?: boolean;
+}
+
+export interface ApiClientOptions {
+  /** Reuse in-flight GETs and cache responses (revalidated with the server's ETag). Default true. */
+  caching?: boolean;
+  /** Coalesce `batch: true` reads into POST /batch calls. Default true. */
+  batching?: boolean;
+  /** How long the first batchable read waits for others to join it, in ms. */
+  batchDelayMs?: number;
+}
+
+/** Options for lookup lists (statuses, priorities, categories): rarely change, read everywhere. */
+export const LOOKUP_READ: GetOptions = { maxAge: 5 * 60_000, staleWhileRevalidate: true, batch: true };
+
+/** Options for per-view reads: coalesced, and shared by the calls of one screen load. */
+export const VIEW_READ: GetOptions = { maxAge: 2_000, batch: true };
+
+// Matches BATCH_MAX_REQUESTS on the server
+const MAX_BATCH_SIZE = 20;
+// Cached GET responses kept; the least recently fetched go first
+const MAX_CACHE_ENTRIES = 500;
+
+interface CacheEntry {
+  data: unknown;
+  etag: string | null;
+  fetchedAt: number;
+}
+
+interface QueuedRead {
+  path: string;
+  key: string;
+  resolve: (data: unknown) => void;
+  reject: (error: unknown) => void;
+}
+
+interface BatchResponse {
+  id: string;
+  status: number;
+  etag: string | null;
+  body: unknown;
+}
+
+/** Request counters, e.g. for the request-count benchmark (bench.html). */
+export interface ApiClientStats {
+  fetches: number;
+  batchedReads: number;
+  deduplicated: number;
+  cacheHits: number;
+  notModified: number;
+}
+
 export class ApiClient {
   private baseUrl: string;
+  private caching: boolean;
+  private batching: boolean;
+  private batchDelayMs: number;
+
+  private cache = new Map<string, CacheEntry>();
+  private inFlight = new Map<string, Promise<unknown>>();
+  private queue: QueuedRead[] = [];
+  private batchTimer: ReturnType<typeof setTimeout> | null = null;
+
+  readonly stats: ApiClientStats = { fetches: 0, batchedReads: 0, deduplicated: 0, cacheHits: 0, notModified: 0 };
 
-  constructor(baseUrl?: string) {
+  constructor(baseUrl?: string, options: ApiClientOptions = {}) {
     this.baseUrl = baseUrl ?? import.meta.env.VITE_API_BASE ?? 'http://localhost:5001';
+    this.caching = options.caching ?? true;
+    this.batching = options.batching ?? true;
+    this.batchDelayMs = options.batchDelayMs ?? 5;
   }
 
   private buildUrl(path: string): string {
@@ -12,26 +83,178 @@ export class ApiClient {
     return `${this.baseUrl}${path.startsWith('/') ? path : `/${path}`}`;
   }
 
-  async get<T>(path: string): Promise<T> {
-    const res = await fetch(this.buildUrl(path), {
+  private toError(method: string, path: string, status: number, data: unknown): Error {
+    const message = (data as any)?.detail || (data as any)?.message || `${method} ${path} failed with ${status}`;
+    const error: any = new Error(message);
+    error.status = status;
+    return error;
+  }
+
+  private async fail(method: string, path: string, res: Response): Promise<never> {
+    let data: unknown;
+    try {
+      data = await res.json();
+    } catch {
+      // ignore parsing error
+    }
+    throw this.toError(method, path, res.status, data);
+  }
+
+  /** Forget cached GETs whose path starts with `prefix` (all of them without one). */
+  invalidate(prefix?: string): void {
+    for (const key of [...this.cache.keys()]) {
+      if (!prefix || key.startsWith(this.buildUrl(prefix))) {
+        this.cache.delete(key);
+      }
+    }
+  }
+
+  // After a write any cached read may be out of date: keep the copies (and their ETags)
+  // but make the next read of each ask the server, which answers 304 if it is unchanged
+  private markStale(): void {
+    for (const entry of this.cache.values()) {
+      entry.fetchedAt = 0;
+    }
+  }
+
+  async get<T>(path: string, options: GetOptions = {}): Promise<T> {
+    if (!this.caching) {
+      return this.fetchOne(path, this.buildUrl(path)) as Promise<T>;
+    }
+    const key = this.buildUrl(path);
+    const cached = this.cache.get(key);
+    if (cached && Date.now() - cached.fetchedAt < (options.maxAge ?? 0)) {
+      this.stats.cacheHits++;
+      return cached.data as T;
+    }
+    // Not for copies a write marked stale (fetchedAt 0): the caller is re-reading to see that write
+    if (cached && cached.fetchedAt !== 0 && options.staleWhileRevalidate) {
+      this.stats.cacheHits++;
+      this.load(path, key, options).catch(() => {
+        // the stale copy stays in place; the next read tries again
+      });
+      return cached.data as T;
+    }
+    return this.load(path, key, options) as Promise<T>;
+  }
+
+  // One request per URL at a time: concurrent callers share the pending promise
+  private load(path: string, key: string, options: GetOptions): Promise<unknown> {
+    const pending = this.inFlight.get(key);
+    if (pending) {
+      this.stats.deduplicated++;
+      return pending;
+    }
+    const batchable = this.batching && options.batch && path.startsWith('/');
+    const request = (batchable ? this.enqueue(path, key) : this.fetchOne(path, key)).finally(() => {
+      this.inFlight.delete(key);
+    });
+    this.inFlight.set(key, request);
+    return request;
+  }
+
+  private async fetchOne(path: string, key: string): Promise<unknown> {
+    const cached = this.caching ? this.cache.get(key) : undefined;
+    this.stats.fetches++;
+    const res = await fetch(key, {
       method: 'GET',
       credentials: 'include',
+      cache: 'no-store',
+      headers: cached?.etag ? { 'If-None-Match': cached.etag } : undefined,
     });
 
+    if (res.status === 304 && cached) {
+      return this.settle(key, 304, cached.etag, undefined);
+    }
     if (!res.ok) {
-      let message = `GET ${path} failed with ${res.status}`;
-      try {
-        const data = await res.json();
-        message = (data as any)?.detail || (data as any)?.message || message;
-      } catch {
-        // ignore parsing error
+      return this.fail('GET', path, res);
+    }
+    return this.settle(key, res.status, res.headers.get('ETag'), await res.json());
+  }
+
+  private settle(key: string, status: number, etag: string | null, body: unknown): unknown {
+    const cached = this.cache.get(key);
+    if (status === 304 && cached) {
+      this.stats.notModified++;
+      cached.fetchedAt = Date.now();
+      return cached.data;
+    }
+    if (this.caching) {
+      this.cache.delete(key);
+      this.cache.set(key, { data: body, etag, fetchedAt: Date.now() });
+      if (this.cache.size > MAX_CACHE_ENTRIES) {
+        this.cache.delete(this.cache.keys().next().value!);
       }
-      const error: any = new Error(message);
-      error.status = res.status;
-      throw error;
     }
+    return body;
+  }
 
-    return res.json() as Promise<T>;
+  private enqueue(path: string, key: string): Promise<unknown> {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ path, key, resolve, reject });
+      if (this.queue.length >= MAX_BATCH_SIZE) {
+        void this.flush();
+      } else if (this.batchTimer === null) {
+        this.batchTimer = setTimeout(() => void this.flush(), this.batchDelayMs);
+      }
+    });
+  }
+
+  private async flush(): Promise<void> {
+    if (this.batchTimer !== null) {
+      clearTimeout(this.batchTimer);
+      this.batchTimer = null;
+    }
+    const reads = this.queue.splice(0, MAX_BATCH_SIZE);
+    if (this.queue.length > 0) {
+      this.batchTimer = setTimeout(() => void this.flush(), 0);
+    }
+    if (reads.length === 0) {
+      return;
+    }
+    if (reads.length === 1) {
+      const [read] = reads;
+      this.fetchOne(read.path, read.key).then(read.resolve, read.reject);
+      return;
+    }
+
+    let responses: BatchResponse[];
+    try {
+      this.stats.fetches++;
+      const res = await fetch(this.buildUrl('/batch'), {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          requests: reads.map((read, i) => ({ id: String(i), path: read.path, etag: this.cache.get(read.key)?.etag ?? null })),
+        }),
+      });
+      if (res.status === 404 || res.status === 405) {
+        // Server without /batch: send the reads one by one
+        this.batching = false;
+        reads.forEach((read) => this.fetchOne(read.path, read.key).then(read.resolve, read.reject));
+        return;
+      }
+      if (!res.ok) {
+        await this.fail('POST', '/batch', res);
+      }
+      responses = ((await res.json()) as { responses: BatchResponse[] }).responses;
+    } catch (err) {
+      reads.forEach((read) => read.reject(err));
+      return;
+    }
+
+    this.stats.batchedReads += reads.length;
+    for (const response of responses) {
+      const read = reads[Number(response.id)];
+      if (response.status === 200 || (response.status === 304 && this.cache.has(read.key))) {
+        read.resolve(this.settle(read.key, response.status, response.etag, response.body));
+      } else {
+        read.reject(this.toError('GET', read.path, response.status, response.body));
+      }
+    }
   }
 
   async post<T, B = unknown>(path: string, body?: B): Promise<T> {
@@ -45,17 +268,9 @@ export class ApiClient {
     });
 
     if (!res.ok) {
-      let errMsg = `POST ${path} failed with ${res.status}`;
-      try {
-        const data = await res.json();
-        errMsg = (data as any)?.detail || (data as any)?.message || errMsg;
-      } catch {
-        // ignore
-      }
-      const error: any = new Error(errMsg);
-      error.status = res.status;
-      throw error;
+      return this.fail('POST', path, res);
     }
+    this.markStale();
 
     return res.json() as Promise<T>;
   }
@@ -71,17 +286,9 @@ export class ApiClient {
     });
 
     if (!res.ok) {
-      let message = `PUT ${path} failed with ${res.status}`;
-      try {
-        const data = await res.json();
-        message = (data as any)?.detail || (data as any)?.message || message;
-      } catch {
-        // ignore
-      }
-      const error: any = new Error(message);
-      error.status = res.status;
-      throw error;
+      return this.fail('PUT', path, res);
     }
+    this.markStale();
 
     return res.json() as Promise<T>;
   }
@@ -93,17 +300,9 @@ export class ApiClient {
     });
 
     if (!res.ok) {
-      let message = `DELETE ${path} failed with ${res.status}`;
-      try {
-        const data = await res.json();
-        message = (data as any)?.detail || (data as any)?.message || message;
-      } catch {
-        // ignore
-      }
-      const error: any = new Error(message);
-      error.status = res.status;
-      throw error;
+      return this.fail('DELETE', path, res);
     }
+    this.markStale();
 
     try {
       return (await res.json()) as T;
@@ -123,17 +322,9 @@ export class ApiClient {
     });
 
     if (!res.ok) {
-      let message = `PATCH ${path} failed with ${res.status}`;
-      try {
-        const data = await res.json();
-        message = (data as any)?.detail || (data as any)?.message || message;
-      } catch {
-        // ignore
-      }
-      const error: any = new Error(message);
-      error.status = res.status;
-      throw error;
+      return this.fail('PATCH', path, res);
     }
+    this.markStale();
 
     return res.json() as Promise<T>;
   }
@@ -0,0 +1,60 @@
+// Requests made by one board open (the reads of BoardViewWithCRUD's load), with a fresh
+// fetch per call versus in-flight dedupe + ETag cache + /batch. Log in first, then open
+// /bench.html?ws=1&board=1&member=1 on the dev server.
+import { ApiClient, LOOKUP_READ, VIEW_READ } from '../api/ApiClient';
+import type { ApiClientStats, GetOptions } from '../api/ApiClient';
+
+const params = new URLSearchParams(window.location.search);
+const workspaceId = Number(params.get('ws') ?? 1);
+const boardId = Number(params.get('board') ?? 1);
+const memberId = Number(params.get('member') ?? 1);
+
+interface Row {
+  scenario: string;
+  requests: number;
+  notModified: number;
+  ms: number;
+}
+
+async function openBoard(client: ApiClient): Promise<void> {
+  const read = (path: string, options: GetOptions) => client.get(path, options).catch(() => undefined);
+  const board = `/w/${workspaceId}/b/${boardId}`;
+  await Promise.all([read(board, VIEW_READ), read('/w/t/priorities', LOOKUP_READ), read('/w/t/status', LOOKUP_READ)]);
+  await Promise.all([read(board, VIEW_READ), read('/c/all', LOOKUP_READ), read(`/w/${workspaceId}/m/${memberId}`, VIEW_READ)]);
+}
+
+async function measure(scenario: string, client: ApiClient): Promise<Row> {
+  const before: ApiClientStats = { ...client.stats };
+  const start = performance.now();
+  await openBoard(client);
+  return {
+    scenario,
+    requests: client.stats.fetches - before.fetches,
+    notModified: client.stats.notModified - before.notModified,
+    ms: Math.round(performance.now() - start),
+  };
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function run(): Promise<Row[]> {
+  const plain = new ApiClient(undefined, { caching: false, batching: false });
+  const client = new ApiClient();
+  const rows = [
+    await measure('fetch per call: first open', plain),
+    await measure('fetch per call: reopen', plain),
+    await measure('dedupe + cache + batch: first open', client),
+  ];
+  // Past VIEW_READ.maxAge: the board is revalidated, the lookups still come from the cache
+  await sleep((VIEW_READ.maxAge ?? 0) + 500);
+  rows.push(await measure('dedupe + cache + batch: reopen', client));
+  return rows;
+}
+
+run().then((rows) => {
+  const root = document.getElementById('root')!;
+  root.innerHTML = `<table border="1" cellpadding="6">
+    <tr><th>scenario</th><th>HTTP requests</th><th>304 / unchanged</th><th>ms</th></tr>
+    ${rows.map((r) => `<tr><td>${r.scenario}</td><td>${r.requests}</td><td>${r.notModified}</td><td>${r.ms}</td></tr>`).join('')}
+  </table>`;
+});
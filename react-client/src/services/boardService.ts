@@ -1,4 +1,4 @@
-import { apiClient } from '../api/ApiClient';
+import { apiClient, VIEW_READ } from '../api/ApiClient';
 import type {
   AdminBoardAccessResponse,
   Board,
@@ -13,7 +13,7 @@ export const boardService = {
    * Fetch metadata + access info for a single board.
    */
   getBoard(workspaceId: number, boardId: number): Promise<BoardAccess> {
-    return apiClient.get<BoardAccessResponse>(`/w/${workspaceId}/b/${boardId}`).then(a => a.board);
+    return apiClient.get<BoardAccessResponse>(`/w/${workspaceId}/b/${boardId}`, VIEW_READ).then(a => a.board);
   },
 
   /**
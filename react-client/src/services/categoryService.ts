@@ -1,5 +1,5 @@
 // services/categoryService.ts
-import { apiClient } from '../api/ApiClient';
+import { apiClient, LOOKUP_READ } from '../api/ApiClient';
 import type { Category, CategoryResponse } from '../models/task';
 
 export const categoryService = {
@@ -7,7 +7,7 @@ export const categoryService = {
    * Get all task categories (To Do, In Progress, etc.).
    */
   getCategories(): Promise<Category[]> {
-    return apiClient.get<CategoryResponse>('/c/all').then((r) => r.categories);
+    return apiClient.get<CategoryResponse>('/c/all', LOOKUP_READ).then((r) => r.categories);
   },
 
   /**
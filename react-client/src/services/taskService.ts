@@ -1,4 +1,4 @@
-import { apiClient } from '../api/ApiClient';
+import { apiClient, LOOKUP_READ } from '../api/ApiClient';
 import type { BaseComment, Task, TaskDBModel, TaskDBResponse, TaskPriority, TaskPriorityResponse, TaskResponse } from '../models/task';
 import type { Status, StatusResponse } from '../models/task';
 
@@ -40,11 +40,11 @@ export const taskService = {
   },
 
   async getPriorities(): Promise<TaskPriority[]> {
-    return apiClient.get<TaskPriorityResponse>('/w/t/priorities').then((res) => res.task_priorities);
+    return apiClient.get<TaskPriorityResponse>('/w/t/priorities', LOOKUP_READ).then((res) => res.task_priorities);
   },
 
   async getStatuses(): Promise<Status[]> {
-    return apiClient.get<StatusResponse>("/w/t/status").then((res) => res.statuses);
+    return apiClient.get<StatusResponse>("/w/t/status", LOOKUP_READ).then((res) => res.statuses);
   },
 
   bulkAddTaskCategories(workspaceId: number, 
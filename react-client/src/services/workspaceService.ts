@@ -1,4 +1,4 @@
-import { apiClient } from '../api/ApiClient';
+import { apiClient, LOOKUP_READ, VIEW_READ } from '../api/ApiClient';
 import type { Category } from '../models/task';
 import type {
   Workspace,
@@ -22,7 +22,7 @@ export const workspaceService = {
   },
 
   getWorkspaceAccess(workspaceId: number, userId: number): Promise<WorkspaceAccess> {
-    return apiClient.get<WorkspaceAccess>(`/w/${workspaceId}/m/${userId}`);
+    return apiClient.get<WorkspaceAccess>(`/w/${workspaceId}/m/${userId}`, VIEW_READ);
   },
 
   getBoardAccess(): Promise<BoardAccess[]> {
@@ -30,7 +30,7 @@ export const workspaceService = {
   },
 
   getCategories(): Promise<Category[]> {
-    return apiClient.get<Category[]>('/c/');
+    return apiClient.get<Category[]>('/c/', LOOKUP_READ);
   },
 
   updateWorkspace(id: number, payload: Partial<Workspace>): Promise<Workspace> {
@@ -0,0 +1,36 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.hierarchy import valid_task
+from src.api.permissions import require_board
+from src.db import activity
+from utils.pagination import InvalidCursorError
+
+router = APIRouter(tags=["activity"])
+
+
+def _feed(board_id: int, task_id: Optional[int], after: Optional[str], limit: int) -> dict:
+    try:
+        page = activity.feed(board_id, task_id=task_id, after=after, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", **page}
+
+
+@router.get("/w/{workspace_id}/b/{board_id}/activity")
+def board_activity(workspace_id: int, board_id: int,
+                   after: Optional[str] = Query(None, description="`next` cursor of the previous page"),
+                   limit: int = Query(50, ge=1, le=200),
+                   perms=Depends(require_board())):
+    '''What happened on the board lately, newest first'''
+    return _feed(board_id, None, after, limit)
+
+
+@router.get("/w/{workspace_id}/b/{board_id}/t/{task_id}/activity")
+def task_activity(workspace_id: int, board_id: int, task_id: int,
+                  after: Optional[str] = Query(None, description="`next` cursor of the previous page"),
+                  limit: int = Query(50, ge=1, le=200),
+                  perms=Depends(require_board()), _=Depends(valid_task)):
+    '''One task's history, newest first'''
+    return _feed(board_id, task_id, after, limit)
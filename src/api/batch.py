@@ -0,0 +1,101 @@
+'''
+POST /batch: several GETs in one round trip.
+
+    {"requests": [{"id": "1", "path": "/w/t/status"}, {"id": "2", "path": "/w/1/b/2", "etag": "W/\"...\""}]}
+    -> {"status": "success", "responses": [{"id": "1", "status": 200, "etag": "W/\"...\"", "body": {...}}, ...]}
+
+Each read is dispatched to the router in-process, BATCH_MAX_CONCURRENCY at a time, with
+the caller's headers (so the same session and permission checks apply), and costs the
+caller a read token like a separate GET would. Sub-responses carry an ETag,
+and an item whose etag still matches comes back as 304 with no body. Sub-response bodies
+are spliced into the envelope as they are, without decoding them.
+'''
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from src.api.auth import require_auth
+from src.api.middleware import etag, etag_matches, route_label
+from src.api.responses import RawJSONResponse
+from src.models.batch import BatchItem, BatchRequest
+from utils import configs, metrics
+from utils.serialization import dumps
+
+logger = logging.getLogger("taskmaster.batch")
+
+router = APIRouter(tags=["batch"])
+
+# Request headers not passed on to the individual reads
+_DROPPED_HEADERS = (b"content-length", b"content-type", b"if-none-match", b"accept-encoding")
+
+
+async def _dispatch(request: Request, item: BatchItem) -> bytes:
+    url = urlsplit(item.path)
+    scope = {key: value for key, value in request.scope.items()
+             if key not in ("route", "endpoint", "path_params")}
+    scope.update({
+        "method": "GET",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [(k, v) for k, v in request.scope["headers"] if k not in _DROPPED_HEADERS],
+    })
+    status, headers, chunks = 500, {}, []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = {k.lower(): v for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+        body = b"".join(chunks)
+    except StarletteHTTPException as e:
+        # Raised by the router itself (no such path), outside any route's handlers
+        status, headers, body = e.status_code, {b"content-type": b"application/json"}, dumps({"detail": e.detail})
+    except Exception:
+        # One failing read must not cost the caller the others
+        logger.exception("batch read %s failed", item.path)
+        status, headers, body = 500, {b"content-type": b"application/json"}, b'{"detail":"Internal Server Error"}'
+    metrics.BATCH_SUBREQUESTS.inc(route_label(scope), str(status))
+
+    tag = etag(body) if status == 200 else None
+    if tag is not None and item.etag and etag_matches(item.etag, tag):
+        status, body = 304, b"null"
+    elif not headers.get(b"content-type", b"").startswith(b"application/json"):
+        body = dumps(body.decode(errors="replace"))
+    return b'{"id":%s,"status":%d,"etag":%s,"body":%s}' % (dumps(item.id), status, dumps(tag), body or b"null")
+
+
+@router.post("/batch")
+async def batch(payload: BatchRequest, request: Request, ctx: dict = Depends(require_auth)):
+    '''Run up to BATCH_MAX_REQUESTS GETs and return every response, in request order'''
+    if len(payload.requests) > configs.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {configs.BATCH_MAX_REQUESTS} requests per batch")
+    for item in payload.requests:
+        if not item.path.startswith("/") or urlsplit(item.path).path == "/batch":
+            raise HTTPException(status_code=400, detail=f"Invalid batch path: {item.path!r}")
+    # The rate limiter took one token for the POST itself
+    take = getattr(request.state, "rate_limit", None)
+    if take is not None and len(payload.requests) > 1:
+        allowed, wait = await take(len(payload.requests) - 1)
+        if not allowed:
+            raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(wait)})
+
+    # The reads bypass ConcurrencyLimitMiddleware, so one batch gets a few slots, not twenty
+    slots = asyncio.Semaphore(configs.BATCH_MAX_CONCURRENCY)
+
+    async def run(item: BatchItem) -> bytes:
+        async with slots:
+            return await _dispatch(request, item)
+    responses = await asyncio.gather(*(run(item) for item in payload.requests))
+    return RawJSONResponse(b'{"status":"success","responses":[%s]}' % b",".join(responses))
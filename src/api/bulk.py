@@ -0,0 +1,57 @@
+import io
+import tempfile
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.api.permissions import require_board
+from src.db import bulk
+from src.db.permissions import PermissionSnapshot
+
+router = APIRouter(tags=["bulk"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Request bodies up to this size stay in memory; larger uploads spill to a temp file
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _format(requested: Optional[str], content_type: str = "") -> str:
+    if requested is None:
+        return "csv" if "csv" in content_type else "ndjson"
+    if requested not in bulk.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(bulk.FORMATS)}")
+    return requested
+
+
+@router.post("/w/{workspace_id}/b/{board_id}/import")
+async def import_tasks(workspace_id: int, board_id: int, request: Request,
+                       format: Optional[str] = Query(None, description="ndjson (default) or csv"),
+                       snap: PermissionSnapshot = Depends(require_board("edit_board"))):
+    fmt = _format(format, request.headers.get("content-type", ""))
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        text = io.TextIOWrapper(body, encoding="utf-8-sig", newline="")
+        try:
+            result = await run_in_threadpool(bulk.import_tasks, workspace_id, board_id, snap.member_id, text, fmt)
+        except bulk.BulkImportError as e:
+            raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Body must be UTF-8")
+        finally:
+            text.detach()
+    return {"status": "success", **result}
+
+
+@router.get("/w/{workspace_id}/b/{board_id}/export")
+def export_tasks(workspace_id: int, board_id: int,
+                 format: Optional[str] = Query(None, description="ndjson (default) or csv"),
+                 snap: PermissionSnapshot = Depends(require_board())):
+    fmt = _format(format)
+    filename = f"board-{board_id}-tasks.{fmt}"
+    return StreamingResponse(bulk.export_tasks(workspace_id, board_id, fmt), media_type=MEDIA_TYPES[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
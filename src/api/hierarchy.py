@@ -0,0 +1,32 @@
+from fastapi import HTTPException
+
+from src.db import hierarchy
+
+
+def _check(workspace_id, board_id=None, task_id=None, comment_id=None):
+    failed = hierarchy.resolve(workspace_id, board_id, task_id, comment_id)
+    if failed is not None:
+        raise HTTPException(status_code=404, detail=hierarchy.NOT_FOUND_MSG[failed])
+
+
+# Dependencies for nested routes: one round trip validates the whole path and keeps the
+# per-level 404 messages. List them after the permission dependency so non-members
+# still get 403 first:
+#
+#     @router.get("/w/{workspace_id}/b/{board_id}/t/{task_id}/comments/{comment_id}")
+#     def get_comment(..., perms=Depends(require_board()), _=Depends(valid_comment)):
+
+def valid_workspace(workspace_id: int):
+    _check(workspace_id)
+
+
+def valid_board(workspace_id: int, board_id: int):
+    _check(workspace_id, board_id)
+
+
+def valid_task(workspace_id: int, board_id: int, task_id: int):
+    _check(workspace_id, board_id, task_id)
+
+
+def valid_comment(workspace_id: int, board_id: int, task_id: int, comment_id: int):
+    _check(workspace_id, board_id, task_id, comment_id)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+
+from src.db import jobs
+
+router = APIRouter(prefix="/manage/jobs", tags=["manage"])
+
+
+@router.get("")
+def job_queue_summary():
+    return {"status": "success", "queue": jobs.queue_summary()}
+
+
+@router.get("/{job_id}")
+def job_status(job_id: int):
+    job = jobs.job_status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "success", "job": job}
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from src.api.permissions import member_permissions
+from src.db import swen610_db_utils as db_utils
+from src.db.permissions import PermissionSnapshot
+from utils import configs
+
+router = APIRouter(prefix="/lookup", tags=["lookup"])
+
+# Both columns are uniquely indexed: a BitmapOr of two index probes
+SQL_WORKSPACE_BY_KEY = """
+    SELECT id, slug, short_id FROM dev.workspace
+    WHERE (slug = %(key)s OR short_id = %(key)s) AND deleted_at IS NULL
+    ORDER BY (slug = %(key)s) DESC
+    LIMIT 1;
+"""
+
+SQL_BOARD_BY_SHORT_ID = """
+    SELECT id, workspace_id, short_id FROM dev.board WHERE short_id = %(key)s AND deleted_at IS NULL;
+"""
+
+
+@router.get("/w/{key}")
+def workspace_by_slug_or_short_id(key: str, snap: PermissionSnapshot = Depends(member_permissions)):
+    row, _ = db_utils.exec_get_one(SQL_WORKSPACE_BY_KEY, {"key": key})
+    if row is None:
+        raise HTTPException(status_code=404, detail=configs.WORKSPACE_ERROR_404_MSG)
+    workspace_id, slug, short_id = row
+    if not snap.in_workspace(workspace_id):
+        raise HTTPException(status_code=403, detail="Not a member of this workspace")
+    return {"status": "success", "workspace_id": workspace_id, "slug": slug, "short_id": short_id}
+
+
+@router.get("/b/{short_id}")
+def board_by_short_id(short_id: str, snap: PermissionSnapshot = Depends(member_permissions)):
+    row, _ = db_utils.exec_get_one(SQL_BOARD_BY_SHORT_ID, {"key": short_id})
+    if row is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    board_id, workspace_id, short_id = row
+    if not snap.can(board_id):
+        raise HTTPException(status_code=403, detail="Not a member of this board")
+    return {"status": "success", "workspace_id": workspace_id, "board_id": board_id, "short_id": short_id}
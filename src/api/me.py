@@ -0,0 +1,48 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.auth import require_auth
+from src.api.params import keyset_page, sparse_fields
+from src.api.responses import rows_response
+from src.db import feeds, reminders
+from src.db.fieldsets import TASK_FIELDS
+from utils.pagination import Page, encode_cursor
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+
+@router.get("/tasks")
+def my_tasks(status: Optional[str] = Query(None, description="Comma-separated status names; 'none' for no status"),
+             overdue: bool = Query(False, description="Only tasks due before today"),
+             page: Page = Depends(keyset_page(2)),
+             fields=Depends(sparse_fields(TASK_FIELDS)),
+             ctx: dict = Depends(require_auth)):
+    '''Tasks assigned to the caller on every board they can see, soonest due first'''
+    statuses = [s for s in status.split(",") if s.strip()] if status else None
+    after = None
+    if page.after is not None:
+        try:
+            after = (date.fromisoformat(page.after[0]), int(page.after[1]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        rows, cols = feeds.member_tasks(ctx["member_id"], statuses, date.today() if overdue else None,
+                                        after, page.limit + 1, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = dict(zip(cols, rows[-1]))
+        next_cursor = encode_cursor(last["dueDate"], last["id"])
+    return rows_response(rows, cols, key="tasks", status="success", next=next_cursor)
+
+
+@router.get("/reminders")
+def my_reminders(limit: int = Query(50, ge=1, le=200), ctx: dict = Depends(require_auth)):
+    '''Due-soon and overdue reminders sent to the caller, newest first'''
+    rows, cols = reminders.member_reminders(ctx["member_id"], limit)
+    return rows_response(rows, cols, key="reminders", status="success")
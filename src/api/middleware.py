@@ -0,0 +1,371 @@
+import hashlib
+import time
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+
+from src.api.responses import FastJSONResponse
+from src.db import routing, sqltrace
+from src.db import swen610_db_utils as db_utils
+from src.db.ratelimit import PostgresBackend, member_for_token
+from utils import configs, metrics
+from utils.ratelimit import Limit, MemoryBackend, client_key, route_class, session_token
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def route_label(scope) -> str:
+    '''Route template (/w/{workspace_id}/b/me) rather than the raw path, to bound label cardinality'''
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    '''Per-route latency histogram, status code counts and in-flight gauge'''
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.HTTP_IN_FLIGHT.dec()
+            route = route_label(scope)
+            metrics.HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], route)
+            metrics.HTTP_REQUESTS.inc(scope["method"], route, str(status))
+
+
+class SQLTraceMiddleware:
+    '''
+    Captures the SQL issued by each request when TASKMASTER_SQL_TRACE=1. Likely N+1
+    patterns are logged; with TASKMASTER_DEBUG=1 the summary is also returned in the
+    X-SQL-Trace header so API tests can assert on query counts.
+    '''
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not configs.SQL_TRACE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = sqltrace.start(f"{scope['method']} {scope['path']}")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and configs.DEBUG_MODE:
+                headers = list(message.get("headers", []))
+                headers.append((configs.SQL_TRACE_HEADER.lower().encode(), trace.header_value().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sqltrace.stop(token)
+            trace.label = f"{scope['method']} {route_label(scope)}"
+            metrics.HTTP_SQL_STATEMENTS.observe(len(trace.statements), route_label(scope))
+            sqltrace.log_summary(trace)
+
+
+def _pin_expiry(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ReadYourWritesMiddleware:
+    '''
+    Opens each request's read session (src/db/routing.py) when read replicas are
+    configured. A request that writes sets PRIMARY_PIN_COOKIE; until it expires the
+    client's reads go to the primary, so it never reads around its own change.
+    '''
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not db_utils.replicas():
+            await self.app(scope, receive, send)
+            return
+
+        cookies = HTTPConnection(scope).cookies
+        pinned = _pin_expiry(cookies.get(configs.PRIMARY_PIN_COOKIE)) > time.time()
+
+        with routing.session(pinned) as session:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and session.wrote:
+                    seconds = configs.DB_READ_YOUR_WRITES_SECONDS
+                    MutableHeaders(scope=message).append(
+                        "set-cookie", f"{configs.PRIMARY_PIN_COOKIE}={time.time() + seconds:.0f}; "
+                                      f"Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax")
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def etag(body: bytes) -> str:
+    '''Weak validator for a response body: equal bodies get equal tags'''
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, tag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or tag in tags or tag[2:] in tags
+
+
+class ETagMiddleware:
+    '''
+    ETag on successful GET responses, and 304 Not Modified without a body when the
+    request's If-None-Match already names it. The handler still runs; what is saved is
+    the transfer and the client's parsing. Streaming responses are passed through.
+    '''
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            pending, start = start, None
+            headers = MutableHeaders(scope=pending)
+            if pending["status"] != 200 or message.get("more_body", False) or "etag" in headers:
+                await send(pending)
+                await send(message)
+                return
+            tag = etag(message.get("body", b""))
+            if if_none_match and etag_matches(if_none_match, tag):
+                headers = MutableHeaders(raw=[(k, v) for k, v in pending["headers"]
+                                              if k.lower() not in (b"content-length", b"content-type")])
+                headers["ETag"] = tag
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            headers["ETag"] = tag
+            await send(pending)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+class CompressionMiddleware:
+    '''
+    Brotli when the client accepts it (and the brotli package is installed), otherwise
+    gzip. Bodies under COMPRESSION_MIN_SIZE, content types outside COMPRESSIBLE_TYPES and
+    responses that already carry a Content-Encoding are passed through untouched, with
+    either coding.
+    '''
+
+    def __init__(self, app, minimum_size: int = None, gzip_level: int = None, brotli_quality: int = None):
+        self.app = app
+        self.minimum_size = configs.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.brotli_quality = configs.BROTLI_QUALITY if brotli_quality is None else brotli_quality
+        self.gzip_level = configs.GZIP_LEVEL if gzip_level is None else gzip_level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not configs.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        if brotli is not None and _accepts(accept, "br"):
+            await EncodingResponder(self.app, self.minimum_size, "br",
+                                    lambda: brotli.Compressor(quality=self.brotli_quality))(scope, receive, send)
+        elif _accepts(accept, "gzip"):
+            await EncodingResponder(self.app, self.minimum_size, "gzip",
+                                    lambda: GzipCompressor(self.gzip_level))(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+class GzipCompressor:
+    '''zlib in gzip framing, with the process/finish interface of brotli.Compressor'''
+
+    def __init__(self, level: int):
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._zlib.flush()
+
+
+class EncodingResponder:
+    '''Compresses one response with `coding`, using a fresh compressor from `new_compressor`'''
+
+    def __init__(self, app, minimum_size: int, coding: str, new_compressor):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.coding = coding
+        self.new_compressor = new_compressor
+        self.send = None
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    def _compressible(self, headers) -> bool:
+        content_type = headers.get("content-type", "")
+        return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not self._compressible(headers) or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = self.new_compressor()
+            if more_body:
+                # Streaming response: compress chunk by chunk, length unknown up front
+                del headers["Content-Length"]
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": self.compressor.process(body), "more_body": True})
+                return
+            body = self.compressor.process(body) + self.compressor.finish()
+            headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        chunk = self.compressor.process(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+class RateLimitMiddleware:
+    '''
+    Token bucket per client (session member, else peer address) and route class. Over
+    the limit the request is answered with 429 and Retry-After before it reaches a
+    router or the database. A route doing several requests' work (POST /batch) takes
+    the rest of its tokens with `await request.state.rate_limit(n)`.
+    '''
+
+    def __init__(self, app, backend=None, limits: dict = None):
+        self.app = app
+        if backend is None:
+            backend = PostgresBackend() if configs.RATE_LIMIT_BACKEND == "postgres" else MemoryBackend()
+        self.backend = backend
+        self.limits = {name: Limit(*value) for name, value in (limits or configs.RATE_LIMITS).items()}
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not configs.RATE_LIMIT_ENABLED or scope["method"] == "OPTIONS"
+                or scope["path"] in configs.RATE_LIMIT_EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        conn = HTTPConnection(scope)
+        kind = route_class(scope["method"], scope["path"])
+        token = session_token(conn.headers, conn.cookies, configs.COOKIE_NAME)
+        member_id = await run_in_threadpool(member_for_token, token) if token else None
+        key = f"{kind}:{client_key(member_id, conn.client)}"
+        allowed, wait = await self.take(key, kind)
+
+        if allowed:
+            scope.setdefault("state", {})["rate_limit"] = lambda cost: self.take(key, kind, cost)
+            await self.app(scope, receive, send)
+            return
+        response = FastJSONResponse({"detail": "Too many requests"}, status_code=429, headers={"Retry-After": str(wait)})
+        await response(scope, receive, send)
+
+    async def take(self, key: str, kind: str, cost: int = 1):
+        '''(allowed, retry-after seconds) for `cost` tokens from the client's bucket'''
+        if isinstance(self.backend, PostgresBackend):
+            allowed, wait = await run_in_threadpool(self.backend.take, key, self.limits[kind], cost=cost)
+        else:
+            allowed, wait = self.backend.take(key, self.limits[kind], cost=cost)
+        if not allowed:
+            metrics.HTTP_REJECTED.inc("rate_limited", kind)
+        return allowed, wait
+
+
+class ConcurrencyLimitMiddleware:
+    '''
+    Global cap on requests in flight in this worker. Beyond it new requests are shed
+    with 503 + Retry-After instead of queueing on the threadpool and the database.
+    '''
+
+    def __init__(self, app, max_concurrent: int = None):
+        self.app = app
+        self.max_concurrent = configs.MAX_CONCURRENT_REQUESTS if max_concurrent is None else max_concurrent
+        self.in_flight = 0  # only touched from the event loop
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_concurrent <= 0:
+            await self.app(scope, receive, send)
+            return
+        if self.in_flight >= self.max_concurrent:
+            metrics.HTTP_REJECTED.inc("overloaded", route_class(scope["method"], scope["path"]))
+            response = FastJSONResponse({"detail": "Server busy, retry shortly"}, status_code=503,
+                                        headers={"Retry-After": "1"})
+            await response(scope, receive, send)
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from src.db.fieldsets import FieldSet, UnknownFieldError
+from utils.pagination import InvalidCursorError, Page, decode_cursor
+
+
+def sparse_fields(fieldset: FieldSet):
+    '''
+    Dependency for ?fields=id,title,status on list endpoints.
+
+        @router.get("/w/{workspace_id}/b/{board_id}/t")
+        def list_tasks(..., fields=Depends(sparse_fields(TASK_FIELDS))):
+            rows, cols = fieldsets.board_tasks(workspace_id, board_id, fields)
+    '''
+    def dependency(fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+        try:
+            return fieldset.parse(fields)
+        except UnknownFieldError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return dependency
+
+
+def keyset_page(key_size: int, default_limit: int = 50, max_limit: int = 200):
+    '''
+    Dependency for ?after=<cursor>&limit=N on keyset-paginated lists; `key_size` is the
+    number of sort-key values in the cursor.
+
+        def my_tasks(..., page: Page = Depends(keyset_page(2))):
+    '''
+    def dependency(after: Optional[str] = Query(None, description="Cursor from the previous page's `next`"),
+                   limit: int = Query(default_limit, ge=1, le=max_limit)) -> Page:
+        try:
+            return Page(decode_cursor(after, key_size) if after else None, limit)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return dependency
@@ -0,0 +1,47 @@
+from fastapi import Depends, HTTPException
+
+from src.api.auth import require_auth
+from src.db import permissions
+from src.db.permissions import PermissionSnapshot
+from utils import configs
+
+
+def member_permissions(ctx: dict = Depends(require_auth)) -> PermissionSnapshot:
+    '''Cached permission snapshot of the caller; no query once warm'''
+    return permissions.snapshot(ctx["member_id"])
+
+
+def require_workspace(flag: str = None):
+    '''
+    Dependency for /w/{workspace_id}/... routes.
+
+        @router.put("/w/{workspace_id}/update")
+        def update_workspace(workspace_id: int, ..., perms=Depends(require_workspace("edit_workspace"))):
+    '''
+    def dependency(workspace_id: int, snap: PermissionSnapshot = Depends(member_permissions)) -> PermissionSnapshot:
+        if not snap.in_workspace(workspace_id):
+            raise HTTPException(status_code=403, detail="Not a member of this workspace")
+        if flag is not None and not snap.can_workspace(workspace_id, flag):
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return snap
+    return dependency
+
+
+def require_board(flag: str = None):
+    '''
+    Dependency for /w/{workspace_id}/b/{board_id}/... routes. Membership is checked
+    first, so non-members get 403 whether or not the board exists.
+
+        @router.put("/w/{workspace_id}/b/{board_id}/update")
+        def update_board(..., perms=Depends(require_board("edit_board"))):
+    '''
+    def dependency(workspace_id: int, board_id: int,
+                   snap: PermissionSnapshot = Depends(member_permissions)) -> PermissionSnapshot:
+        if board_id not in snap.boards:
+            raise HTTPException(status_code=403, detail="Not a member of this board")
+        if snap.board(workspace_id, board_id) is None:
+            raise HTTPException(status_code=404, detail=configs.BOARD_ERROR_404_MSG)
+        if flag is not None and not snap.can(board_id, flag):
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return snap
+    return dependency
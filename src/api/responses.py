@@ -0,0 +1,36 @@
+from typing import Any
+
+from fastapi.responses import Response
+
+from utils.serialization import dumps, rows_to_json
+
+
+class FastJSONResponse(Response):
+    '''orjson-backed response; also handles Decimal coming out of psycopg2'''
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_response(rows, columns, key: str = "items", status_code: int = 200, **envelope) -> Response:
+    '''
+    Serialize trusted DB output for list endpoints without per-row model validation.
+    The rows are encoded on their own and spliced into the envelope as `key`.
+
+        rows, cols = db_utils.exec_get_all(SQL_LIST_TASKS, {...})
+        return rows_response(rows, cols, key="tasks", status="success", total=len(rows))
+    '''
+    head = dumps(envelope)[:-1]
+    body = b"%s%s%s:%s}" % (head, b"," if envelope else b"", dumps(key), rows_to_json(rows, columns))
+    return RawJSONResponse(body, status_code=status_code)
+
+
+class RawJSONResponse(Response):
+    '''Body is already JSON bytes (e.g. assembled by Postgres); sent without re-encoding'''
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if content is None:
+            return b"null"
+        return content if isinstance(content, bytes) else content.encode()
@@ -0,0 +1,26 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.api.hierarchy import valid_task
+from src.api.permissions import require_board
+from src.db import threads
+from utils.pagination import InvalidCursorError
+
+router = APIRouter(tags=["comments"])
+
+
+@router.get("/w/{workspace_id}/b/{board_id}/t/{task_id}/thread")
+def comment_thread(workspace_id: int, board_id: int, task_id: int,
+                   before: Optional[str] = Query(None, description="`older` cursor: load older comments"),
+                   after: Optional[str] = Query(None, description="`newer` cursor: comments posted since"),
+                   limit: int = Query(50, ge=1, le=200),
+                   perms=Depends(require_board()), _=Depends(valid_task)):
+    '''A task's comments newest first, one keyset page at a time'''
+    if before and after:
+        raise HTTPException(status_code=400, detail="Pass either before or after, not both")
+    try:
+        page = threads.comments_page(task_id, before=before, after=after, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", **page}
@@ -0,0 +1,270 @@
+'''
+Board activity history: an append-only table partitioned by month.
+
+Write paths record what happened after they commit; records are buffered in-process
+and written by a background thread in one multi-row INSERT per batch
+(ACTIVITY_BATCH_SIZE rows or every ACTIVITY_FLUSH_SECONDS), so a busy write path costs
+no extra round trip:
+
+    activity.record("task.moved", workspace_id, board_id, task_id, actor_id=member_id,
+                    from_status="To Do", to_status="In Progress")
+
+Up to ACTIVITY_FLUSH_SECONDS of records are lost if the process dies. A batch is kept
+for the next flush while the database is unreachable; a record the database rejects is
+dropped (and counted) without holding up the rest of its batch. Feeds read only
+the last ACTIVITY_FEED_MONTHS months, a bound the planner uses to skip older partitions.
+The periodic activity_maintenance job creates partitions ahead of time and archives
+months older than ACTIVITY_RETENTION_MONTHS: the partition is detached and moved to
+the dev_archive schema, from where it can be dumped and dropped.
+
+    python -m src.db.activity --maintain
+'''
+import argparse
+import atexit
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+import psycopg2
+import psycopg2.errors
+from psycopg2.extras import Json, execute_values
+
+from utils import configs, metrics
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from utils.serialization import rows_to_dicts
+from . import jobs
+from .swen610_db_utils import connect, exec_commit_returning, exec_get_all
+
+logger = logging.getLogger("taskmaster.activity")
+
+ARCHIVE_SCHEMA = "dev_archive"
+
+SQL_INSERT = """
+    INSERT INTO dev.activity (occurred_at, workspace_id, board_id, task_id, actor_id, action, detail) VALUES %s;
+"""
+INSERT_TEMPLATE = "(to_timestamp(%s)::timestamp, %s, %s, %s, %s, %s, %s)"
+
+SQL_ENSURE_PARTITIONS = "SELECT dev.ensure_activity_partitions(%(first_month)s, %(months)s);"
+
+SQL_PARTITIONS = """
+    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'dev.activity'::regclass ORDER BY c.relname;
+"""
+
+SQL_FEED = """
+    SELECT a.id, a.occurred_at, a.action, a.board_id, a.task_id, m.username AS actor, a.detail
+    FROM dev.activity a
+    LEFT JOIN dev.member m ON m.id = a.actor_id
+    WHERE a.board_id = %(board_id)s {task} AND a.occurred_at >= %(since)s {keyset}
+    ORDER BY a.occurred_at DESC, a.id DESC
+    LIMIT %(limit)s;
+"""
+
+Row = Tuple[float, int, Optional[int], Optional[int], Optional[int], str, Json]
+
+_pending: List[Row] = []
+_lock = threading.Lock()
+_wake = threading.Event()
+_flusher: Optional[threading.Thread] = None
+
+
+def _month(d: date, offset: int = 0) -> date:
+    months = d.year * 12 + d.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _months_between(first: date, last: date) -> int:
+    return (last.year - first.year) * 12 + last.month - first.month
+
+
+def feed_since(today: date = None) -> date:
+    '''Oldest date feeds read: the first day of the month ACTIVITY_FEED_MONTHS - 1 months back'''
+    return _month(today or date.today(), -(configs.ACTIVITY_FEED_MONTHS - 1))
+
+
+def record(action: str, workspace_id: int, board_id: int = None, task_id: int = None, actor_id: int = None,
+           **detail):
+    '''Queue one activity entry; written by the next batch'''
+    row = (time.time(), workspace_id, board_id, task_id, actor_id, action, Json(detail))
+    with _lock:
+        if len(_pending) >= configs.ACTIVITY_MAX_BUFFERED:
+            metrics.ACTIVITY_EVENTS.inc("dropped")
+            return
+        _pending.append(row)
+        full = len(_pending) >= configs.ACTIVITY_BATCH_SIZE
+        _start_flusher()
+    if full:
+        _wake.set()
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = threading.Thread(target=_flush_loop, name="activity-flush", daemon=True)
+        _flusher.start()
+
+
+def _flush_loop():
+    while True:
+        _wake.wait(configs.ACTIVITY_FLUSH_SECONDS)
+        _wake.clear()
+        try:
+            flush()
+        except _RETRYABLE as e:
+            logger.warning("activity flush failed, will retry: %r", e)
+        except Exception:
+            # Keep the thread alive: a dead flusher would silently buffer until the cap
+            logger.exception("activity flush failed")
+
+
+# The database is unreachable: the batch goes back to the buffer. Any other error is a row
+# the database (or the Json adapter) rejects, which retrying would only hit again
+_RETRYABLE = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+def _insert(cur, rows: List[Row]):
+    execute_values(cur, SQL_INSERT, rows, template=INSERT_TEMPLATE, page_size=configs.ACTIVITY_BATCH_SIZE)
+
+
+def _write(cur, rows: List[Row]):
+    try:
+        _insert(cur, rows)
+    except psycopg2.errors.CheckViolation:
+        # No partition for some row's month yet: create them and retry once
+        oldest = date.fromtimestamp(min(r[0] for r in rows))
+        cur.execute(SQL_ENSURE_PARTITIONS, {"first_month": oldest,
+                                            "months": _months_between(oldest, date.today()) + 1})
+        _insert(cur, rows)
+
+
+def flush() -> int:
+    '''Write everything buffered so far; returns the number of rows written'''
+    with _lock:
+        rows = _pending[:]
+        del _pending[:]
+    if not rows:
+        return 0
+    written = dropped = 0
+    conn = None
+    try:
+        conn = connect()
+        conn.autocommit = True
+        cur = conn.cursor()
+        try:
+            _write(cur, rows)
+            written = len(rows)
+        except _RETRYABLE:
+            raise
+        except Exception as e:
+            logger.warning("activity batch rejected, writing its %d rows one at a time: %r", len(rows), e)
+            for i, row in enumerate(rows):
+                try:
+                    _write(cur, [row])
+                    written += 1
+                except _RETRYABLE:
+                    rows = rows[i:]
+                    raise
+                except Exception as e:
+                    dropped += 1
+                    logger.warning("dropping activity record %s on board %s: %r", row[5], row[2], e)
+    except _RETRYABLE:
+        with _lock:
+            _pending[:0] = rows[-configs.ACTIVITY_MAX_BUFFERED:]
+        raise
+    finally:
+        if conn is not None:
+            conn.close()
+        metrics.ACTIVITY_EVENTS.inc("written", amount=written)
+        metrics.ACTIVITY_EVENTS.inc("dropped", amount=dropped)
+    return written
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception as e:
+        logger.warning("dropping %d activity records at exit: %r", len(_pending), e)
+
+
+def _key(values: tuple) -> tuple:
+    occurred_at, activity_id = values
+    try:
+        return datetime.fromisoformat(occurred_at), int(activity_id)
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def feed(board_id: int, task_id: int = None, after: str = None, limit: int = 50) -> dict:
+    '''
+    {"activity", "next"}: a board's (or one task's) entries newest first, a keyset page
+    at a time. Raises InvalidCursorError for a malformed cursor.
+    '''
+    args = {"board_id": board_id, "task_id": task_id, "since": feed_since(), "limit": limit + 1}
+    keyset = ""
+    if after is not None:
+        args["occurred_at"], args["id"] = _key(decode_cursor(after, 2))
+        keyset = "AND (a.occurred_at, a.id) < (%(occurred_at)s, %(id)s)"
+    sql = SQL_FEED.format(task="AND a.task_id = %(task_id)s" if task_id is not None else "", keyset=keyset)
+    rows, columns = exec_get_all(sql, args)
+    entries = rows_to_dicts(rows[:limit], columns)
+    more = len(rows) > limit
+    return {"activity": entries,
+            "next": encode_cursor(entries[-1]["occurred_at"], entries[-1]["id"]) if more else None}
+
+
+def partitions() -> List[str]:
+    rows, _ = exec_get_all(SQL_PARTITIONS)
+    return [name for (name,) in rows]
+
+
+def ensure_partitions(today: date = None) -> int:
+    '''Partitions for this month and ACTIVITY_PARTITIONS_AHEAD months after it'''
+    row, _ = exec_commit_returning(SQL_ENSURE_PARTITIONS, {"first_month": _month(today or date.today()),
+                                                           "months": configs.ACTIVITY_PARTITIONS_AHEAD + 1})
+    return row[0]
+
+
+def archive(today: date = None) -> List[str]:
+    '''Detach months older than ACTIVITY_RETENTION_MONTHS and move them to dev_archive'''
+    cutoff = _month(today or date.today(), -configs.ACTIVITY_RETENTION_MONTHS).strftime("activity_%Y_%m")
+    old = [name for name in partitions() if name < cutoff]
+    if not old:
+        return []
+    conn = connect()
+    conn.autocommit = True  # DETACH ... CONCURRENTLY cannot run in a transaction block
+    try:
+        cur = conn.cursor()
+        cur.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA};")
+        for name in old:
+            # Only a SHARE UPDATE EXCLUSIVE lock on the parent: feeds and inserts carry on
+            cur.execute(f"ALTER TABLE dev.activity DETACH PARTITION dev.{name} CONCURRENTLY;")
+            cur.execute(f"ALTER TABLE dev.{name} SET SCHEMA {ARCHIVE_SCHEMA};")
+            logger.info("archived %s to %s", name, ARCHIVE_SCHEMA)
+    finally:
+        conn.close()
+    return old
+
+
+@jobs.handler("activity_maintenance")
+def _maintenance_job(payload, job):
+    job.progress(force=True, created=ensure_partitions(), archived=archive())
+
+
+jobs.periodic("activity_maintenance", every_seconds=86400)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Activity log partition maintenance")
+    parser.add_argument("--maintain", action="store_true", help="create upcoming partitions and archive old ones")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if args.maintain:
+        print(f"created {ensure_partitions()} partitions, archived {archive() or 'none'}")
+    print("\n".join(partitions()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+'''
+Bulk task import/export for one board, in NDJSON or CSV.
+
+Import validates rows in chunks, COPYs each valid chunk into a temporary staging table
+and merges everything into dev.task / dev.task_categories in the same transaction, so
+a file either lands completely or not at all. Export streams from a server-side
+cursor, so memory stays flat however large the board is.
+
+Both directions use the same field names, so an export can be re-imported:
+title, description, points, priority, status, assignee, dueDate, categories
+(a list in NDJSON, "a|b" in CSV). Export also includes id, created_on and comments;
+import ignores them.
+'''
+import csv
+import io
+import logging
+import time
+import uuid
+from datetime import date
+from typing import Iterator, List
+
+import orjson
+
+from utils import metrics
+from utils.serialization import dumps, rows_to_dicts
+from . import activity
+from .swen610_db_utils import connect
+
+logger = logging.getLogger("taskmaster.bulk")
+
+FORMATS = ("ndjson", "csv")
+FIELDS = ("title", "description", "points", "priority", "status", "assignee", "dueDate", "categories")
+EXPORT_FIELDS = ("id",) + FIELDS + ("created_on", "comments")
+
+IMPORT_CHUNK_ROWS = 5_000
+IMPORT_MAX_ERRORS = 100
+EXPORT_FETCH_ROWS = 2_000
+NO_DUE_DATE = date(9999, 12, 31)
+
+STAGING_COLUMNS = ("line", "title", "description", "points", "priority_id", "status_id", "assignee",
+                   "due_date", "category_ids")
+
+SQL_CREATE_STAGING = """
+    CREATE TEMP TABLE task_import (
+        line INT PRIMARY KEY,
+        task_id INT,
+        title VARCHAR(100) NOT NULL,
+        description TEXT NOT NULL,
+        points INT,
+        priority_id INT,
+        status_id INT,
+        assignee TEXT,
+        due_date DATE NOT NULL,
+        category_ids INT[] NOT NULL
+    ) ON COMMIT DROP;
+"""
+
+SQL_UNKNOWN_ASSIGNEES = """
+    SELECT s.line, s.assignee FROM task_import s
+    LEFT JOIN dev.member m ON m.username = s.assignee
+    WHERE s.assignee IS NOT NULL AND m.id IS NULL
+    ORDER BY s.line LIMIT %(limit)s;
+"""
+
+SQL_MERGE = """
+    UPDATE task_import SET task_id = nextval(pg_get_serial_sequence('dev.task', 'id'));
+
+    INSERT INTO dev.task (id, board_id, workspace_id, title, description, points, priority, status_id,
+                          created_by, assigned_to, due_date)
+    SELECT s.task_id, %(board_id)s, %(workspace_id)s, s.title, s.description, s.points, s.priority_id,
+           s.status_id, %(member_id)s, m.id, s.due_date
+    FROM task_import s
+    LEFT JOIN dev.member m ON m.username = s.assignee
+    ORDER BY s.line;
+
+    INSERT INTO dev.task_categories (task_id, category_id)
+    SELECT s.task_id, c.category_id FROM task_import s, unnest(s.category_ids) AS c(category_id)
+    ON CONFLICT DO NOTHING;
+"""
+
+SQL_EXPORT = """
+    SELECT t.id, t.title, t.description, t.points, tp.level::text AS priority, ts.value AS status,
+           ma.username AS assignee, t.due_date AS "dueDate",
+           ARRAY(SELECT c.value FROM dev.task_categories tc JOIN dev.category c ON c.id = tc.category_id
+                 WHERE tc.task_id = t.id ORDER BY c.value) AS categories,
+           t.created_on,
+           (SELECT COALESCE(json_agg(json_build_object('author', m.username, 'content', cm.message,
+                                                       'timestamp', cm.created_on) ORDER BY cm.created_on, cm.id),
+                            '[]'::json)
+            FROM dev.task_comments cm LEFT JOIN dev.member m ON m.id = cm.author_id
+            WHERE cm.task_id = t.id) AS comments
+    FROM dev.task t
+    LEFT JOIN dev.task_priority tp ON tp.id = t.priority
+    LEFT JOIN dev.task_status ts ON ts.id = t.status_id
+    LEFT JOIN dev.member ma ON ma.id = t.assigned_to
+    WHERE t.workspace_id = %(workspace_id)s AND t.board_id = %(board_id)s
+    ORDER BY t.id;
+"""
+
+
+class BulkImportError(ValueError):
+    '''Raised with every row error found (up to IMPORT_MAX_ERRORS); nothing was imported'''
+
+    def __init__(self, errors: List[dict]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid row(s)")
+
+
+# ---------- parsing ----------
+
+def read_ndjson(text: io.TextIOBase) -> Iterator[tuple]:
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield line_no, e
+            continue
+        yield line_no, record if isinstance(record, dict) else ValueError("expected a JSON object")
+
+
+def read_csv(text: io.TextIOBase) -> Iterator[tuple]:
+    reader = csv.DictReader(text)
+    for record in reader:
+        # line_num is the reader's position after the record (header is line 1)
+        yield reader.line_num, record
+
+
+# ---------- validation ----------
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and value.strip() == "")
+
+
+class _Lookups:
+    def __init__(self, cur):
+        cur.execute("SELECT level::text, id FROM dev.task_priority;")
+        self.priorities = {k.lower(): v for k, v in cur.fetchall()}
+        cur.execute("SELECT value, id FROM dev.task_status;")
+        self.statuses = {k.lower(): v for k, v in cur.fetchall()}
+        cur.execute("SELECT value, MIN(id) FROM dev.category GROUP BY value;")
+        self.categories = {k.lower(): v for k, v in cur.fetchall()}
+
+
+def _validate(record: dict, lookups: _Lookups) -> tuple:
+    '''Staging row (without line) for one record; raises ValueError with a readable message'''
+    title = record.get("title")
+    if _blank(title):
+        raise ValueError("title is required")
+    title = str(title).strip()
+    if len(title) > 100:
+        raise ValueError("title is longer than 100 characters")
+
+    description = "" if _blank(record.get("description")) else str(record["description"])
+
+    points = record.get("points")
+    if _blank(points):
+        points = None
+    else:
+        try:
+            points = int(points)
+        except (TypeError, ValueError):
+            raise ValueError(f"points must be an integer, got {points!r}")
+        if points < 0:
+            raise ValueError("points must not be negative")
+
+    def lookup(field, table):
+        value = record.get(field)
+        if _blank(value):
+            return None
+        found = table.get(str(value).strip().lower())
+        if found is None:
+            raise ValueError(f"unknown {field} {value!r}")
+        return found
+
+    priority_id = lookup("priority", lookups.priorities)
+    status_id = lookup("status", lookups.statuses)
+
+    assignee = None if _blank(record.get("assignee")) else str(record["assignee"]).strip()
+
+    due = record.get("dueDate")
+    if _blank(due):
+        due_date = NO_DUE_DATE
+    else:
+        try:
+            due_date = date.fromisoformat(str(due)[:10])
+        except ValueError:
+            raise ValueError(f"dueDate must be YYYY-MM-DD, got {due!r}")
+
+    categories = record.get("categories")
+    if _blank(categories):
+        categories = []
+    elif isinstance(categories, str):
+        categories = [c for c in categories.split("|") if c.strip()]
+    elif not isinstance(categories, list):
+        raise ValueError(f"categories must be a list or a |-separated string, got {categories!r}")
+    category_ids = []
+    for name in categories:
+        found = lookups.categories.get(str(name).strip().lower())
+        if found is None:
+            raise ValueError(f"unknown category {name!r}")
+        category_ids.append(found)
+
+    return (title, description, points, priority_id, status_id, assignee, due_date,
+            "{" + ",".join(str(c) for c in sorted(set(category_ids))) + "}")
+
+
+# ---------- import ----------
+
+def _copy_chunk(cur, rows: List[tuple]):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+    buf.seek(0)
+    # Unquoted empty fields are NULL in COPY csv; an empty description stays ''
+    cur.copy_expert(f"COPY task_import ({', '.join(STAGING_COLUMNS)}) FROM STDIN "
+                    "WITH (FORMAT csv, FORCE_NOT_NULL (description))", buf)
+
+
+def import_tasks(workspace_id: int, board_id: int, member_id: int, text: io.TextIOBase, fmt: str = "ndjson",
+                 chunk_rows: int = IMPORT_CHUNK_ROWS) -> dict:
+    '''
+    Load every task in `text` into the board, created by member_id.
+    Returns {"imported", "seconds", "rows_per_s"}; raises BulkImportError when any row is invalid.
+    '''
+    records = read_csv(text) if fmt == "csv" else read_ndjson(text)
+    started = time.perf_counter()
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(SQL_CREATE_STAGING)
+        lookups = _Lookups(cur)
+        errors, chunk, total = [], [], 0
+
+        for line_no, record in records:
+            total += 1
+            try:
+                if isinstance(record, Exception):
+                    raise ValueError(str(record))
+                row = _validate(record, lookups)
+            except ValueError as e:
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": line_no, "error": str(e)})
+                continue
+            if not errors:
+                chunk.append((line_no, *row))
+                if len(chunk) >= chunk_rows:
+                    _copy_chunk(cur, chunk)
+                    chunk = []
+        if chunk and not errors:
+            _copy_chunk(cur, chunk)
+
+        if not errors:
+            cur.execute(SQL_UNKNOWN_ASSIGNEES, {"limit": IMPORT_MAX_ERRORS})
+            errors = [{"line": line, "error": f"unknown assignee {name!r}"} for line, name in cur.fetchall()]
+        if errors:
+            conn.rollback()
+            raise BulkImportError(errors)
+
+        cur.execute(SQL_MERGE, {"workspace_id": workspace_id, "board_id": board_id, "member_id": member_id})
+        conn.commit()
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    metrics.BULK_ROWS.inc("import", fmt, amount=total)
+    activity.record("tasks.imported", workspace_id, board_id, actor_id=member_id, rows=total, format=fmt)
+    logger.info("imported %d tasks into board %s in %.2fs (%.0f rows/s)", total, board_id, seconds,
+                total / seconds if seconds else 0)
+    return {"imported": total, "seconds": round(seconds, 3), "rows_per_s": round(total / seconds) if seconds else None}
+
+
+# ---------- export ----------
+
+def _csv_rows(rows, columns) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        record = dict(zip(columns, row))
+        record["categories"] = "|".join(record["categories"])
+        record["comments"] = dumps(record["comments"]).decode()
+        writer.writerow(["" if record[f] is None else record[f] for f in EXPORT_FIELDS])
+    return buf.getvalue().encode()
+
+
+def _ndjson_rows(rows, columns) -> bytes:
+    return b"".join(dumps(record) + b"\n" for record in rows_to_dicts(rows, columns))
+
+
+def export_tasks(workspace_id: int, board_id: int, fmt: str = "ndjson",
+                 fetch_rows: int = EXPORT_FETCH_ROWS) -> Iterator[bytes]:
+    '''Byte chunks of the export; holds one server-side cursor batch in memory at a time'''
+    encode = _csv_rows if fmt == "csv" else _ndjson_rows
+    started = time.perf_counter()
+    total = 0
+    conn = connect()
+    try:
+        cur = conn.cursor(name=f"export_{uuid.uuid4().hex}")
+        cur.itersize = fetch_rows
+        cur.execute(SQL_EXPORT, {"workspace_id": workspace_id, "board_id": board_id})
+        if fmt == "csv":
+            buf = io.StringIO()
+            csv.writer(buf).writerow(EXPORT_FIELDS)
+            yield buf.getvalue().encode()
+        columns = None
+        while True:
+            rows = cur.fetchmany(fetch_rows)
+            if not rows:
+                break
+            columns = columns or [c.name for c in cur.description]
+            total += len(rows)
+            yield encode(rows, columns)
+        conn.commit()
+    finally:
+        conn.close()
+        seconds = time.perf_counter() - started
+        metrics.BULK_ROWS.inc("export", fmt, amount=total)
+        logger.info("exported %d tasks from board %s in %.2fs (%.0f rows/s)", total, board_id, seconds,
+                    total / seconds if seconds else 0)
@@ -0,0 +1,135 @@
+'''
+Denormalized counters and their consistency check.
+
+    workspace.board_count    live (not soft-deleted) boards per workspace
+    board_task_count         tasks per (board, status); status_id 0 = no status
+    task.comment_count       comments per task (with task.last_comment_at)
+
+Statement-level triggers in schema.sql keep them current, so listing endpoints read a
+count instead of running COUNT(*) per row. Writes that bypass triggers (datagen with
+session_replication_role = replica, hand-run SQL) can still leave them wrong; the
+periodic counters_check job compares each counter with a real count and repairs drift:
+
+    python -m src.db.counters            # report drift
+    python -m src.db.counters --repair
+'''
+import argparse
+import logging
+from dataclasses import dataclass
+from typing import Dict
+
+from utils import metrics
+from . import jobs
+from .swen610_db_utils import connect, exec_get_all, exec_get_one
+
+logger = logging.getLogger("taskmaster.counters")
+
+
+@dataclass(frozen=True)
+class Counter:
+    name: str
+    source: str     # table whose writes move the counter; locked against writers while repairing
+    drift: str      # query yielding one row per wrong counter: key..., stored, actual
+    repair: str     # statement setting every row of `drift` to its actual value
+
+
+COUNTERS = (
+    Counter("workspace_boards", "dev.board", """
+        SELECT w.id AS workspace_id, w.board_count AS stored, COUNT(b.id)::int AS actual
+        FROM dev.workspace w
+        LEFT JOIN dev.board b ON b.workspace_id = w.id AND b.deleted_at IS NULL
+        GROUP BY w.id
+        HAVING w.board_count <> COUNT(b.id)
+    """, """
+        UPDATE dev.workspace w SET board_count = d.actual FROM drift d WHERE w.id = d.workspace_id
+    """),
+    Counter("board_tasks", "dev.task", """
+        SELECT COALESCE(a.board_id, c.board_id) AS board_id, COALESCE(a.status_id, c.status_id) AS status_id,
+               COALESCE(c.tasks, 0) AS stored, COALESCE(a.tasks, 0) AS actual
+        FROM (SELECT board_id, COALESCE(status_id, 0) AS status_id, COUNT(*)::int AS tasks
+              FROM dev.task WHERE board_id IS NOT NULL GROUP BY 1, 2) a
+        FULL JOIN dev.board_task_count c ON c.board_id = a.board_id AND c.status_id = a.status_id
+        WHERE COALESCE(c.tasks, 0) <> COALESCE(a.tasks, 0)
+    """, """
+        INSERT INTO dev.board_task_count AS c (board_id, status_id, tasks)
+        SELECT board_id, status_id, actual FROM drift
+        ON CONFLICT (board_id, status_id) DO UPDATE SET tasks = EXCLUDED.tasks
+    """),
+    Counter("task_comments", "dev.task_comments", """
+        SELECT t.id AS task_id, t.comment_count AS stored, COALESCE(c.n, 0) AS actual, c.latest
+        FROM dev.task t
+        LEFT JOIN (SELECT task_id, COUNT(*)::int AS n, MAX(created_on) AS latest
+                   FROM dev.task_comments GROUP BY task_id) c ON c.task_id = t.id
+        WHERE t.comment_count <> COALESCE(c.n, 0) OR t.last_comment_at IS DISTINCT FROM c.latest
+    """, """
+        UPDATE dev.task t SET comment_count = d.actual, last_comment_at = d.latest FROM drift d WHERE t.id = d.task_id
+    """),
+)
+
+SQL_BOARD_TASK_COUNTS = """
+    SELECT COALESCE(ts.value, 'none'), c.tasks
+    FROM dev.board_task_count c
+    LEFT JOIN dev.task_status ts ON ts.id = c.status_id
+    WHERE c.board_id = %(board_id)s AND c.tasks > 0
+    ORDER BY c.status_id;
+"""
+
+
+def board_task_counts(board_id: int) -> Dict[str, int]:
+    '''Tasks on the board by status name ("none" for tasks without one)'''
+    rows, _ = exec_get_all(SQL_BOARD_TASK_COUNTS, {"board_id": board_id})
+    return dict(rows)
+
+
+def _repair(counter: Counter) -> int:
+    '''Recompute drift with writers to the source table held off, then fix it'''
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"LOCK TABLE {counter.source} IN SHARE MODE;")
+        cur.execute(f"WITH drift AS ({counter.drift}) {counter.repair};")
+        repaired = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return repaired
+
+
+def check(repair: bool = False) -> Dict[str, int]:
+    '''
+    Number of wrong rows per counter. The check itself takes no locks; only a counter
+    found drifting is recomputed under a SHARE lock and repaired (when `repair`).
+    '''
+    drifted = {}
+    for counter in COUNTERS:
+        (n,), _ = exec_get_one(f"WITH drift AS ({counter.drift}) SELECT COUNT(*) FROM drift;")
+        drifted[counter.name] = n
+        if n == 0:
+            continue
+        metrics.COUNTER_DRIFT.inc(counter.name, amount=n)
+        if repair:
+            logger.warning("counter %s: repaired %d drifted rows", counter.name, _repair(counter))
+        else:
+            logger.warning("counter %s: %d drifted rows", counter.name, n)
+    return drifted
+
+
+@jobs.handler("counters_check")
+def _check_job(payload, job):
+    job.progress(force=True, **check(repair=True))
+
+
+jobs.periodic("counters_check", every_seconds=3600)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check denormalized counters against real counts")
+    parser.add_argument("--repair", action="store_true", help="fix drifted counters")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    for name, n in check(args.repair).items():
+        print(f"{name}: {n} drifted")
+
+
+if __name__ == "__main__":
+    main()
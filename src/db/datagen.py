@@ -0,0 +1,328 @@
+'''
+Synthetic data generator for production-scale local testing.
+
+Loads members, workspaces, boards, tasks, categories, comments and sessions on top of
+schema.sql + seed.sql using COPY from parallel worker processes. Output depends only on
+the seed and the scale, not on the number of workers: every member and workspace draws
+from its own RNG stream, and ids are assigned from a cheap serial "shape" pass.
+
+    python -m src.db.datagen --members 200000 --workspaces 20000 --workers 8 --seed 7
+    python -m src.db.datagen --rebuild --preset small
+
+    from src.db import datagen
+    datagen.generate(datagen.Scale(members=1000, workspaces=100), seed=7, workers=4)
+
+Generated members are gen_1 .. gen_N and all log in with the password in GEN_PASSWORD.
+'''
+import argparse
+import io
+import math
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, timedelta
+from multiprocessing import Pool
+
+import psycopg2
+
+from . import counters, shortids
+from .swen610_db_utils import connect, exec_sql_file
+
+GEN_PASSWORD = "ybg2gpa7YUH-gam*qay"
+GEN_PASSWORD_HASH = "$argon2id$v=19$m=65536,t=3,p=4$GGMitlWQDvoXqo29PuEdbw$mlTjIyZ5/n10gwGWZgKlhJwdjxEvffgFMXVRFgirSAI"
+NO_DUE_DATE = date(9999, 12, 31)
+COPY_BATCH_ROWS = 50_000
+
+FIRST_NAMES = ["Ada", "Ben", "Cleo", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivan", "Jo", "Kai", "Lena",
+               "Milo", "Nia", "Omar", "Pia", "Quin", "Rosa", "Sam", "Tara", "Uma", "Vik", "Wes", "Yara"]
+LAST_NAMES = ["Ali", "Brown", "Chen", "Diaz", "Evans", "Fox", "Garcia", "Hill", "Ito", "Jones", "Khan",
+              "Lee", "Moore", "Nair", "Ortiz", "Park", "Reyes", "Smith", "Tan", "Wong"]
+VERBS = ["Fix", "Add", "Refactor", "Document", "Review", "Test", "Design", "Migrate", "Remove", "Profile"]
+NOUNS = ["login flow", "board filters", "task API", "search index", "release notes", "CI pipeline",
+         "comment editor", "date picker", "permissions", "dashboard cards", "export job", "onboarding"]
+
+STATUS_WEIGHTS = {"To Do": 3, "In Progress": 2, "Completed": 5}
+PRIORITY_WEIGHTS = {"critical": 1, "high": 3, "medium": 5, "low": 4}
+
+PRESETS = {
+    "small": dict(members=2_000, workspaces=200),
+    "medium": dict(members=50_000, workspaces=5_000),
+    "large": dict(members=500_000, workspaces=50_000),
+}
+
+
+@dataclass(frozen=True)
+class Scale:
+    '''Volumes; the per-parent values are means of heavy-tailed (log-normal) distributions'''
+    members: int = 10_000
+    workspaces: int = 1_000
+    categories: int = 40
+    members_per_workspace: float = 12
+    boards_per_workspace: float = 6
+    tasks_per_board: float = 250
+    comments_per_task: float = 3
+    categories_per_task: float = 1
+    sessions_per_member: float = 1
+
+
+def _skewed(rng, mean, sigma=1.0, minimum=0):
+    '''Log-normal draw with the given mean; a few parents get most of the children'''
+    if mean <= 0:
+        return minimum
+    mu = math.log(mean) - sigma * sigma / 2
+    return max(minimum, int(round(rng.lognormvariate(mu, sigma))))
+
+
+def _popular(rng, n):
+    '''Index in [0, n) biased toward 0, so some members/categories are much busier'''
+    return min(n - 1, int(n * rng.random() ** 2.5))
+
+
+def _shape(seed, scale, ws_no):
+    '''Board count and per-board task counts of one workspace (cheap, used to assign ids)'''
+    rng = random.Random(f"{seed}:shape:{ws_no}")
+    boards = _skewed(rng, scale.boards_per_workspace, minimum=1)
+    return [_skewed(rng, scale.tasks_per_board, sigma=1.2) for _ in range(boards)]
+
+
+def _text(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class _Copier:
+    '''
+    Buffers rows per table and COPYs them in bounded batches. Buffers are always flushed
+    together, in the order tables were first seen, so parents land before children.
+    '''
+
+    def __init__(self, cur):
+        self.cur = cur
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, table, columns, row):
+        key = (table, columns)
+        buf = self.buffers.setdefault(key, [])
+        buf.append("\t".join(_text(v) for v in row))
+        if len(buf) >= COPY_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        for k in list(self.buffers):
+            rows = self.buffers.get(k)
+            if not rows:
+                continue
+            table, columns = k
+            data = io.StringIO("\n".join(rows) + "\n")
+            self.cur.copy_expert(f"COPY dev.{table} ({', '.join(columns)}) FROM STDIN", data)
+            self.counts[table] = self.counts.get(table, 0) + len(rows)
+            self.buffers[k] = []
+
+
+def _open_loader():
+    '''
+    Connection for bulk loading. Generated rows are consistent by construction, so FK
+    triggers are skipped when the role is allowed to (superuser); otherwise they run.
+    '''
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        cur.execute("SET session_replication_role = replica;")
+    except psycopg2.Error:
+        conn.rollback()
+    return conn, _Copier(cur)
+
+
+def _base_ids(cur):
+    ids = {}
+    for table in ("member", "workspace", "board", "task", "category"):
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM dev.{table};")
+        ids[table] = cur.fetchone()[0]
+    cur.execute("SELECT id, value FROM dev.task_status;")
+    ids["status"] = {v: i for i, v in cur.fetchall()}
+    cur.execute("SELECT id, level FROM dev.task_priority;")
+    ids["priority"] = {v: i for i, v in cur.fetchall()}
+    cur.execute("SELECT id, name FROM dev.role;")
+    ids["role"] = {v: i for i, v in cur.fetchall()}
+    return ids
+
+
+def _load_members(job):
+    seed, scale, base, first, last = job
+    now = datetime(2025, 1, 1)
+    conn, copier = _open_loader()
+    for n in range(first, last):
+        rng = random.Random(f"{seed}:member:{n}")
+        mid = base["member"] + n
+        fn, ln = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        copier.add("member", ("id", "first_name", "last_name", "username", "email", "handle", "joined_on", "status"),
+                   (mid, fn, ln, f"gen_{n}", f"gen_{n}@example.com", f"@gen_{n}",
+                    now - timedelta(days=rng.randint(0, 900)), "suspended" if rng.random() < 0.02 else "active"))
+        copier.add("auth_credentials", ("member_id", "password_hash"), (mid, GEN_PASSWORD_HASH))
+        for _ in range(_skewed(rng, scale.sessions_per_member)):
+            created = now + timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+            copier.add("auth_sessions", ("member_id", "token", "created_at", "last_used", "expires_at", "revoked"),
+                       (mid, "%032x" % rng.getrandbits(128), created, created,
+                        created + timedelta(minutes=30), rng.random() < 0.3))
+    copier.flush()
+    conn.commit()
+    conn.close()
+    return copier.counts
+
+
+def _load_workspaces(job):
+    '''Everything below a range of workspaces: memberships, boards, tasks, categories, comments'''
+    seed, scale, base, first, last, board_offset, task_offset = job
+    today = date(2025, 6, 1)
+    statuses = [base["status"][s] for s in STATUS_WEIGHTS if s in base["status"]]
+    status_w = [STATUS_WEIGHTS[s] for s in STATUS_WEIGHTS if s in base["status"]]
+    priorities = [base["priority"][p] for p in PRIORITY_WEIGHTS if p in base["priority"]]
+    priority_w = [PRIORITY_WEIGHTS[p] for p in PRIORITY_WEIGHTS if p in base["priority"]]
+    roles = base["role"]
+
+    conn, copier = _open_loader()
+    board_id, task_id = board_offset, task_offset
+    for ws_no in range(first, last):
+        rng = random.Random(f"{seed}:ws:{ws_no}")
+        ws_id = base["workspace"] + ws_no
+        members = sorted({base["member"] + 1 + _popular(rng, scale.members)
+                          for _ in range(_skewed(rng, scale.members_per_workspace, minimum=1))})
+        owner = members[0]
+        copier.add("workspace", ("id", "name", "slug", "description", "created_by"),
+                   (ws_id, f"Workspace {ws_no}", f"ws-{ws_no}", f"Generated workspace {ws_no}", owner))
+        for m in members:
+            copier.add("member_workspace", ("member_id", "workspace_id"), (m, ws_id))
+
+        for b_no, task_count in enumerate(_shape(seed, scale, ws_no), start=1):
+            board_id += 1
+            copier.add("board", ("id", "workspace_id", "title", "description", "created_by"),
+                       (board_id, ws_id, f"Board {b_no}", f"Board {b_no} of workspace {ws_no}", owner))
+            board_members = [m for m in members if m == owner or rng.random() < 0.6]
+            for m in board_members:
+                role = roles.get("Admin") if m == owner else roles.get("Member" if rng.random() < 0.8 else "Viewer")
+                copier.add("member_board", ("member_id", "board_id", "role_id"), (m, board_id, role))
+
+            for t_no in range(task_count):
+                task_id += 1
+                created = datetime(2025, 1, 1) + timedelta(minutes=rng.randint(0, 60 * 24 * 150))
+                due = NO_DUE_DATE if rng.random() < 0.2 else today + timedelta(days=rng.randint(-90, 120))
+                assignee = board_members[_popular(rng, len(board_members))] if rng.random() < 0.85 else None
+                copier.add("task", ("id", "board_id", "workspace_id", "title", "description", "points", "priority",
+                                    "status_id", "created_by", "created_on", "assigned_to", "due_date"),
+                           (task_id, board_id, ws_id, f"{rng.choice(VERBS)} {rng.choice(NOUNS)} #{t_no}",
+                            "Generated task", rng.choice((None, 1, 2, 3, 5, 8, 13)),
+                            rng.choices(priorities, priority_w)[0] if priorities else None,
+                            rng.choices(statuses, status_w)[0] if statuses else None,
+                            rng.choice(board_members), created, assignee, due))
+                for cat in {_popular(rng, scale.categories) for _ in range(_skewed(rng, scale.categories_per_task))}:
+                    copier.add("task_categories", ("task_id", "category_id"), (task_id, base["category"] + 1 + cat))
+                for c_no in range(_skewed(rng, scale.comments_per_task, sigma=1.5)):
+                    copier.add("task_comments", ("task_id", "board_id", "workspace_id", "author_id", "created_on", "message"),
+                               (task_id, board_id, ws_id, rng.choice(board_members),
+                                created + timedelta(minutes=10 * (c_no + 1)), f"Generated comment {c_no}"))
+    copier.flush()
+    conn.commit()
+    conn.close()
+    return copier.counts
+
+
+def _chunks(total, size):
+    return [(i, min(i + size, total + 1)) for i in range(1, total + 1, size)]
+
+
+def generate(scale: Scale = Scale(), seed: int = 0, workers: int = None, rebuild: bool = False, verbose: bool = True):
+    '''Load a synthetic dataset; returns {table: rows loaded}'''
+    workers = workers or os.cpu_count() or 1
+    if rebuild:
+        exec_sql_file("src/db/schema.sql")
+        exec_sql_file("src/db/seed.sql")
+
+    conn = connect()
+    cur = conn.cursor()
+    base = _base_ids(cur)
+    conn.close()
+
+    def log(msg):
+        if verbose:
+            print(msg, flush=True)
+
+    started = time.perf_counter()
+    totals = {}
+
+    # categories are global and tiny
+    rng = random.Random(f"{seed}:categories")
+    conn, copier = _open_loader()
+    for c in range(1, scale.categories + 1):
+        copier.add("category", ("id", "value", "color"),
+                   (base["category"] + c, f"Category {c}", "#%06x" % rng.getrandbits(24)))
+    copier.flush()
+    conn.commit()
+    conn.close()
+    totals.update(copier.counts)
+
+    # serial shape pass: board/task id offsets for each workspace chunk
+    ws_chunks = _chunks(scale.workspaces, max(1, scale.workspaces // (workers * 16)))
+    jobs = []
+    board_offset, task_offset = base["board"], base["task"]
+    for first, last in ws_chunks:
+        jobs.append((seed, scale, base, first, last, board_offset, task_offset))
+        for ws_no in range(first, last):
+            shape = _shape(seed, scale, ws_no)
+            board_offset += len(shape)
+            task_offset += sum(shape)
+    log(f"  shape: {board_offset - base['board']} boards, {task_offset - base['task']} tasks planned")
+
+    member_jobs = [(seed, scale, base, first, last)
+                   for first, last in _chunks(scale.members, max(1, scale.members // (workers * 4)))]
+    with Pool(workers) as pool:
+        for counts in pool.imap_unordered(_load_members, member_jobs):
+            for k, v in counts.items():
+                totals[k] = totals.get(k, 0) + v
+        log(f"  members loaded in {time.perf_counter() - started:.1f}s")
+        for counts in pool.imap_unordered(_load_workspaces, jobs):
+            for k, v in counts.items():
+                totals[k] = totals.get(k, 0) + v
+
+    # Triggers were off during the load, so short ids and counters are filled in here
+    for table in shortids.TABLES:
+        shortids.backfill(table)
+    counters.check(repair=True)
+
+    conn = connect()
+    cur = conn.cursor()
+    for table in ("member", "workspace", "board", "task", "category"):
+        cur.execute(f"SELECT setval(pg_get_serial_sequence('dev.{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM dev.{table}));")
+    conn.commit()
+    conn.autocommit = True
+    cur.execute("ANALYZE;")
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    rows = sum(totals.values())
+    log(f"  {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    for table, n in sorted(totals.items()):
+        log(f"    dev.{table}: {n}")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS))
+    for field, default in asdict(Scale()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rebuild", action="store_true", help="run schema.sql + seed.sql first")
+    args = parser.parse_args()
+
+    scale = replace(Scale(), **PRESETS.get(args.preset, {}))
+    overrides = {f: getattr(args, f) for f in asdict(scale) if getattr(args, f) is not None}
+    generate(replace(scale, **overrides), seed=args.seed, workers=args.workers, rebuild=args.rebuild)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+'''
+Nested payloads assembled by Postgres (json_build_object / json_agg).
+
+The row-based queries return one row per (parent, child) pair, so parent columns are
+repeated for every child on the wire and re-grouped in Python. These queries return a
+single JSON document per call, which the routers can send as-is:
+
+    body = documents.member_boards_json(ctx["member_id"])
+    return RawJSONResponse(body)
+'''
+from .swen610_db_utils import exec_get_json
+
+# Same shape as src.models.user.User
+_USER_JSON = """
+    json_build_object('id', m.id, 'username', m.username,
+                      'first_name', m.first_name, 'last_name', m.last_name)
+"""
+
+# List[BoardUsers] for the boards the member belongs to
+SQL_MEMBER_BOARDS_JSON = f"""
+    SELECT COALESCE(json_agg(doc ORDER BY doc_id), '[]'::json)::text
+    FROM (
+        SELECT b.id AS doc_id,
+               json_build_object(
+                   'id', b.id,
+                   'name', b.title,
+                   'description', b.description,
+                   'workspaceName', w.name,
+                   'users', (SELECT COALESCE(json_agg({_USER_JSON} ORDER BY m.username), '[]'::json)
+                             FROM dev.member_board mbu
+                             JOIN dev.member m ON m.id = mbu.member_id
+                             WHERE mbu.board_id = b.id),
+                   'taskCount', (SELECT COALESCE(SUM(c.tasks), 0) FROM dev.board_task_count c WHERE c.board_id = b.id)
+               ) AS doc
+        FROM dev.member_board mb
+        JOIN dev.board b ON b.id = mb.board_id
+        JOIN dev.workspace w ON w.id = b.workspace_id
+        WHERE mb.member_id = %(member_id)s
+          AND b.deleted_at IS NULL AND w.deleted_at IS NULL
+          AND (%(workspace_id)s IS NULL OR b.workspace_id = %(workspace_id)s)
+    ) docs;
+"""
+
+# List[WorkspaceUsers] for the workspaces the member belongs to
+SQL_MEMBER_WORKSPACES_JSON = f"""
+    SELECT COALESCE(json_agg(doc ORDER BY doc_id), '[]'::json)::text
+    FROM (
+        SELECT w.id AS doc_id,
+               json_build_object(
+                   'id', w.id,
+                   'name', w.name,
+                   'description', w.description,
+                   'users', (SELECT COALESCE(json_agg({_USER_JSON} ORDER BY m.username), '[]'::json)
+                             FROM dev.member_workspace mwu
+                             JOIN dev.member m ON m.id = mwu.member_id
+                             WHERE mwu.workspace_id = w.id),
+                   'boardCount', w.board_count
+               ) AS doc
+        FROM dev.member_workspace mw
+        JOIN dev.workspace w ON w.id = mw.workspace_id
+        WHERE mw.member_id = %(member_id)s
+          AND w.deleted_at IS NULL
+    ) docs;
+"""
+
+
+def member_boards_json(member_id: int, workspace_id: int = None) -> bytes:
+    return exec_get_json(SQL_MEMBER_BOARDS_JSON, {"member_id": member_id, "workspace_id": workspace_id})
+
+
+def member_workspaces_json(member_id: int) -> bytes:
+    return exec_get_json(SQL_MEMBER_WORKSPACES_JSON, {"member_id": member_id})
@@ -0,0 +1,92 @@
+'''
+Cross-board task feeds for the dashboard ("My Tasks", "Overdue").
+
+Tasks are read through idx_task_assignee_feed (assigned_to, status_id, due_date, id).
+Postgres cannot merge one index range per status into a single ordered stream, so the
+query has one index-ordered branch per requested status, each stopping after `limit`
+rows, and only the merged page is joined to its display columns. Cost follows the page
+size rather than the number of tasks assigned to the member.
+
+Visibility is checked in the same query: the member must be on the task's board, and
+neither the board nor its workspace may be soft-deleted. OFFSET 0 keeps Postgres from
+turning that EXISTS into a semi-join over all of the member's boards (which it then
+sorts); as a per-row check it lets each branch stop after `limit` index entries.
+'''
+from datetime import date
+from typing import Iterable, Optional, Sequence
+
+from utils import cache
+from .fieldsets import TASK_FIELDS
+from .swen610_db_utils import exec_get_all
+
+NO_STATUS = "none"
+
+STATUSES = cache.register(cache.TTLCache("task_statuses", ttl=300, maxsize=1))
+
+SQL_FEED_BRANCH = """
+    (SELECT t.id, t.due_date FROM dev.task t
+     WHERE t.assigned_to = %(member_id)s AND {status} {filters}
+       AND EXISTS (SELECT 1 FROM dev.member_board mb
+                   JOIN dev.board vb ON vb.id = mb.board_id
+                   JOIN dev.workspace vw ON vw.id = vb.workspace_id
+                   WHERE mb.member_id = %(member_id)s AND mb.board_id = t.board_id
+                     AND vb.deleted_at IS NULL AND vw.deleted_at IS NULL
+                   OFFSET 0)
+     ORDER BY t.due_date, t.id
+     LIMIT %(limit)s)
+"""
+
+
+def status_ids() -> dict:
+    '''Lower-cased status name -> id, plus NO_STATUS -> None'''
+    def load():
+        rows, _ = exec_get_all("SELECT value, id FROM dev.task_status;")
+        return {**{name.lower(): status_id for name, status_id in rows}, NO_STATUS: None}
+    return STATUSES.get_or_load("all", load)
+
+
+def member_tasks(member_id: int, statuses: Optional[Sequence[str]] = None, due_before: date = None,
+                 after: tuple = None, limit: int = 50, fields: Iterable[str] = TASK_FIELDS.default):
+    '''
+    Visible tasks assigned to the member, ordered by (dueDate, id).
+
+    statuses    status names (case-insensitive, NO_STATUS for none); None = every status
+    due_before  only tasks due strictly before this date (the Overdue card passes today)
+    after       (dueDate, id) of the last row of the previous page
+    Raises ValueError for an unknown status name.
+    '''
+    known = status_ids()
+    wanted = list(known) if statuses is None else [s.strip().lower() for s in statuses]
+    unknown = [s for s in wanted if s not in known]
+    if unknown:
+        raise ValueError(f"Unknown status(es): {', '.join(unknown)}")
+
+    filters = ""
+    args = {"member_id": member_id, "limit": limit}
+    if after is not None:
+        filters += " AND (t.due_date, t.id) > (%(after_due)s, %(after_id)s)"
+        args["after_due"], args["after_id"] = after
+    if due_before is not None:
+        filters += " AND t.due_date < %(due_before)s"
+        args["due_before"] = due_before
+
+    branches = []
+    for i, name in enumerate(dict.fromkeys(wanted)):
+        if known[name] is None:
+            status = "t.status_id IS NULL"
+        else:
+            status = f"t.status_id = %(status_{i})s"
+            args[f"status_{i}"] = known[name]
+        branches.append(SQL_FEED_BRANCH.format(status=status, filters=filters))
+
+    # dueDate and id form the cursor, so they are always returned
+    fields = tuple(dict.fromkeys(["id", *fields, "dueDate"]))
+    sql = f"""
+        SELECT {TASK_FIELDS.select_list(fields)},
+               t.workspace_id AS "workspaceId", t.board_id AS "boardId", b.title AS "boardName"
+        FROM {TASK_FIELDS.from_clause(fields)}
+        JOIN ({" UNION ALL ".join(branches)} ORDER BY due_date, id LIMIT %(limit)s) page ON page.id = t.id
+        JOIN dev.board b ON b.id = t.board_id
+        ORDER BY page.due_date, page.id;
+    """
+    return exec_get_all(sql, args)
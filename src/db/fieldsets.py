@@ -0,0 +1,119 @@
+'''
+Sparse fieldsets for list endpoints (?fields=id,title,status).
+
+Each FieldSet maps the public field names of a resource to a SQL expression and the
+joins that expression needs. Only whitelisted names ever reach the SQL text, so the
+SELECT list can be assembled as a plain string and the lookup tables behind unused
+fields are not joined at all:
+
+    fields = TASK_FIELDS.parse(request.query_params.get("fields"))
+    rows, cols = board_tasks(workspace_id, board_id, fields)
+    return rows_response(rows, cols, key="tasks", status="success", total=len(rows))
+'''
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import statements
+from .swen610_db_utils import exec_get_all, exec_get_one
+
+
+class UnknownFieldError(ValueError):
+    def __init__(self, fields: List[str], allowed: Iterable[str]):
+        self.fields = fields
+        self.allowed = sorted(allowed)
+        super().__init__(f"Unknown field(s): {', '.join(fields)}; allowed: {', '.join(self.allowed)}")
+
+
+class FieldSet:
+    def __init__(self, base: str, columns: Dict[str, Tuple[str, Optional[str]]], required: Tuple[str, ...] = ("id",)):
+        '''
+        base     FROM clause with the resource's own alias, e.g. "dev.task t"
+        columns  public name -> (SQL expression, JOIN clause or None)
+        required always selected (keys clients rely on for identity and paging)
+        '''
+        self.base = base
+        self.columns = columns
+        self.required = required
+        self.default = tuple(columns)
+
+    def parse(self, text: Optional[str]) -> Tuple[str, ...]:
+        '''Comma-separated ?fields= value to a validated, de-duplicated tuple; None/empty -> all'''
+        if not text:
+            return self.default
+        wanted = [f.strip() for f in text.split(",") if f.strip()]
+        unknown = [f for f in wanted if f not in self.columns]
+        if unknown:
+            raise UnknownFieldError(unknown, self.columns)
+        return tuple(dict.fromkeys([*self.required, *wanted]))
+
+    def select_list(self, fields: Iterable[str]) -> str:
+        return ", ".join(f'{self.columns[f][0]} AS "{f}"' for f in fields)
+
+    def from_clause(self, fields: Iterable[str]) -> str:
+        joins = dict.fromkeys(self.columns[f][1] for f in fields if self.columns[f][1])
+        return " ".join([self.base, *joins])
+
+
+TASK_FIELDS = FieldSet("dev.task t", {
+    "id": ("t.id", None),
+    "title": ("t.title", None),
+    "description": ("t.description", None),
+    "points": ("t.points", None),
+    "priority": ("tp.level::text", "LEFT JOIN dev.task_priority tp ON tp.id = t.priority"),
+    "status": ("ts.value", "LEFT JOIN dev.task_status ts ON ts.id = t.status_id"),
+    "dueDate": ("t.due_date", None),
+    "creator": ("mc.username", "LEFT JOIN dev.member mc ON mc.id = t.created_by"),
+    "assignee": ("ma.username", "LEFT JOIN dev.member ma ON ma.id = t.assigned_to"),
+    "created_on": ("t.created_on", None),
+    "commentCount": ("t.comment_count", None),
+    "lastCommentAt": ("t.last_comment_at", None),
+})
+
+MEMBER_FIELDS = FieldSet("dev.member m", {
+    "id": ("m.id", None),
+    "username": ("m.username", None),
+    "first_name": ("m.first_name", None),
+    "last_name": ("m.last_name", None),
+    "email": ("m.email", None),
+    "handle": ("m.handle", None),
+    "joined_on": ("m.joined_on", None),
+    "status": ("m.status::text", None),
+})
+
+
+def board_tasks(workspace_id: int, board_id: int, fields: Iterable[str] = TASK_FIELDS.default):
+    sql = f"""
+        SELECT {TASK_FIELDS.select_list(fields)}
+        FROM {TASK_FIELDS.from_clause(fields)}
+        WHERE t.workspace_id = %(workspace_id)s AND t.board_id = %(board_id)s
+        ORDER BY t.id;
+    """
+    return exec_get_all(sql, {"workspace_id": workspace_id, "board_id": board_id})
+
+
+def _board_task_sql(fields: Iterable[str]) -> str:
+    return f"""
+        SELECT {TASK_FIELDS.select_list(fields)}
+        FROM {TASK_FIELDS.from_clause(fields)}
+        WHERE t.id = %(task_id)s AND t.board_id = %(board_id)s AND t.workspace_id = %(workspace_id)s;
+    """
+
+
+# The full task (no ?fields=) is fetched often enough to keep prepared
+TASK_BY_ID = statements.register("task_by_id", _board_task_sql(TASK_FIELDS.default))
+
+
+def board_task(workspace_id: int, board_id: int, task_id: int, fields: Iterable[str] = TASK_FIELDS.default):
+    fields = tuple(fields)
+    sql = TASK_BY_ID if fields == TASK_FIELDS.default else _board_task_sql(fields)
+    return exec_get_one(sql, {"workspace_id": workspace_id, "board_id": board_id, "task_id": task_id})
+
+
+def workspace_members(workspace_id: int, fields: Iterable[str] = MEMBER_FIELDS.default):
+    sql = f"""
+        SELECT {MEMBER_FIELDS.select_list(fields)}
+        FROM {MEMBER_FIELDS.from_clause(fields)}
+        JOIN dev.member_workspace mw ON mw.member_id = m.id
+        WHERE mw.workspace_id = %(workspace_id)s
+        ORDER BY m.username;
+    """
+    return exec_get_all(sql, {"workspace_id": workspace_id})
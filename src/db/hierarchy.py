@@ -0,0 +1,46 @@
+'''
+Resolve a nested resource path (workspace -> board -> task -> comment) in one query.
+
+Every level is a primary-key probe joined on its parent, so the query reports the first
+level that is missing, soft-deleted or does not belong to its parent:
+
+    failed = hierarchy.resolve(workspace_id, board_id, task_id, comment_id)
+    if failed: raise HTTPException(404, hierarchy.NOT_FOUND_MSG[failed])
+'''
+from typing import Optional
+
+from utils import configs
+from . import statements
+from .swen610_db_utils import exec_get_one
+
+LEVELS = ("workspace", "board", "task", "comment")
+
+NOT_FOUND_MSG = {
+    "workspace": configs.WORKSPACE_ERROR_404_MSG,
+    "board": configs.BOARD_ERROR_404_MSG,
+    "task": configs.TASK_ERROR_404_MSG,
+    "comment": configs.COMMENT_ERROR_404_MSG,
+}
+
+SQL_RESOLVE_PATH = """
+    SELECT w.id, b.id, t.id, c.id
+    FROM (SELECT 1) AS path
+    LEFT JOIN dev.workspace w ON w.id = %(workspace_id)s AND w.deleted_at IS NULL
+    LEFT JOIN dev.board b ON b.id = %(board_id)s AND b.workspace_id = w.id AND b.deleted_at IS NULL
+    LEFT JOIN dev.task t ON t.id = %(task_id)s AND t.board_id = b.id
+    LEFT JOIN dev.task_comments c ON c.id = %(comment_id)s AND c.task_id = t.id;
+"""
+# Runs for every nested route
+RESOLVE_PATH = statements.register("resolve_path", SQL_RESOLVE_PATH)
+
+
+def resolve(workspace_id: int, board_id: int = None, task_id: int = None, comment_id: int = None) -> Optional[str]:
+    '''Name of the first level that failed validation, or None when the whole path exists'''
+    requested = (workspace_id, board_id, task_id, comment_id)
+    row, _ = exec_get_one(RESOLVE_PATH, dict(zip(("workspace_id", "board_id", "task_id", "comment_id"), requested)))
+    for level, wanted, found in zip(LEVELS, requested, row):
+        if wanted is None:
+            break
+        if found is None:
+            return level
+    return None
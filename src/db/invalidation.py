@@ -0,0 +1,173 @@
+'''
+Cross-process cache invalidation over Postgres LISTEN/NOTIFY.
+
+Every uvicorn worker and job worker keeps its own in-process caches (utils/cache.py).
+After a write commits, publish an Invalidation: it is applied to this process's caches
+straight away and sent on CHANNEL, where every other process's listener applies it too.
+
+    invalidation.publish(Invalidation("permissions", "board", board_id))
+
+An event names a registered cache, a scope and a key. Scope "key" drops that key, or the
+whole cache when key is None; owners add other scopes with @scope:
+
+    @invalidation.scope("permissions", "board")
+    def _drop_board(board_id): ...
+
+Keys travel as JSON, so lists come back as tuples. NOTIFY is not durable: a listener
+that (re)connects clears every cache, since it may have missed events while it was away.
+'''
+import json
+import logging
+import os
+import select
+import socket
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import psycopg2
+
+from utils import cache, metrics
+from .swen610_db_utils import connect, exec_commit_returning
+
+logger = logging.getLogger("taskmaster.invalidation")
+
+CHANNEL = "taskmaster_invalidate"
+
+_SCOPES: Dict[Tuple[str, str], Callable[[Hashable], None]] = {}
+
+_HOST = socket.gethostname()
+
+
+@dataclass(frozen=True)
+class Invalidation:
+    cache: str
+    scope: str = "key"
+    key: Any = None
+
+
+def scope(cache_name: str, name: str):
+    '''Register how `name`-scoped events for `cache_name` are applied to the local cache'''
+    def register(fn):
+        _SCOPES[(cache_name, name)] = fn
+        return fn
+    return register
+
+
+def _origin() -> str:
+    # Computed per call: forked workers share the parent's module state
+    return f"{_HOST}:{os.getpid()}"
+
+
+def apply(event: Invalidation, source: str = "local"):
+    '''Apply one event to this process's caches'''
+    if event.scope == "key":
+        if event.key is None:
+            cache.invalidate(event.cache)
+        else:
+            cache.invalidate(event.cache, event.key)
+    else:
+        handler = _SCOPES.get((event.cache, event.scope))
+        if handler is None:
+            # An event from a newer deploy: dropping the whole cache is always safe
+            logger.warning("no handler for %s/%s, clearing the cache", event.cache, event.scope)
+            cache.invalidate(event.cache)
+        else:
+            handler(event.key)
+    metrics.CACHE_INVALIDATIONS.inc(event.cache, source)
+
+
+def publish(event: Invalidation):
+    '''Apply locally, then broadcast to the other processes. Call after committing the write.'''
+    apply(event)
+    payload = json.dumps({**asdict(event), "origin": _origin()})
+    try:
+        exec_commit_returning("SELECT pg_notify(%s, %s);", (CHANNEL, payload))
+    except psycopg2.Error as e:
+        # The write is already committed; other processes fall back to their cache TTLs
+        logger.warning("could not publish %s: %r", event, e)
+
+
+def decode(payload: str) -> Tuple[Invalidation, str]:
+    data = json.loads(payload)
+    key = data.get("key")
+    if isinstance(key, list):
+        key = tuple(key)
+    return Invalidation(data["cache"], data.get("scope", "key"), key), data.get("origin")
+
+
+def clear_all():
+    for cached in list(cache.CACHES.values()):
+        cached.clear()
+
+
+class Listener(threading.Thread):
+    '''Applies events published by other processes; reconnects with backoff'''
+
+    def __init__(self, poll_seconds: float = 1.0):
+        super().__init__(name="cache-invalidation", daemon=True)
+        self.poll_seconds = poll_seconds
+        self.connected = threading.Event()
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def handle(self, payload: str):
+        try:
+            event, origin = decode(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("ignoring malformed invalidation %r: %r", payload, e)
+            return
+        if origin != _origin():
+            apply(event, source="remote")
+
+    def _listen(self, conn):
+        conn.autocommit = True
+        conn.cursor().execute(f"LISTEN {CHANNEL};")
+        clear_all()
+        self.connected.set()
+        while not self._stopping.is_set():
+            if select.select([conn], [], [], self.poll_seconds)[0]:
+                conn.poll()
+                while conn.notifies:
+                    self.handle(conn.notifies.pop(0).payload)
+
+    def run(self):
+        backoff = 0.5
+        while not self._stopping.is_set():
+            conn = None
+            try:
+                conn = connect()
+                backoff = 0.5
+                self._listen(conn)
+            except psycopg2.Error as e:
+                self.connected.clear()
+                logger.warning("invalidation listener disconnected, retrying in %.1fs: %r", backoff, e)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+LISTENER = None
+
+
+def start(timeout: float = 5.0) -> Listener:
+    '''Subscribe this process; waits up to `timeout` seconds for the first LISTEN'''
+    global LISTENER
+    if LISTENER is None or not LISTENER.is_alive():
+        LISTENER = Listener()
+        LISTENER.start()
+    if not LISTENER.connected.wait(timeout):
+        logger.warning("invalidation listener not connected after %.1fs; continuing", timeout)
+    return LISTENER
+
+
+def stop():
+    global LISTENER
+    if LISTENER is not None:
+        LISTENER.stop()
+        LISTENER.join(timeout=5)
+        LISTENER = None
@@ -0,0 +1,314 @@
+'''
+Postgres-backed job queue for work that should not run inside a request.
+
+    jobs.enqueue("purge_board", {"id": 7}, priority=50, dedupe_key="purge_board:7")
+
+    @jobs.handler("purge_board")
+    def run_purge(payload, job):
+        ...
+        job.progress(deleted=n)
+
+Workers claim ready jobs with FOR UPDATE SKIP LOCKED, so any number of them can poll
+the same table without blocking each other. Failures are retried with exponential
+backoff up to max_attempts; jobs whose worker died are requeued after
+JOB_VISIBILITY_TIMEOUT_SECONDS. Enqueue sends a NOTIFY so idle workers wake up
+immediately instead of waiting for the next poll.
+
+    python -m src.db.jobs --workers 4
+'''
+import argparse
+import importlib
+import logging
+import multiprocessing
+import os
+import select
+import signal
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from psycopg2.extras import Json
+
+from utils import configs
+from . import invalidation
+from .swen610_db_utils import connect, exec_commit_returning, exec_get_all, exec_get_one
+
+logger = logging.getLogger("taskmaster.jobs")
+
+CHANNEL = "taskmaster_jobs"
+
+# Modules that register handlers; imported by every worker process
+HANDLER_MODULES = ("src.db.purge", "src.db.ratelimit", "src.db.counters", "src.db.activity",
+                   "src.db.reminders")
+
+HANDLERS: Dict[str, Callable] = {}
+PERIODIC: Dict[str, dict] = {}
+
+SQL_ENQUEUE = f"""
+    WITH job AS (
+        INSERT INTO dev.job (kind, payload, priority, run_at, max_attempts, dedupe_key)
+        VALUES (%(kind)s, %(payload)s, %(priority)s, now() + make_interval(secs => %(delay)s),
+                %(max_attempts)s, %(dedupe_key)s)
+        ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+        RETURNING id, kind
+    )
+    SELECT id, pg_notify('{CHANNEL}', kind) FROM job;
+"""
+
+SQL_ENQUEUE_MANY = f"""
+    WITH job AS (
+        INSERT INTO dev.job (kind, payload, priority, run_at, max_attempts, dedupe_key)
+        SELECT %(kind)s, p.payload, %(priority)s, now() + make_interval(secs => %(delay)s), %(max_attempts)s,
+               p.dedupe_key
+        FROM unnest(%(payloads)s::jsonb[], %(dedupe_keys)s::text[]) AS p(payload, dedupe_key)
+        ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+        RETURNING id, kind
+    )
+    SELECT id, pg_notify('{CHANNEL}', kind) FROM job;
+"""
+
+# RETURNING comes back in no particular order: the batch is re-sorted to run by priority
+SQL_CLAIM = """
+    WITH claimed AS (
+        UPDATE dev.job SET status = 'running', attempts = attempts + 1, locked_by = %(worker)s, locked_at = now()
+        WHERE id IN (
+            SELECT id FROM dev.job
+            WHERE status = 'queued' AND run_at <= now() AND kind = ANY(%(kinds)s)
+            ORDER BY priority, run_at, id
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, kind, payload, attempts, max_attempts, priority, run_at
+    )
+    SELECT id, kind, payload, attempts, max_attempts FROM claimed ORDER BY priority, run_at, id;
+"""
+
+SQL_DONE = """
+    UPDATE dev.job SET status = 'done', finished_at = now(), locked_by = NULL WHERE id = %(id)s;
+"""
+
+SQL_FAILED = """
+    UPDATE dev.job SET
+        status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+        run_at = now() + make_interval(secs => LEAST(%(max_backoff)s, power(2, attempts))),
+        finished_at = CASE WHEN attempts >= max_attempts THEN now() END,
+        last_error = %(error)s,
+        locked_by = NULL
+    WHERE id = %(id)s
+    RETURNING status;
+"""
+
+# Doubles as the heartbeat: a job whose worker stops reporting is requeued after
+# JOB_VISIBILITY_TIMEOUT_SECONDS, so long handlers must call job.progress() as they go
+SQL_PROGRESS = """
+    UPDATE dev.job SET progress = %(progress)s, locked_at = now() WHERE id = %(id)s;
+"""
+
+# A job that has used up its attempts (e.g. one that keeps killing its worker) fails instead
+SQL_REQUEUE_STALE = """
+    UPDATE dev.job SET
+        status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+        finished_at = CASE WHEN attempts >= max_attempts THEN now() END,
+        locked_by = NULL,
+        last_error = 'worker lost'
+    WHERE status = 'running' AND locked_at < now() - make_interval(secs => %(timeout)s)
+    RETURNING id, status;
+"""
+
+SQL_JOB_STATUS = """
+    SELECT id, kind, status, priority, attempts, max_attempts, progress, last_error,
+           run_at, created_at, locked_at, finished_at
+    FROM dev.job WHERE id = %(id)s;
+"""
+
+SQL_QUEUE_SUMMARY = """
+    SELECT kind, status, COUNT(*) AS jobs, MIN(run_at) FILTER (WHERE status = 'queued') AS next_run_at
+    FROM dev.job
+    GROUP BY kind, status
+    ORDER BY kind, status;
+"""
+
+
+def handler(kind: str):
+    '''Register fn(payload: dict, job: JobContext) for jobs of this kind'''
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def periodic(kind: str, every_seconds: float, payload: dict = None, priority: int = 200):
+    '''Keep one pending instance of `kind` queued, due every_seconds after the last was scheduled'''
+    PERIODIC[kind] = {"every": every_seconds, "payload": payload or {}, "priority": priority}
+
+
+def enqueue(kind: str, payload: dict = None, priority: int = 100, delay_seconds: float = 0,
+            max_attempts: int = 5, dedupe_key: str = None) -> Optional[int]:
+    '''Queue a job; returns its id, or None when a pending job with the same dedupe_key exists'''
+    row, _ = exec_commit_returning(SQL_ENQUEUE, {
+        "kind": kind, "payload": Json(payload or {}), "priority": priority, "delay": delay_seconds,
+        "max_attempts": max_attempts, "dedupe_key": dedupe_key,
+    })
+    return None if row is None else row[0]
+
+
+def enqueue_many(kind: str, payloads: List[dict], dedupe_keys: List[Optional[str]] = None, priority: int = 100,
+                 delay_seconds: float = 0, max_attempts: int = 5) -> List[int]:
+    '''Queue one job per payload in a single statement; returns the ids of those not deduplicated'''
+    if not payloads:
+        return []
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(SQL_ENQUEUE_MANY, {
+            "kind": kind, "payloads": [Json(p) for p in payloads],
+            "dedupe_keys": dedupe_keys or [None] * len(payloads),
+            "priority": priority, "delay": delay_seconds, "max_attempts": max_attempts,
+        })
+        ids = [job_id for job_id, _ in cur.fetchall()]
+        conn.commit()
+    finally:
+        conn.close()
+    return ids
+
+
+def job_status(job_id: int) -> Optional[dict]:
+    row, columns = exec_get_one(SQL_JOB_STATUS, {"id": job_id})
+    return None if row is None else dict(zip(columns, row))
+
+
+def queue_summary() -> list:
+    rows, columns = exec_get_all(SQL_QUEUE_SUMMARY)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+@dataclass
+class JobContext:
+    id: int
+    kind: str
+    attempts: int
+    worker: "Worker"
+    _last_progress: float = 0.0
+
+    def progress(self, force: bool = False, **values):
+        '''Store progress on the job row and renew its claim; throttled to JOB_PROGRESS_INTERVAL_SECONDS'''
+        now = time.monotonic()
+        if not force and now - self._last_progress < configs.JOB_PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_progress = now
+        self.worker.execute(SQL_PROGRESS, {"id": self.id, "progress": Json(values)})
+
+
+class Worker:
+    def __init__(self, name: str = None, kinds=None, batch_size: int = 1):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.kinds = list(kinds or HANDLERS)
+        self.batch_size = batch_size
+        self.conn = None
+        self.processed = 0
+
+    def execute(self, sql: str, args: dict):
+        cur = self.conn.cursor()
+        cur.execute(sql, args)
+        rows = cur.fetchall() if cur.description else None
+        self.conn.commit()
+        return rows
+
+    def _listen(self):
+        self.conn = connect()
+        self.conn.autocommit = False
+        cur = self.conn.cursor()
+        cur.execute(f"LISTEN {CHANNEL};")
+        self.conn.commit()
+
+    def _wait(self, timeout: float):
+        if select.select([self.conn], [], [], timeout)[0]:
+            self.conn.poll()
+            self.conn.notifies.clear()
+
+    def schedule_periodic(self):
+        for kind, spec in PERIODIC.items():
+            enqueue(kind, spec["payload"], priority=spec["priority"], delay_seconds=spec["every"],
+                    dedupe_key=f"periodic:{kind}")
+        stale = self.execute(SQL_REQUEUE_STALE, {"timeout": configs.JOB_VISIBILITY_TIMEOUT_SECONDS})
+        if stale:
+            failed = sum(1 for _, status in stale if status == "failed")
+            logger.warning("requeued %d jobs from lost workers, failed %d out of attempts", len(stale) - failed, failed)
+
+    def run_one(self, job_id, kind, payload, attempts, max_attempts):
+        ctx = JobContext(job_id, kind, attempts, self)
+        started = time.perf_counter()
+        try:
+            HANDLERS[kind](payload, ctx)
+        except Exception as e:
+            status = self.execute(SQL_FAILED, {"id": job_id, "max_backoff": configs.JOB_MAX_BACKOFF_SECONDS,
+                                               "error": f"{e!r}\n{traceback.format_exc(limit=5)}"})[0][0]
+            logger.warning("job %s (%s) attempt %d/%d failed -> %s: %r",
+                           job_id, kind, attempts, max_attempts, status, e)
+            return
+        self.execute(SQL_DONE, {"id": job_id})
+        self.processed += 1
+        logger.info("job %s (%s) done in %.3fs", job_id, kind, time.perf_counter() - started)
+
+    def run(self, stop=None, idle_exit: bool = False, scheduler: bool = False):
+        '''Claim and run jobs until `stop` is set (or, with idle_exit, until none are ready)'''
+        self._listen()
+        next_tick = 0.0
+        try:
+            while stop is None or not stop.is_set():
+                if scheduler and time.monotonic() >= next_tick:
+                    self.schedule_periodic()
+                    next_tick = time.monotonic() + configs.JOB_POLL_INTERVAL_SECONDS
+                claimed = self.execute(SQL_CLAIM, {"worker": self.name, "kinds": self.kinds, "limit": self.batch_size})
+                for job in claimed:
+                    self.run_one(*job)
+                if not claimed:
+                    if idle_exit:
+                        return self.processed
+                    self._wait(configs.JOB_POLL_INTERVAL_SECONDS)
+        finally:
+            self.conn.close()
+        return self.processed
+
+
+def load_handlers():
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def _worker_main(index: int, stop, batch_size: int):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent sets `stop`
+    load_handlers()
+    invalidation.start()
+    Worker(f"{socket.gethostname()}:{os.getpid()}", batch_size=batch_size).run(stop, scheduler=index == 0)
+
+
+def run_workers(workers: int, batch_size: int = 1):
+    '''Start `workers` processes; the first also schedules periodic jobs and requeues lost ones'''
+    stop = multiprocessing.Event()
+    procs = [multiprocessing.Process(target=_worker_main, args=(i, stop, batch_size), daemon=True)
+             for i in range(workers)]
+    for p in procs:
+        p.start()
+
+    def shutdown(*_):
+        stop.set()
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for p in procs:
+        p.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=configs.JOB_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=1, help="jobs claimed per round trip")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(message)s")
+    run_workers(args.workers, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+'''
+Per-member permission snapshots for RBAC checks.
+
+One query collects a member's workspace memberships, board memberships with the flags of
+their board role, and the flags of any active global role (member_role). The result is
+cached per member, so a protected route authorizes without touching the database:
+
+    snap = permissions.snapshot(ctx["member_id"])
+    if not snap.can(board_id, "edit_board"): ...
+
+Anything that changes memberships, roles or permission rows must call the matching
+invalidate_* function after committing; it is broadcast to every other worker process
+(src/db/invalidation.py).
+'''
+from dataclasses import dataclass
+from typing import Dict, FrozenSet
+
+from utils import cache, configs
+from . import invalidation, statements
+from .invalidation import Invalidation
+from .swen610_db_utils import exec_get_one
+
+PERMISSION_FLAGS = (
+    "view_workspace", "edit_workspace", "delete_workspace",
+    "view_board", "edit_board", "delete_board",
+    "manage_workspace_members", "manage_board_members",
+)
+
+_FLAGS_JSON = "json_build_object(" + ", ".join(f"'{f}', COALESCE(bool_or(p.{f}), FALSE)" for f in PERMISSION_FLAGS) + ")"
+
+SQL_MEMBER_SNAPSHOT = f"""
+    SELECT
+        ARRAY(SELECT mw.workspace_id FROM dev.member_workspace mw
+              JOIN dev.workspace w ON w.id = mw.workspace_id
+              WHERE mw.member_id = %(member_id)s AND w.deleted_at IS NULL),
+        (SELECT COALESCE(json_agg(json_build_object('board_id', x.board_id, 'workspace_id', x.workspace_id,
+                                                    'flags', x.flags)), '[]'::json)
+         FROM (SELECT b.id AS board_id, b.workspace_id, {_FLAGS_JSON} AS flags
+               FROM dev.member_board mb
+               JOIN dev.board b ON b.id = mb.board_id
+               JOIN dev.workspace w ON w.id = b.workspace_id
+               LEFT JOIN dev.permission p ON p.role_id = mb.role_id
+               WHERE mb.member_id = %(member_id)s AND b.deleted_at IS NULL AND w.deleted_at IS NULL
+               GROUP BY b.id, b.workspace_id) x),
+        (SELECT {_FLAGS_JSON}
+         FROM dev.member_role mr
+         JOIN dev.permission p ON p.role_id = mr.role_id
+         WHERE mr.member_id = %(member_id)s
+           AND now() BETWEEN mr.valid_from AND mr.valid_to);
+"""
+MEMBER_SNAPSHOT = statements.register("member_snapshot", SQL_MEMBER_SNAPSHOT)
+
+
+@dataclass(frozen=True)
+class BoardAccess:
+    workspace_id: int
+    flags: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class PermissionSnapshot:
+    member_id: int
+    workspaces: FrozenSet[int]
+    boards: Dict[int, BoardAccess]
+    global_flags: FrozenSet[str]
+
+    def in_workspace(self, workspace_id: int) -> bool:
+        return workspace_id in self.workspaces or "view_workspace" in self.global_flags
+
+    def board(self, workspace_id: int, board_id: int):
+        '''BoardAccess when the member is on this board of this workspace, else None'''
+        access = self.boards.get(board_id)
+        if access is None or access.workspace_id != workspace_id:
+            return None
+        return access
+
+    def can(self, board_id: int, flag: str = None) -> bool:
+        '''Board membership, plus `flag` from the board role or a global role when given'''
+        access = self.boards.get(board_id)
+        if access is None:
+            return False
+        return flag is None or flag in access.flags or flag in self.global_flags
+
+    def can_workspace(self, workspace_id: int, flag: str) -> bool:
+        if flag in self.global_flags:
+            return True
+        return workspace_id in self.workspaces and any(
+            flag in a.flags for a in self.boards.values() if a.workspace_id == workspace_id)
+
+
+PERMISSIONS = cache.register(cache.TTLCache(
+    "permissions", ttl=configs.PERMISSION_CACHE_TTL_SECONDS, maxsize=configs.PERMISSION_CACHE_SIZE))
+
+
+def _set(flags) -> FrozenSet[str]:
+    return frozenset(f for f, on in (flags or {}).items() if on)
+
+
+def load_snapshot(member_id: int) -> PermissionSnapshot:
+    (workspaces, boards, global_flags), _ = exec_get_one(MEMBER_SNAPSHOT, {"member_id": member_id})
+    return PermissionSnapshot(
+        member_id=member_id,
+        workspaces=frozenset(workspaces),
+        boards={b["board_id"]: BoardAccess(b["workspace_id"], _set(b["flags"])) for b in boards},
+        global_flags=_set(global_flags),
+    )
+
+
+def snapshot(member_id: int) -> PermissionSnapshot:
+    return PERMISSIONS.get_or_load(member_id, lambda: load_snapshot(member_id))
+
+
+@invalidation.scope("permissions", "board")
+def _drop_board(board_id: int):
+    PERMISSIONS.invalidate_where(lambda _, snap: board_id in snap.boards)
+
+
+@invalidation.scope("permissions", "workspace")
+def _drop_workspace(workspace_id: int):
+    PERMISSIONS.invalidate_where(lambda _, snap: workspace_id in snap.workspaces)
+
+
+def invalidate_member(member_id: int):
+    '''After adding/removing the member to a workspace or board, or changing their roles'''
+    invalidation.publish(Invalidation("permissions", "key", member_id))
+
+
+def invalidate_board(board_id: int):
+    '''After deleting a board or moving it between workspaces'''
+    invalidation.publish(Invalidation("permissions", "board", board_id))
+
+
+def invalidate_workspace(workspace_id: int):
+    '''After deleting a workspace (its boards and memberships cascade)'''
+    invalidation.publish(Invalidation("permissions", "workspace", workspace_id))
+
+
+def invalidate_all():
+    '''After editing role or permission rows, which can affect every member'''
+    invalidation.publish(Invalidation("permissions"))
@@ -0,0 +1,216 @@
+'''
+Soft delete + batched purge for workspaces and boards.
+
+Deleting a big workspace through ON DELETE CASCADE removes every board, task, comment
+and membership in one statement, holding locks for as long as that takes. Instead the
+route marks the row deleted (hidden from every query at once) and the children are
+removed afterwards in small transactions by a background job (src/db/jobs.py):
+
+    if not purge.soft_delete_board(board_id): raise HTTPException(404, ...)
+    purge.enqueue_purge("board", board_id)
+
+Purges are idempotent and resumable; the periodic purge_sweep job (or
+`python -m src.db.purge`) picks up anything soft-deleted but not yet purged.
+'''
+import argparse
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from . import activity, jobs, permissions
+from .swen610_db_utils import connect, exec_commit_returning, exec_get_all
+
+logger = logging.getLogger("taskmaster.purge")
+
+PURGE_BATCH_ROWS = 5_000
+
+# (table, statement deleting up to %(limit)s rows belonging to board %(board_id)s),
+# leaf tables first so the final cascade has nothing left to do
+BOARD_CHILD_BATCHES = (
+    ("task_comments", """
+        DELETE FROM dev.task_comments WHERE id IN (
+            SELECT c.id FROM dev.task_comments c JOIN dev.task t ON t.id = c.task_id
+            WHERE t.board_id = %(board_id)s LIMIT %(limit)s);
+    """),
+    ("task_categories", """
+        DELETE FROM dev.task_categories WHERE (task_id, category_id) IN (
+            SELECT tc.task_id, tc.category_id FROM dev.task_categories tc JOIN dev.task t ON t.id = tc.task_id
+            WHERE t.board_id = %(board_id)s LIMIT %(limit)s);
+    """),
+    ("task", """
+        DELETE FROM dev.task WHERE id IN (
+            SELECT id FROM dev.task WHERE board_id = %(board_id)s LIMIT %(limit)s);
+    """),
+    ("member_board", """
+        DELETE FROM dev.member_board WHERE id IN (
+            SELECT id FROM dev.member_board WHERE board_id = %(board_id)s LIMIT %(limit)s);
+    """),
+)
+
+SQL_SOFT_DELETE_WORKSPACE = """
+    UPDATE dev.workspace SET deleted_at = now() WHERE id = %(id)s AND deleted_at IS NULL RETURNING id;
+"""
+SQL_SOFT_DELETE_BOARD = """
+    UPDATE dev.board SET deleted_at = now() WHERE id = %(id)s AND deleted_at IS NULL RETURNING id, workspace_id;
+"""
+
+# Progress of purges running in this process, for GET /manage/purges
+PROGRESS: Dict[str, dict] = {}
+
+ProgressFn = Callable[[str, int], None]
+
+
+def soft_delete_workspace(workspace_id: int, actor_id: int = None) -> bool:
+    '''Hide the workspace (and with it its boards); False when missing or already deleted'''
+    row, _ = exec_commit_returning(SQL_SOFT_DELETE_WORKSPACE, {"id": workspace_id})
+    permissions.invalidate_workspace(workspace_id)
+    if row is not None:
+        activity.record("workspace.deleted", workspace_id, actor_id=actor_id)
+    return row is not None
+
+
+def soft_delete_board(board_id: int, actor_id: int = None) -> bool:
+    row, _ = exec_commit_returning(SQL_SOFT_DELETE_BOARD, {"id": board_id})
+    permissions.invalidate_board(board_id)
+    if row is not None:
+        activity.record("board.deleted", row[1], board_id, actor_id=actor_id)
+    return row is not None
+
+
+def _delete_in_batches(cur, conn, table: str, sql: str, args: dict, batch_size: int, report: ProgressFn) -> int:
+    total = 0
+    while True:
+        cur.execute(sql, {**args, "limit": batch_size})
+        deleted = cur.rowcount
+        conn.commit()
+        if deleted == 0:
+            return total
+        total += deleted
+        report(table, total)
+
+
+def _reporter(key: str, progress: Optional[ProgressFn]) -> ProgressFn:
+    state = PROGRESS.setdefault(key, {"started": time.time(), "deleted": {}, "done": False})
+
+    def report(table: str, deleted: int):
+        state["deleted"][table] = deleted
+        if progress is not None:
+            progress(table, deleted)
+    return report
+
+
+def purge_board(board_id: int, batch_size: int = PURGE_BATCH_ROWS, progress: ProgressFn = None) -> dict:
+    '''Remove a soft-deleted board's children in batches of `batch_size`, then the board'''
+    key = f"board:{board_id}"
+    report = _reporter(key, progress)
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT deleted_at IS NOT NULL FROM dev.board WHERE id = %s;", (board_id,))
+        row = cur.fetchone()
+        if row is None or not row[0]:
+            conn.rollback()
+            return PROGRESS.pop(key)
+        for table, sql in BOARD_CHILD_BATCHES:
+            _delete_in_batches(cur, conn, table, sql, {"board_id": board_id}, batch_size, report)
+        cur.execute("DELETE FROM dev.board WHERE id = %s AND deleted_at IS NOT NULL;", (board_id,))
+        conn.commit()
+        report("board", cur.rowcount)
+    finally:
+        conn.close()
+    PROGRESS[key]["done"] = True
+    logger.info("purged %s: %s", key, PROGRESS[key]["deleted"])
+    return PROGRESS.pop(key)
+
+
+def purge_workspace(workspace_id: int, batch_size: int = PURGE_BATCH_ROWS, progress: ProgressFn = None) -> dict:
+    '''Purge every board of a soft-deleted workspace, then its memberships and the row itself'''
+    key = f"workspace:{workspace_id}"
+    report = _reporter(key, progress)
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT deleted_at IS NOT NULL FROM dev.workspace WHERE id = %s;", (workspace_id,))
+        row = cur.fetchone()
+        if row is None or not row[0]:
+            conn.rollback()
+            return PROGRESS.pop(key)
+        # Mark the boards too, so purge_board accepts them and a resumed sweep finds them
+        cur.execute("UPDATE dev.board SET deleted_at = now() WHERE workspace_id = %s AND deleted_at IS NULL;",
+                    (workspace_id,))
+        cur.execute("SELECT id FROM dev.board WHERE workspace_id = %s ORDER BY id;", (workspace_id,))
+        board_ids = [r[0] for r in cur.fetchall()]
+        conn.commit()
+
+        boards_done = 0
+        for board_id in board_ids:
+            purge_board(board_id, batch_size)
+            boards_done += 1
+            report("board", boards_done)
+        _delete_in_batches(cur, conn, "member_workspace", """
+            DELETE FROM dev.member_workspace WHERE id IN (
+                SELECT id FROM dev.member_workspace WHERE workspace_id = %(workspace_id)s LIMIT %(limit)s);
+        """, {"workspace_id": workspace_id}, batch_size, report)
+        cur.execute("DELETE FROM dev.workspace WHERE id = %s AND deleted_at IS NOT NULL;", (workspace_id,))
+        conn.commit()
+        report("workspace", cur.rowcount)
+    finally:
+        conn.close()
+    PROGRESS[key]["done"] = True
+    logger.info("purged %s: %s", key, PROGRESS[key]["deleted"])
+    return PROGRESS.pop(key)
+
+
+def sweep(batch_size: int = PURGE_BATCH_ROWS, progress: ProgressFn = None) -> int:
+    '''Purge everything still soft-deleted; returns the number of workspaces + boards purged'''
+    workspaces, _ = exec_get_all("SELECT id FROM dev.workspace WHERE deleted_at IS NOT NULL ORDER BY deleted_at;")
+    for (workspace_id,) in workspaces:
+        purge_workspace(workspace_id, batch_size, progress)
+    boards, _ = exec_get_all("SELECT id FROM dev.board WHERE deleted_at IS NOT NULL ORDER BY deleted_at;")
+    for (board_id,) in boards:
+        purge_board(board_id, batch_size, progress)
+    return len(workspaces) + len(boards)
+
+
+def enqueue_purge(kind: str, target_id: int):
+    '''Queue purge_workspace / purge_board for a row that was just soft-deleted'''
+    return jobs.enqueue(f"purge_{kind}", {"id": target_id}, priority=150, dedupe_key=f"purge_{kind}:{target_id}")
+
+
+def _job_progress(job):
+    deleted = {}
+
+    def report(table: str, n: int):
+        deleted[table] = n
+        job.progress(**deleted)
+    return report
+
+
+@jobs.handler("purge_workspace")
+def _purge_workspace_job(payload, job):
+    purge_workspace(payload["id"], progress=_job_progress(job))
+
+
+@jobs.handler("purge_board")
+def _purge_board_job(payload, job):
+    purge_board(payload["id"], progress=_job_progress(job))
+
+
+@jobs.handler("purge_sweep")
+def _purge_sweep_job(payload, job):
+    job.progress(force=True, purged=sweep(progress=_job_progress(job)))
+
+
+jobs.periodic("purge_sweep", every_seconds=600)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge soft-deleted workspaces and boards")
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_ROWS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    print(f"purged {sweep(args.batch_size)} workspaces/boards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+'''
+Shared token buckets in Postgres so limits hold across uvicorn workers and hosts.
+
+One UPSERT per request refills and takes its tokens atomically under the row lock;
+`rate_limit_bucket` is UNLOGGED, so losing it on a crash just resets every bucket.
+'''
+import logging
+
+from typing import Optional
+
+import psycopg2
+
+from utils import cache
+from utils.ratelimit import Limit, retry_after
+from . import jobs, sessions
+from .swen610_db_utils import exec_commit_returning
+
+logger = logging.getLogger("taskmaster.ratelimit")
+
+# ON CONFLICT ... DO UPDATE cannot join a derived table, so the refilled level is spelled
+# out inline; statement_timestamp() keeps it identical across the three uses
+_REFILLED = "LEAST(%(burst)s, b.tokens + EXTRACT(EPOCH FROM statement_timestamp() - b.updated_at) * %(rate)s)"
+
+SQL_TAKE_TOKEN = f"""
+    INSERT INTO dev.rate_limit_bucket AS b (key, tokens, allowed, updated_at)
+    VALUES (%(key)s, %(burst)s - %(cost)s, TRUE, statement_timestamp())
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = {_REFILLED} - ({_REFILLED} >= %(cost)s)::int * %(cost)s,
+        allowed = {_REFILLED} >= %(cost)s,
+        updated_at = statement_timestamp()
+    RETURNING tokens, allowed;
+"""
+
+SQL_PURGE_IDLE = """
+    WITH purged AS (
+        DELETE FROM dev.rate_limit_bucket
+        WHERE updated_at < now() - make_interval(secs => %(idle_seconds)s)
+        RETURNING 1
+    )
+    SELECT COUNT(*) FROM purged;
+"""
+
+
+# Only picks the bucket: a token revoked within the TTL still counts against its member.
+# Unknown tokens are cached too (as None), so repeating one costs no query
+TOKEN_MEMBERS = cache.register(cache.TTLCache("rate_limit_tokens", ttl=60, maxsize=100_000))
+
+
+def member_for_token(token: str) -> Optional[int]:
+    '''The token's member for bucket keying; None if it is invalid or the database is unavailable'''
+    try:
+        return TOKEN_MEMBERS.get_or_load(token, lambda: sessions.member_for_token(token))
+    except psycopg2.Error:
+        logger.exception("session lookup failed; limiting by address")
+        return None
+
+
+class PostgresBackend:
+
+    def take(self, key: str, limit: Limit, cost: int = 1):
+        '''(allowed, retry-after seconds); fails open if the database is unavailable'''
+        try:
+            row, _ = exec_commit_returning(SQL_TAKE_TOKEN, {"key": key, "burst": limit.burst, "rate": limit.rate,
+                                                            "cost": cost})
+        except psycopg2.Error:
+            logger.exception("rate limit backend unavailable; allowing request")
+            return True, 0
+        tokens, allowed = row
+        return (True, 0) if allowed else (False, retry_after(float(tokens), limit.rate, cost))
+
+    def purge_idle(self, idle_seconds: int = 3600) -> int:
+        row, _ = exec_commit_returning(SQL_PURGE_IDLE, {"idle_seconds": idle_seconds})
+        return row[0]
+
+
+@jobs.handler("rate_limit_purge")
+def _purge_job(payload, job):
+    job.progress(force=True, purged=PostgresBackend().purge_idle(payload.get("idle_seconds", 3600)))
+
+
+jobs.periodic("rate_limit_purge", every_seconds=3600)
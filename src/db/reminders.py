@@ -0,0 +1,191 @@
+'''
+Due-date reminders: due-soon and overdue notices for a task's assignee (or creator).
+
+    due_soon   due between today and REMINDER_DUE_SOON_DAYS days from now
+    overdue    due before today
+
+The periodic reminders_scan job keeps a high-water mark per kind in reminder_scan and
+reads only the due dates that entered the kind's window since the last run, over the
+partial index idx_task_due (tasks without a due date are not in it), plus the tasks a
+trigger queued in reminder_recheck because their due date or assignee changed. Scan cost
+follows the number of newly due tasks, not the size of the task table.
+
+Reminders are unique per (task, member, kind, due date), so rerunning a scan creates no
+duplicates. Each member's unsent reminders go out in one batch from a send_reminders
+job, of which at most one is pending per member.
+
+    python -m src.db.reminders           # scan now
+'''
+import argparse
+import logging
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from utils import configs, metrics
+from . import feeds, jobs
+from .swen610_db_utils import connect, exec_get_all
+
+logger = logging.getLogger("taskmaster.reminders")
+
+SQL_CLAIM_RECHECKS = "DELETE FROM dev.reminder_recheck RETURNING task_id;"
+
+SQL_HIGH_WATER = "SELECT kind, through FROM dev.reminder_scan FOR UPDATE;"
+
+# The literal sentinel comparison lets the planner use idx_task_due for the window
+SQL_SCAN = """
+    WITH due AS (
+        SELECT id, board_id, status_id, assigned_to, created_by, due_date FROM dev.task
+        WHERE due_date > %(since)s AND due_date <= %(last)s AND due_date <> DATE '9999-12-31'
+        UNION
+        SELECT id, board_id, status_id, assigned_to, created_by, due_date FROM dev.task
+        WHERE id = ANY(%(recheck)s) AND due_date BETWEEN %(first)s AND %(last)s
+    )
+    INSERT INTO dev.reminder (task_id, member_id, kind, due_date)
+    SELECT d.id, COALESCE(d.assigned_to, d.created_by), %(kind)s, d.due_date
+    FROM due d
+    LEFT JOIN dev.board b ON b.id = d.board_id
+    WHERE COALESCE(d.assigned_to, d.created_by) IS NOT NULL
+      AND (d.status_id IS NULL OR d.status_id <> ALL(%(done)s))
+      AND b.deleted_at IS NULL
+    ON CONFLICT DO NOTHING
+    RETURNING member_id;
+"""
+
+SQL_ADVANCE = """
+    INSERT INTO dev.reminder_scan (kind, through) VALUES (%(kind)s, %(through)s)
+    ON CONFLICT (kind) DO UPDATE SET through = EXCLUDED.through, scanned_at = now();
+"""
+
+SQL_UNSENT_MEMBERS = "SELECT DISTINCT member_id FROM dev.reminder WHERE notified_at IS NULL;"
+
+SQL_TAKE_UNSENT = """
+    UPDATE dev.reminder r SET notified_at = now()
+    FROM dev.task t
+    WHERE r.member_id = %(member_id)s AND r.notified_at IS NULL AND t.id = r.task_id
+    RETURNING r.id, r.kind, r.due_date, r.task_id, t.title, t.board_id, t.workspace_id;
+"""
+
+SQL_MEMBER_REMINDERS = """
+    SELECT r.id, r.kind, r.due_date AS "dueDate", r.task_id AS "taskId", t.title,
+           t.board_id AS "boardId", t.workspace_id AS "workspaceId", r.created_at AS "createdAt"
+    FROM dev.reminder r
+    JOIN dev.task t ON t.id = r.task_id
+    WHERE r.member_id = %(member_id)s
+    ORDER BY r.id DESC
+    LIMIT %(limit)s;
+"""
+
+
+def windows(today: date) -> List[Tuple[str, date, date]]:
+    '''(kind, first, last): the due dates each kind covers today'''
+    return [
+        ("due_soon", today, today + timedelta(days=configs.REMINDER_DUE_SOON_DAYS)),
+        ("overdue", date.min, today - timedelta(days=1)),
+    ]
+
+
+def _done_status_ids() -> List[int]:
+    ids = feeds.status_ids()
+    return [ids[name] for name in configs.REMINDER_DONE_STATUSES if ids.get(name) is not None]
+
+
+def scan(today: date = None) -> dict:
+    '''Create the reminders that became due since the last scan; returns {kind: created}'''
+    today = today or date.today()
+    done = _done_status_ids()
+    created, members = {}, set()
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        # Locks the high-water marks: a second scanner waits, then starts where this one stopped
+        cur.execute(SQL_HIGH_WATER)
+        through = dict(cur.fetchall())
+        cur.execute(SQL_CLAIM_RECHECKS)
+        recheck = [task_id for (task_id,) in cur.fetchall()]
+        for kind, first, last in windows(today):
+            since = through.get(kind, today - timedelta(days=configs.REMINDER_CATCHUP_DAYS + 1))
+            if first > since:
+                since = first - timedelta(days=1)
+            cur.execute(SQL_SCAN, {"kind": kind, "since": since, "first": first, "last": last,
+                                   "recheck": recheck, "done": done})
+            new = [member_id for (member_id,) in cur.fetchall()]
+            members.update(new)
+            created[kind] = len(new)
+            if last > since:
+                cur.execute(SQL_ADVANCE, {"kind": kind, "through": last})
+        conn.commit()
+    finally:
+        conn.close()
+    for kind, n in created.items():
+        metrics.REMINDERS.inc(kind, "created", amount=n)
+    if members:
+        logger.info("created reminders %s for %d members (%d rechecked tasks)", created, len(members), len(recheck))
+    queue_deliveries()
+    return created
+
+
+def queue_deliveries() -> List[int]:
+    '''One send_reminders job per member with unsent reminders, unless one is pending already'''
+    rows, _ = exec_get_all(SQL_UNSENT_MEMBERS)
+    members = sorted(member_id for (member_id,) in rows)
+    return jobs.enqueue_many("send_reminders", [{"member_id": m} for m in members],
+                             [f"reminders:{m}" for m in members],
+                             delay_seconds=configs.REMINDER_BATCH_DELAY_SECONDS)
+
+
+def deliver(member_id: int, reminders: List[dict]):
+    '''
+    Hand one member's batch to the notification channel. There is no e-mail or push
+    channel yet: the batch is logged, and members read it from GET /me/reminders.
+    '''
+    logger.info("member %s: %d reminders (%s)", member_id, len(reminders),
+                ", ".join(f"{r['kind']} #{r['task_id']}" for r in reminders))
+
+
+def send(member_id: int) -> int:
+    '''Mark the member's unsent reminders sent and deliver them as one batch'''
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(SQL_TAKE_UNSENT, {"member_id": member_id})
+        columns = [c.name for c in cur.description]
+        batch = [dict(zip(columns, row)) for row in cur.fetchall()]
+        if batch:
+            deliver(member_id, batch)
+        # Only marked sent once delivered: a failed delivery rolls back and the job retries
+        conn.commit()
+    finally:
+        conn.close()
+    for r in batch:
+        metrics.REMINDERS.inc(r["kind"], "sent")
+    return len(batch)
+
+
+def member_reminders(member_id: int, limit: int = 50) -> Tuple[list, list]:
+    '''The member's latest reminders, newest first, as (rows, columns)'''
+    return exec_get_all(SQL_MEMBER_REMINDERS, {"member_id": member_id, "limit": limit})
+
+
+@jobs.handler("reminders_scan")
+def _scan_job(payload, job):
+    job.progress(force=True, created=scan())
+
+
+@jobs.handler("send_reminders")
+def _send_job(payload, job):
+    job.progress(force=True, sent=send(payload["member_id"]))
+
+
+jobs.periodic("reminders_scan", every_seconds=configs.REMINDER_SCAN_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan for due-soon and overdue tasks")
+    parser.add_argument("--today", type=date.fromisoformat, help="scan as of this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    print(scan(args.today))
+
+
+if __name__ == "__main__":
+    main()
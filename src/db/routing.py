@@ -0,0 +1,90 @@
+'''
+Read routing between the primary and read replicas.
+
+Replicas are listed under `replicas:` in config/db.yml (each entry overrides the
+primary's connection settings, usually just host/port) or in TASKMASTER_DB_REPLICAS
+("host:port,host:port"). Inside a request, exec_get_one / exec_get_all / exec_get_json
+run on a healthy replica whose replay lag is under DB_REPLICA_MAX_LAG_SECONDS; writes,
+explicit connections and everything outside a request stay on the primary, so jobs
+and scripts that read what they just wrote never see a lagging copy.
+
+Read-your-writes: a request that writes is pinned to the primary for the rest of the
+request, and ReadYourWritesMiddleware hands the client a cookie that keeps its next
+requests on the primary for DB_READ_YOUR_WRITES_SECONDS, whichever worker serves them.
+'''
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from utils import configs
+
+_session = ContextVar("read_session", default=None)
+
+
+class ReadSession:
+    def __init__(self, pinned: bool = False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def session(pinned: bool = False):
+    '''Let reads in this block use replicas (the middleware opens one per request)'''
+    current = ReadSession(pinned)
+    token = _session.set(current)
+    try:
+        yield current
+    finally:
+        _session.reset(token)
+
+
+def mark_write():
+    current = _session.get()
+    if current is not None:
+        current.wrote = True
+
+
+def replicas_allowed() -> bool:
+    current = _session.get()
+    return current is not None and not (current.pinned or current.wrote)
+
+
+@dataclass
+class Replica:
+    name: str
+    args: dict
+    healthy: bool = False
+    lag: Optional[float] = None
+    checked_at: Optional[float] = None
+    error: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def due(self, now: float) -> bool:
+        return self.checked_at is None or now - self.checked_at >= configs.DB_REPLICA_CHECK_SECONDS
+
+    def usable(self) -> bool:
+        return self.healthy and self.lag is not None and self.lag <= configs.DB_REPLICA_MAX_LAG_SECONDS
+
+    def record(self, lag: Optional[float] = None, error: Exception = None):
+        self.checked_at = time.monotonic()
+        self.healthy = error is None
+        self.lag = lag if error is None else None
+        self.error = None if error is None else repr(error)
+
+    def status(self) -> dict:
+        return {"name": self.name, "healthy": self.healthy, "lag_seconds": self.lag, "usable": self.usable(),
+                "error": self.error}
+
+
+# Replay lag in seconds: 0 when everything received has been replayed (an idle primary
+# would otherwise look ever more behind), else the age of the last replayed commit
+SQL_REPLICA_LAG = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END;
+"""
@@ -1,6 +1,13 @@
 CREATE SCHEMA IF NOT EXISTS dev;
 SET search_path TO dev;
 
+DROP TABLE IF EXISTS reminder CASCADE;
+DROP TABLE IF EXISTS reminder_scan CASCADE;
+DROP TABLE IF EXISTS reminder_recheck CASCADE;
+DROP TABLE IF EXISTS activity CASCADE;
+DROP TABLE IF EXISTS job CASCADE;
+DROP TABLE IF EXISTS board_task_count CASCADE;
+DROP TABLE IF EXISTS rate_limit_bucket CASCADE;
 DROP TABLE IF EXISTS auth_sessions CASCADE;
 DROP TABLE IF EXISTS auth_credentials CASCADE;
 DROP TABLE IF EXISTS group_member CASCADE;
@@ -41,10 +48,13 @@ CREATE TABLE IF NOT EXISTS member (
 CREATE TABLE IF NOT EXISTS workspace (
     id SERIAL PRIMARY KEY,
     name VARCHAR(50) UNIQUE NOT NULL,
-    slug VARCHAR(50) NOT NULL,
+    slug VARCHAR(50) UNIQUE NOT NULL,
+    short_id VARCHAR(16) UNIQUE,
     description TEXT,
     created_on TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    created_by int REFERENCES member(id)
+    created_by int REFERENCES member(id),
+    board_count INT NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP
 );
 
 -----member_workspace--------
@@ -61,9 +71,11 @@ CREATE TABLE IF NOT EXISTS board (
     id SERIAL PRIMARY KEY,
     workspace_id INT REFERENCES workspace(id) ON DELETE CASCADE,
     title VARCHAR(50) NOT NULL,
+    short_id VARCHAR(16) UNIQUE,
     description TEXT,
     created_on TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    created_by int REFERENCES member(id)
+    created_by int REFERENCES member(id),
+    deleted_at TIMESTAMP
 );
 
 ---------role----------
@@ -139,7 +151,9 @@ CREATE TABLE IF NOT EXISTS task (
     created_by INT REFERENCES member(id),
     created_on TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     assigned_to INT REFERENCES member(id) ON DELETE SET NULL,
-    due_date DATE NOT NULL DEFAULT '9999-12-31'
+    due_date DATE NOT NULL DEFAULT '9999-12-31',
+    comment_count INT NOT NULL DEFAULT 0,
+    last_comment_at TIMESTAMP
 );
 
 ----------task_categories----------
@@ -221,4 +235,335 @@ CREATE TABLE IF NOT EXISTS auth_sessions (
 );
 
 CREATE INDEX IF NOT EXISTS idx_auth_sessions_token ON auth_sessions(token);
-CREATE INDEX IF NOT EXISTS idx_auth_sessions_user ON auth_sessions(member_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_auth_sessions_user ON auth_sessions(member_id);
+
+----------------foreign key indexes-------------------
+
+-- Postgres does not index referencing columns; without these every cascading delete
+-- (and every membership/task lookup by parent) scans the child table
+CREATE INDEX IF NOT EXISTS idx_member_workspace_member ON member_workspace(member_id);
+CREATE INDEX IF NOT EXISTS idx_member_workspace_workspace ON member_workspace(workspace_id);
+CREATE INDEX IF NOT EXISTS idx_board_workspace ON board(workspace_id);
+CREATE INDEX IF NOT EXISTS idx_member_board_member ON member_board(member_id);
+CREATE INDEX IF NOT EXISTS idx_member_board_board ON member_board(board_id);
+CREATE INDEX IF NOT EXISTS idx_task_board ON task(board_id);
+CREATE INDEX IF NOT EXISTS idx_task_workspace ON task(workspace_id);
+CREATE INDEX IF NOT EXISTS idx_task_categories_category ON task_categories(category_id);
+CREATE INDEX IF NOT EXISTS idx_task_comments_board ON task_comments(board_id);
+CREATE INDEX IF NOT EXISTS idx_task_comments_workspace ON task_comments(workspace_id);
+
+-- Cross-board "my tasks" feed (src/db/feeds.py): one ordered range per (member, status);
+-- also serves the assigned_to foreign key
+CREATE INDEX IF NOT EXISTS idx_task_assignee_feed ON task(assigned_to, status_id, due_date, id);
+
+-- Reminder scans (src/db/reminders.py) read a due-date window; tasks without a due date
+-- (the 9999-12-31 sentinel, usually most of them) are left out of the index
+CREATE INDEX IF NOT EXISTS idx_task_due ON task(due_date, id) WHERE due_date <> '9999-12-31';
+
+-- Comment threads (src/db/threads.py) page through this in either direction; it also
+-- serves the task_id foreign key and MAX(created_on) for task.last_comment_at
+CREATE INDEX IF NOT EXISTS idx_task_comments_thread ON task_comments(task_id, created_on, id);
+
+-- Soft-deleted rows waiting for src/db/purge.py
+CREATE INDEX IF NOT EXISTS idx_workspace_deleted ON workspace(deleted_at) WHERE deleted_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_board_deleted ON board(deleted_at) WHERE deleted_at IS NOT NULL;
+
+----------------short ids-------------------
+
+-- Same digest as utils.tools.hash_given_entity(f"{kind}:{id}", len)
+CREATE OR REPLACE FUNCTION short_hash(kind TEXT, id INT, len INT) RETURNS TEXT AS $$
+  SELECT left(encode(sha256(convert_to(kind || ':' || id, 'UTF8')), 'hex'), len)
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Computed once on insert; on a collision the hash is lengthened two characters at a
+-- time (src/db/shortids.py applies the same rule when backfilling bulk loads)
+CREATE OR REPLACE FUNCTION assign_short_id() RETURNS trigger AS $$
+DECLARE
+  len INT := TG_ARGV[0]::int;
+  taken BOOLEAN;
+BEGIN
+  IF NEW.short_id IS NOT NULL THEN
+    RETURN NEW;
+  END IF;
+  LOOP
+    NEW.short_id := dev.short_hash(TG_TABLE_NAME, NEW.id, len);
+    EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I.%I WHERE short_id = $1)', TG_TABLE_SCHEMA, TG_TABLE_NAME)
+      INTO taken USING NEW.short_id;
+    EXIT WHEN NOT taken;
+    len := len + 2;
+  END LOOP;
+  RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+-- A slug already in use gets the workspace's short id appended instead of failing
+CREATE OR REPLACE FUNCTION dedupe_workspace_slug() RETURNS trigger AS $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM dev.workspace w WHERE w.slug = NEW.slug AND w.id <> NEW.id) THEN
+    NEW.slug := left(NEW.slug, 49 - length(NEW.short_id)) || '-' || NEW.short_id;
+  END IF;
+  RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+-- Trigger names sort so the short id exists before the slug check runs
+CREATE TRIGGER trg_workspace_short_id BEFORE INSERT ON workspace
+  FOR EACH ROW EXECUTE FUNCTION assign_short_id(6);
+CREATE TRIGGER trg_workspace_slug BEFORE INSERT OR UPDATE OF slug ON workspace
+  FOR EACH ROW EXECUTE FUNCTION dedupe_workspace_slug();
+CREATE TRIGGER trg_board_short_id BEFORE INSERT ON board
+  FOR EACH ROW EXECUTE FUNCTION assign_short_id(6);
+
+
+----------------rate limiting-------------------
+
+-- Shared token buckets (src/db/ratelimit.py); UNLOGGED since losing them only resets limits
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_bucket (
+  key         TEXT PRIMARY KEY,
+  tokens      DOUBLE PRECISION NOT NULL,
+  allowed     BOOLEAN NOT NULL DEFAULT TRUE,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_bucket_updated ON rate_limit_bucket(updated_at);
+
+----------------background jobs-------------------
+
+-- Queue for src/db/jobs.py; workers claim with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS job (
+  id            BIGSERIAL PRIMARY KEY,
+  kind          VARCHAR(50) NOT NULL,
+  payload       JSONB NOT NULL DEFAULT '{}',
+  status        VARCHAR(10) NOT NULL DEFAULT 'queued'
+              CHECK (status IN ('queued', 'running', 'done', 'failed')),
+  priority      SMALLINT NOT NULL DEFAULT 100,        -- lower runs first
+  run_at        TIMESTAMPTZ NOT NULL DEFAULT now(),
+  attempts      INT NOT NULL DEFAULT 0,
+  max_attempts  INT NOT NULL DEFAULT 5,
+  dedupe_key    TEXT,
+  progress      JSONB,
+  last_error    TEXT,
+  locked_by     TEXT,
+  locked_at     TIMESTAMPTZ,
+  created_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+  finished_at   TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_ready ON job(priority, run_at, id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_job_running ON job(locked_at) WHERE status = 'running';
+-- At most one pending instance per dedupe key (periodic jobs, "purge board 7")
+CREATE UNIQUE INDEX IF NOT EXISTS idx_job_dedupe ON job(dedupe_key) WHERE status IN ('queued', 'running');
+
+
+----------------denormalized counters-------------------
+
+-- Listing endpoints read these instead of COUNT(*). The statement-level triggers below
+-- apply one aggregated delta per parent and statement, so a COPY or bulk import costs
+-- one counter update per board rather than one per row; src/db/counters.py checks them
+-- against real counts and repairs drift. status_id 0 stands for "no status".
+CREATE TABLE IF NOT EXISTS board_task_count (
+  board_id   INT NOT NULL REFERENCES board(id) ON DELETE CASCADE,
+  status_id  INT NOT NULL DEFAULT 0,
+  tasks      INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (board_id, status_id)
+);
+
+CREATE OR REPLACE FUNCTION count_board_tasks() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO dev.board_task_count AS c (board_id, status_id, tasks)
+    SELECT board_id, COALESCE(status_id, 0), COUNT(*) FROM new_rows WHERE board_id IS NOT NULL GROUP BY 1, 2
+    ON CONFLICT (board_id, status_id) DO UPDATE SET tasks = c.tasks + EXCLUDED.tasks;
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE dev.board_task_count c SET tasks = c.tasks - d.n
+    FROM (SELECT board_id, COALESCE(status_id, 0) AS status_id, COUNT(*) AS n FROM old_rows GROUP BY 1, 2) d
+    WHERE c.board_id = d.board_id AND c.status_id = d.status_id;
+  ELSE
+    INSERT INTO dev.board_task_count AS c (board_id, status_id, tasks)
+    SELECT board_id, status_id, SUM(n) FROM (
+      SELECT board_id, COALESCE(status_id, 0) AS status_id, 1 AS n FROM new_rows
+      UNION ALL
+      SELECT board_id, COALESCE(status_id, 0), -1 FROM old_rows
+    ) d
+    WHERE board_id IS NOT NULL
+    GROUP BY 1, 2 HAVING SUM(n) <> 0
+    ON CONFLICT (board_id, status_id) DO UPDATE SET tasks = c.tasks + EXCLUDED.tasks;
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- Live (not soft-deleted) boards per workspace
+CREATE OR REPLACE FUNCTION count_workspace_boards() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    UPDATE dev.workspace w SET board_count = w.board_count + d.n
+    FROM (SELECT workspace_id, COUNT(*) AS n FROM new_rows WHERE deleted_at IS NULL GROUP BY 1) d
+    WHERE w.id = d.workspace_id;
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE dev.workspace w SET board_count = w.board_count - d.n
+    FROM (SELECT workspace_id, COUNT(*) AS n FROM old_rows WHERE deleted_at IS NULL GROUP BY 1) d
+    WHERE w.id = d.workspace_id;
+  ELSE
+    UPDATE dev.workspace w SET board_count = w.board_count + d.n
+    FROM (
+      SELECT workspace_id, SUM(n) AS n FROM (
+        SELECT workspace_id, 1 AS n FROM new_rows WHERE deleted_at IS NULL
+        UNION ALL
+        SELECT workspace_id, -1 FROM old_rows WHERE deleted_at IS NULL
+      ) x GROUP BY 1 HAVING SUM(n) <> 0
+    ) d
+    WHERE w.id = d.workspace_id;
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- Comment count and latest comment time per task; after a delete (or a comment moved or
+-- re-dated) the latest time is re-read from the end of idx_task_comments_thread
+CREATE OR REPLACE FUNCTION count_task_comments() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    UPDATE dev.task t SET comment_count = t.comment_count + d.n,
+                          last_comment_at = GREATEST(t.last_comment_at, d.latest)
+    FROM (SELECT task_id, COUNT(*) AS n, MAX(created_on) AS latest FROM new_rows GROUP BY 1) d
+    WHERE t.id = d.task_id;
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE dev.task t SET comment_count = t.comment_count - d.n,
+                          last_comment_at = (SELECT MAX(c.created_on) FROM dev.task_comments c WHERE c.task_id = t.id)
+    FROM (SELECT task_id, COUNT(*) AS n FROM old_rows GROUP BY 1) d
+    WHERE t.id = d.task_id;
+  ELSE
+    -- Edits that keep the task and timestamp (the usual message update) touch nothing
+    UPDATE dev.task t SET comment_count = t.comment_count + d.n,
+                          last_comment_at = (SELECT MAX(c.created_on) FROM dev.task_comments c WHERE c.task_id = t.id)
+    FROM (
+      SELECT task_id, SUM(n) AS n FROM (
+        SELECT nr.task_id, 1 AS n FROM new_rows nr JOIN old_rows o ON o.id = nr.id
+        WHERE nr.task_id IS DISTINCT FROM o.task_id OR nr.created_on <> o.created_on
+        UNION ALL
+        SELECT o.task_id, -1 FROM new_rows nr JOIN old_rows o ON o.id = nr.id
+        WHERE nr.task_id IS DISTINCT FROM o.task_id OR nr.created_on <> o.created_on
+      ) x GROUP BY 1
+    ) d
+    WHERE t.id = d.task_id;
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow only one event per trigger, hence three of each
+CREATE TRIGGER trg_task_count_insert AFTER INSERT ON task
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_board_tasks();
+CREATE TRIGGER trg_task_count_update AFTER UPDATE ON task
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_board_tasks();
+CREATE TRIGGER trg_task_count_delete AFTER DELETE ON task
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION count_board_tasks();
+
+CREATE TRIGGER trg_board_count_insert AFTER INSERT ON board
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_workspace_boards();
+CREATE TRIGGER trg_board_count_update AFTER UPDATE ON board
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_workspace_boards();
+CREATE TRIGGER trg_board_count_delete AFTER DELETE ON board
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION count_workspace_boards();
+
+CREATE TRIGGER trg_comment_count_insert AFTER INSERT ON task_comments
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_task_comments();
+CREATE TRIGGER trg_comment_count_update AFTER UPDATE ON task_comments
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION count_task_comments();
+CREATE TRIGGER trg_comment_count_delete AFTER DELETE ON task_comments
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION count_task_comments();
+
+-----------activity----------
+-- Append-only board history, partitioned by month (activity_YYYY_MM). No foreign keys:
+-- entries outlive the tasks and members they mention. Old months are detached and moved
+-- to the dev_archive schema by src/db/activity.py, a metadata-only change.
+CREATE TABLE IF NOT EXISTS activity (
+  id           BIGSERIAL,
+  occurred_at  TIMESTAMP NOT NULL DEFAULT now(),
+  workspace_id INT NOT NULL,
+  board_id     INT,
+  task_id      INT,
+  actor_id     INT,
+  action       TEXT NOT NULL,
+  detail       JSONB NOT NULL DEFAULT '{}',
+  PRIMARY KEY (occurred_at, id)
+) PARTITION BY RANGE (occurred_at);
+
+CREATE INDEX IF NOT EXISTS idx_activity_board ON activity (board_id, occurred_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_task ON activity (task_id, occurred_at DESC, id DESC) WHERE task_id IS NOT NULL;
+
+-- Monthly partitions for `months` months starting with the month of `first_month`;
+-- returns how many were created
+CREATE OR REPLACE FUNCTION ensure_activity_partitions(first_month DATE, months INT) RETURNS INT AS $$
+DECLARE
+  created INT := 0;
+  m DATE;
+BEGIN
+  FOR i IN 0 .. months - 1 LOOP
+    m := date_trunc('month', first_month) + make_interval(months => i);
+    IF to_regclass(format('dev.activity_%s', to_char(m, 'YYYY_MM'))) IS NULL THEN
+      EXECUTE format('CREATE TABLE dev.%I PARTITION OF dev.activity FOR VALUES FROM (%L) TO (%L)',
+                     'activity_' || to_char(m, 'YYYY_MM'), m, m + interval '1 month');
+      created := created + 1;
+    END IF;
+  END LOOP;
+  RETURN created;
+END
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_activity_partitions(now()::date, 3);
+
+-----------reminders----------
+-- Due-soon / overdue notices, one per task, recipient, kind and due date: rescheduling a
+-- task makes it eligible again, rescanning the same window does not
+CREATE TABLE IF NOT EXISTS reminder (
+  id          BIGSERIAL PRIMARY KEY,
+  task_id     INT NOT NULL REFERENCES task(id) ON DELETE CASCADE,
+  member_id   INT NOT NULL REFERENCES member(id) ON DELETE CASCADE,
+  kind        VARCHAR(10) NOT NULL CHECK (kind IN ('due_soon', 'overdue')),
+  due_date    DATE NOT NULL,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  notified_at TIMESTAMPTZ,
+  UNIQUE (task_id, member_id, kind, due_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_reminder_member ON reminder(member_id, id);
+CREATE INDEX IF NOT EXISTS idx_reminder_unsent ON reminder(member_id) WHERE notified_at IS NULL;
+
+-- High-water mark per kind: every due date up to `through` has been scanned
+CREATE TABLE IF NOT EXISTS reminder_scan (
+  kind       VARCHAR(10) PRIMARY KEY,
+  through    DATE NOT NULL,
+  scanned_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Tasks given a due date or a new assignee since the last scan: one may now fall inside an
+-- already scanned window, so the next scan looks at these by id instead of rescanning it.
+-- Queued whatever the date (not only behind the high-water mark) so a scan committing
+-- concurrently cannot miss one
+CREATE TABLE IF NOT EXISTS reminder_recheck (
+  task_id INT PRIMARY KEY
+);
+
+CREATE OR REPLACE FUNCTION recheck_task_reminders() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO dev.reminder_recheck (task_id)
+    SELECT n.id FROM new_rows n WHERE n.due_date <> '9999-12-31'
+    ON CONFLICT DO NOTHING;
+  ELSE
+    INSERT INTO dev.reminder_recheck (task_id)
+    SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id
+    WHERE n.due_date <> '9999-12-31'
+      AND (n.due_date <> o.due_date OR n.assigned_to IS DISTINCT FROM o.assigned_to)
+    ON CONFLICT DO NOTHING;
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_task_reminder_insert AFTER INSERT ON task
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION recheck_task_reminders();
+CREATE TRIGGER trg_task_reminder_update AFTER UPDATE ON task
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION recheck_task_reminders();
\ No newline at end of file
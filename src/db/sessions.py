@@ -0,0 +1,20 @@
+'''
+Session token validation, the query behind every authenticated request.
+
+    member_id = sessions.member_for_token(token)   # None: unknown, revoked or expired
+'''
+from typing import Optional
+
+from . import statements
+from .swen610_db_utils import exec_get_one
+
+SQL_SESSION_MEMBER = """
+    SELECT member_id FROM dev.auth_sessions
+    WHERE token = %(token)s AND NOT revoked AND expires_at > now();
+"""
+SESSION_MEMBER = statements.register("session_member", SQL_SESSION_MEMBER)
+
+
+def member_for_token(token: str) -> Optional[int]:
+    row, _ = exec_get_one(SESSION_MEMBER, {"token": token})
+    return None if row is None else row[0]
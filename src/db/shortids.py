@@ -0,0 +1,44 @@
+'''
+Short ids for workspaces and boards.
+
+New rows get theirs from the assign_short_id trigger in schema.sql. Bulk loads that run
+with triggers disabled (src/db/datagen.py) call backfill() afterwards, which applies
+the same rule in Python: the first SHORT_HASH_LEN hex chars of
+hash_given_entity("<table>:<id>"), lengthened two chars at a time on a collision.
+'''
+from typing import Set
+
+from psycopg2.extras import execute_values
+
+from utils.configs import SHORT_HASH_LEN
+from utils.tools import hash_given_entity
+from .swen610_db_utils import connect
+
+TABLES = ("workspace", "board")
+
+
+def allocate(table: str, row_id: int, taken: Set[str]) -> str:
+    length = SHORT_HASH_LEN
+    while True:
+        short_id = hash_given_entity(f"{table}:{row_id}", length)
+        if short_id not in taken:
+            taken.add(short_id)
+            return short_id
+        length += 2
+
+
+def backfill(table: str, batch_size: int = 10_000) -> int:
+    '''Assign short ids to rows that have none; returns the number of rows updated'''
+    if table not in TABLES:
+        raise ValueError(f"No short ids on {table}")
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute(f"SELECT short_id FROM dev.{table} WHERE short_id IS NOT NULL;")
+    taken = {r[0] for r in cur.fetchall()}
+    cur.execute(f"SELECT id FROM dev.{table} WHERE short_id IS NULL ORDER BY id;")
+    pending = [(row_id, allocate(table, row_id, taken)) for (row_id,) in cur.fetchall()]
+    execute_values(cur, f"UPDATE dev.{table} AS t SET short_id = v.short_id FROM (VALUES %s) AS v(id, short_id) "
+                        f"WHERE t.id = v.id;", pending, page_size=batch_size)
+    conn.commit()
+    conn.close()
+    return len(pending)
@@ -0,0 +1,112 @@
+'''
+Opt-in per-request SQL tracing (TASKMASTER_SQL_TRACE=1).
+
+Every statement run through swen610_db_utils while a trace is active is captured with
+its duration, row count and the first call-site outside src/db. Repeated statement
+shapes within one request are flagged as likely N+1 patterns. Independently of
+tracing, statements slower than TASKMASTER_SLOW_QUERY_MS are logged with their plan.
+'''
+import logging
+import os
+import sys
+from collections import Counter
+from contextvars import ContextVar
+
+from utils import configs
+from utils.metrics import normalize_statement, statement_fingerprint
+
+log = logging.getLogger("taskmaster.sql")
+
+_DB_DIR = os.path.dirname(os.path.abspath(__file__))
+_current = ContextVar("sql_trace", default=None)
+
+
+class Trace:
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.statements = []
+
+    def add(self, sql, seconds, rows, callsite):
+        self.statements.append({
+            "fingerprint": statement_fingerprint(sql),
+            "sql": sql,
+            "ms": seconds * 1000,
+            "rows": rows,
+            "callsite": callsite,
+        })
+
+    @property
+    def total_ms(self) -> float:
+        return sum(s["ms"] for s in self.statements)
+
+    def repeated(self, threshold: int = None) -> dict:
+        '''fingerprint -> count for statement shapes run at least `threshold` times'''
+        threshold = threshold or configs.N_PLUS_ONE_THRESHOLD
+        counts = Counter(s["fingerprint"] for s in self.statements)
+        return {fp: n for fp, n in counts.items() if n >= threshold}
+
+    def summary(self) -> dict:
+        return {
+            "queries": len(self.statements),
+            "time_ms": round(self.total_ms, 2),
+            "n_plus_one": self.repeated(),
+        }
+
+    def header_value(self) -> str:
+        s = self.summary()
+        suspects = ",".join(f"{fp}x{n}" for fp, n in s["n_plus_one"].items())
+        return f"queries={s['queries']}; time_ms={s['time_ms']}; n_plus_one={suspects}"
+
+
+def parse_header(value: str) -> dict:
+    '''Inverse of Trace.header_value, for tests asserting on query counts'''
+    if not value:
+        return None
+    fields = dict(part.strip().split("=", 1) for part in value.split(";"))
+    suspects = {}
+    for item in filter(None, fields.get("n_plus_one", "").split(",")):
+        fp, n = item.rsplit("x", 1)
+        suspects[fp] = int(n)
+    return {"queries": int(fields["queries"]), "time_ms": float(fields["time_ms"]), "n_plus_one": suspects}
+
+
+def start(label: str = ""):
+    trace = Trace(label)
+    return trace, _current.set(trace)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def _callsite() -> str:
+    frame = sys._getframe(2)
+    while frame is not None and os.path.dirname(os.path.abspath(frame.f_code.co_filename)) == _DB_DIR:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.relpath(frame.f_code.co_filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+def record(sql, args, seconds, rows, explain=None):
+    '''Called by the DB helpers after each statement; cheap when nothing is enabled'''
+    trace = _current.get()
+    if trace is not None:
+        trace.add(sql, seconds, rows, _callsite())
+    if configs.SLOW_QUERY_MS and seconds * 1000 >= configs.SLOW_QUERY_MS:
+        plan = explain(sql, args) if explain else None
+        log.warning("slow query %.1f ms [%s] %s\n%s", seconds * 1000, statement_fingerprint(sql),
+                    normalize_statement(sql), plan or "(no plan)")
+
+
+def log_summary(trace):
+    s = trace.summary()
+    log.debug("%s: %d statements, %.1f ms", trace.label, s["queries"], s["time_ms"])
+    for fp, n in s["n_plus_one"].items():
+        example = next(st for st in trace.statements if st["fingerprint"] == fp)
+        log.warning("possible N+1 in %s: %s ran %d times, e.g. from %s: %s",
+                    trace.label, fp, n, example["callsite"], normalize_statement(example["sql"]))
@@ -0,0 +1,130 @@
+'''
+Named hot queries, prepared once per pooled connection and then run with EXECUTE.
+
+A Statement is written like any other query, with %(name)s placeholders, and passed to
+the exec_* helpers in place of the SQL text:
+
+    RESOLVE_PATH = statements.register("resolve_path", SQL_RESOLVE_PATH)
+    row, _ = exec_get_one(RESOLVE_PATH, {"workspace_id": 1, ...})
+
+The first use on a connection sends PREPARE (parse + analyze once); every later call
+sends only EXECUTE with the arguments, so Postgres skips parsing and, once it settles on
+a generic plan, planning too. Connections opened with connect() have no per-connection
+registry and simply run the SQL text.
+
+Postgres re-plans prepared statements after DDL on their tables by itself; a statement
+whose result columns changed (or that was dropped by DISCARD ALL) is prepared again.
+'''
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+
+from utils import metrics
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+STATEMENTS: Dict[str, "Statement"] = {}
+
+# In-process counts per statement: prepares, re-prepares and executions
+_counts: Dict[str, Dict[str, int]] = {}
+_counts_lock = threading.Lock()
+
+
+class Statement:
+    def __init__(self, name: str, sql: str, types: Tuple[str, ...] = None):
+        '''
+        name   prepared statement name, unique per process
+        sql    the query with %(name)s placeholders
+        types  Postgres types of the parameters in first-use order, for placeholders
+               whose type cannot be inferred (e.g. only compared with IS NULL)
+        '''
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid statement name: {name!r}")
+        self.name = name
+        self.sql = sql
+        self.params = tuple(dict.fromkeys(_PLACEHOLDER.findall(sql)))
+        numbered = _PLACEHOLDER.sub(lambda m: f"${self.params.index(m.group(1)) + 1}", sql)
+        body = numbered.strip().rstrip(";").replace("%%", "%")
+        signature = f" ({', '.join(types)})" if types else ""
+        self.prepare_sql = f"PREPARE {name}{signature} AS {body};"
+        arguments = ", ".join(f"%({p})s" for p in self.params)
+        self.execute_sql = f"EXECUTE {name} ({arguments});" if self.params else f"EXECUTE {name};"
+
+    def __repr__(self):
+        return f"Statement({self.name!r})"
+
+
+def register(name: str, sql: str, types: Tuple[str, ...] = None) -> Statement:
+    if name in STATEMENTS and STATEMENTS[name].sql != sql:
+        raise ValueError(f"Statement {name!r} already registered with different SQL")
+    statement = STATEMENTS[name] = Statement(name, sql, types)
+    return statement
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    '''Connection that remembers which registered statements it has prepared'''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def _count(name: str, event: str):
+    with _counts_lock:
+        counts = _counts.setdefault(name, {"prepare": 0, "reprepare": 0, "execute": 0})
+        counts[event] += 1
+    metrics.PREPARED_STATEMENTS.inc(name, event)
+
+
+def _prepare(cur, statement: Statement, event: str = "prepare"):
+    cur.execute(statement.prepare_sql)
+    cur.connection.prepared.add(statement.name)
+    _count(statement.name, event)
+
+
+def execute(cur, statement: Statement, args: Optional[dict]):
+    '''Run `statement` on the cursor's connection, preparing it there first if needed'''
+    prepared = getattr(cur.connection, "prepared", None)
+    if prepared is None or not cur.connection.autocommit:
+        # A failed EXECUTE inside a transaction would abort it: keep to the plain text
+        return cur.execute(statement.sql, args)
+    if statement.name not in prepared:
+        _prepare(cur, statement)
+    try:
+        result = cur.execute(statement.execute_sql, args)
+    except psycopg2.errors.InvalidSqlStatementName:
+        prepared.discard(statement.name)
+        _prepare(cur, statement, "reprepare")
+        result = cur.execute(statement.execute_sql, args)
+    except psycopg2.errors.FeatureNotSupported:
+        # "cached plan must not change result type" after the tables changed shape
+        prepared.discard(statement.name)
+        cur.execute(f"DEALLOCATE {statement.name};")
+        _prepare(cur, statement, "reprepare")
+        result = cur.execute(statement.execute_sql, args)
+    _count(statement.name, "execute")
+    return result
+
+
+SQL_PLAN_CACHE = """
+    SELECT name, generic_plans, custom_plans FROM pg_prepared_statements WHERE name = ANY(%(names)s);
+"""
+
+
+def stats(cur=None) -> dict:
+    '''
+    Per statement: this process's prepare / reprepare / execute counts and, given a
+    cursor, that connection's plan-cache counters (generic vs custom plans built).
+    '''
+    with _counts_lock:
+        result = {name: {"sql": STATEMENTS[name].sql.strip(), **_counts.get(name, {})} for name in STATEMENTS}
+    if cur is not None:
+        cur.execute(SQL_PLAN_CACHE, {"names": list(STATEMENTS)})
+        for name, generic, custom in cur.fetchall():
+            result[name]["plans"] = {"generic": generic, "custom": custom}
+    return result
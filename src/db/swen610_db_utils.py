@@ -1,17 +1,216 @@
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import yaml
 import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 
-def connect():
-    config = {}
+from utils import configs, metrics
+from . import routing, sqltrace, statements
+
+@lru_cache(maxsize=1)
+def _config():
     yml_path = os.path.join(os.path.dirname(__file__), '../../config/db.yml')
     with open(yml_path, 'r') as file:
-        config = yaml.load(file, Loader=yaml.FullLoader)
-    return psycopg2.connect(dbname=config['database'],
-                            user=config['user'],
-                            password=config['password'],
-                            host=config['host'],
-                            port=config['port'])
+        return yaml.load(file, Loader=yaml.FullLoader)
+
+def _connect_args(dbname=None):
+    config = _config()
+    # TASKMASTER_DB_NAME points a process at its own database (e.g. a per-worker test clone)
+    return dict(dbname=dbname or os.getenv('TASKMASTER_DB_NAME') or config['database'],
+                user=config['user'],
+                password=config['password'],
+                host=config['host'],
+                port=config['port'])
+
+def connect(dbname=None):
+    """A new connection the caller owns (transactions, COPY, LISTEN, session settings).
+    Always the primary; pins the current request's reads there too."""
+    routing.mark_write()
+    return psycopg2.connect(**_connect_args(dbname))
+
+PRIMARY = "primary"
+
+_replicas = None
+
+def configure_replicas(entries=None):
+    """(Re)load the replica list: `entries` (dicts of connection settings), else
+    TASKMASTER_DB_REPLICAS ("host:port,..."), else `replicas:` in config/db.yml"""
+    if entries is None:
+        env = os.getenv("TASKMASTER_DB_REPLICAS")
+        if env:
+            entries = [dict(zip(("host", "port"), item.strip().split(":"))) for item in env.split(",") if item.strip()]
+        else:
+            entries = _config().get("replicas") or []
+    replicas = []
+    for i, entry in enumerate(entries):
+        args = {**_connect_args(), **entry, "connect_timeout": configs.DB_REPLICA_CONNECT_TIMEOUT_SECONDS}
+        replicas.append(routing.Replica(f"replica{i}:{args['host']}:{args['port']}", args))
+    global _replicas
+    with _pool_lock:
+        for replica in _replicas or ():
+            pool = _pools.pop(replica.name, None)
+            if pool is not None:
+                pool.closeall()
+        _replicas = replicas
+    return replicas
+
+def replicas():
+    return _replicas if _replicas is not None else configure_replicas()
+
+# The exec_* helpers borrow autocommit connections from per-process pools (the primary's
+# and one per replica) instead of connecting for every statement. A child process drops
+# what it inherited so forked workers never share sockets. psycopg2 keeps DB_POOL_MIN
+# connections open (all opened on creation); connections borrowed beyond that, up to
+# DB_POOL_MAX, are closed again when returned.
+_pool_lock = threading.Lock()
+_pools = {}
+_pools_pid = None
+
+def _target_args(target):
+    args = _connect_args() if target == PRIMARY else next(r.args for r in _replicas if r.name == target)
+    # Pooled connections keep the registered statements they have prepared
+    return {**args, "connection_factory": statements.PreparingConnection}
+
+def _pool(target=PRIMARY):
+    global _pools_pid
+    pool = _pools.get(target) if _pools_pid == os.getpid() else None
+    if pool is None:
+        with _pool_lock:
+            if _pools_pid != os.getpid():
+                _pools.clear()
+                _pools_pid = os.getpid()
+            pool = _pools.get(target)
+            if pool is None:
+                pool = psycopg2.pool.ThreadedConnectionPool(configs.DB_POOL_MIN, configs.DB_POOL_MAX,
+                                                            **_target_args(target))
+                _pools[target] = pool
+    return pool
+
+def _acquire(target=PRIMARY):
+    start = time.perf_counter()
+    try:
+        conn = _pool(target).getconn()
+    except psycopg2.pool.PoolError:
+        # pool exhausted: overflow connection, closed on release
+        conn = psycopg2.connect(**_target_args(target))
+    conn.autocommit = True
+    metrics.DB_CONNECT_LATENCY.observe(time.perf_counter() - start)
+    return conn
+
+def _release(conn, target=PRIMARY):
+    try:
+        _pool(target).putconn(conn, close=bool(conn.closed))
+    except psycopg2.pool.PoolError:
+        conn.close()
+
+@contextmanager
+def _connection(target=PRIMARY):
+    conn = _acquire(target)
+    try:
+        yield conn
+    finally:
+        _release(conn, target)
+
+def warm_pool():
+    """Create this process's pools now, so first requests skip the connection handshakes"""
+    _pool()
+    for replica in replicas():
+        _check_replica(replica)
+
+def close_pool():
+    global _pools_pid
+    with _pool_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+        _pools.clear()
+        _pools_pid = None
+    for pool in pools:
+        pool.closeall()
+
+def _check_replica(replica):
+    try:
+        with _connection(replica.name) as conn:
+            cur = conn.cursor()
+            cur.execute(routing.SQL_REPLICA_LAG)
+            lag = cur.fetchone()[0]
+        if lag is None:
+            raise psycopg2.OperationalError("not a standby (pg_is_in_recovery() is false)")
+        replica.record(lag=float(lag))
+        metrics.DB_REPLICA_LAG.set(replica.name, value=float(lag))
+    except psycopg2.Error as e:
+        replica.record(error=e)
+
+def _pick_replica():
+    """A caught-up replica for this read, or None for the primary. Health is re-checked
+    every DB_REPLICA_CHECK_SECONDS by whichever request gets there first; the others
+    go on with the last result instead of waiting."""
+    if not routing.replicas_allowed() or not replicas():
+        return None
+    now = time.monotonic()
+    for replica in _replicas:
+        if replica.due(now) and replica.lock.acquire(blocking=False):
+            try:
+                _check_replica(replica)
+            finally:
+                replica.lock.release()
+    usable = [r for r in _replicas if r.usable()]
+    return random.choice(usable) if usable else None
+
+def _read(run):
+    """run(conn) on a replica when routing allows, else (or if the replica fails) on the primary"""
+    replica = _pick_replica()
+    if replica is not None:
+        conn = _acquire(replica.name)
+        try:
+            result = run(conn)
+            metrics.DB_READS.inc("replica")
+            return result
+        except psycopg2.OperationalError as e:
+            # Lost connection, or a query cancelled by recovery: retry on the primary
+            if conn.closed:
+                replica.record(error=e)
+        finally:
+            _release(conn, replica.name)
+    with _connection() as conn:
+        result = run(conn)
+    metrics.DB_READS.inc("primary")
+    return result
+
+def _execute(cur, sql, args):
+    start = time.perf_counter()
+    if isinstance(sql, statements.Statement):
+        result = statements.execute(cur, sql, args)
+    else:
+        result = cur.execute(sql, args)
+    return result, start
+
+def _record(sql, args, start, rows):
+    seconds = time.perf_counter() - start
+    sql = getattr(sql, "sql", sql)
+    metrics.observe_query(sql, seconds, rows)
+    sqltrace.record(sql, args, seconds, rows, explain=_explain)
+
+def _explain(sql, args):
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    conn = psycopg2.connect(**_connect_args())  # not connect(): EXPLAIN is no write
+    try:
+        cur = conn.cursor()
+        cur.execute("EXPLAIN " + sql, args)
+        return "\n".join(r[0] for r in cur.fetchall())
+    except psycopg2.Error:
+        return None
+    finally:
+        conn.close()
+
+def prepared_statement_stats():
+    """statements.stats() with the plan-cache counters of one pooled primary connection"""
+    with _connection() as conn:
+        return statements.stats(conn.cursor())
 
 def exec_sql_file(path):
     full_path = os.path.join(os.path.dirname(__file__), f'../../{path}')
@@ -22,28 +221,63 @@ def exec_sql_file(path):
     conn.commit()
     conn.close()
 
+# Pooled connections are in autocommit mode: each call is its own transaction (several
+# statements in one call still run as one), and no BEGIN/ROLLBACK round trips are added.
+# exec_get_one / exec_get_all / exec_get_json are read-only and may run on a replica
+# (src/db/routing.py); anything that writes must use exec_commit*.
+
 def exec_get_one(sql, args={}):
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(sql, args)
-    one = cur.fetchone()
-    conn.close()
-    return one, [getattr(c, "name", c[0]) for c in cur.description]
+    def run(conn):
+        cur = conn.cursor()
+        _, start = _execute(cur, sql, args)
+        one = cur.fetchone()
+        _record(sql, args, start, 0 if one is None else 1)
+        return one, [getattr(c, "name", c[0]) for c in cur.description]
+    return _read(run)
 
 def exec_get_all(sql, args={}):
-    conn = connect()
-    cur = conn.cursor()
-    cur.execute(sql, args)
-    # https://www.psycopg.org/docs/cursor.html#cursor.fetchall
+    def run(conn):
+        cur = conn.cursor()
+        _, start = _execute(cur, sql, args)
+        # https://www.psycopg.org/docs/cursor.html#cursor.fetchall
 
-    list_of_tuples = cur.fetchall()
-    conn.close()
-    return list_of_tuples, [getattr(c, "name", c[0]) for c in cur.description]
+        list_of_tuples = cur.fetchall()
+        _record(sql, args, start, len(list_of_tuples))
+        return list_of_tuples, [getattr(c, "name", c[0]) for c in cur.description]
+    return _read(run)
 
 def exec_commit(sql, args={}):
-    conn = connect()
-    cur = conn.cursor()
-    result = cur.execute(sql, args)
-    conn.commit()
-    conn.close()
-    return result, [getattr(c, "name", c[0]) for c in cur.description]
\ No newline at end of file
+    routing.mark_write()
+    with _connection() as conn:
+        cur = conn.cursor()
+        result, start = _execute(cur, sql, args)
+        _record(sql, args, start, max(cur.rowcount, 0))
+    return result, [getattr(c, "name", c[0]) for c in cur.description]
+
+def exec_commit_returning(sql, args={}):
+    """exec_commit for INSERT/UPDATE ... RETURNING: commits and hands back the first row"""
+    routing.mark_write()
+    with _connection() as conn:
+        cur = conn.cursor()
+        _, start = _execute(cur, sql, args)
+        one = cur.fetchone()
+        _record(sql, args, start, max(cur.rowcount, 0))
+    return one, [getattr(c, "name", c[0]) for c in cur.description]
+
+
+def exec_get_json(sql, args={}):
+    """Run a query whose single column is a JSON document built by Postgres (cast to
+    text) and hand back the raw bytes (in the client encoding, UTF8), skipping any
+    decoding on the Python side."""
+    def run(conn):
+        cur = conn.cursor()
+        # On this cursor only: text columns come back as the bytes psycopg2 received
+        psycopg2.extensions.register_type(psycopg2.extensions.BYTES, cur)
+        _, start = _execute(cur, sql, args)
+        one = cur.fetchone()
+        _record(sql, args, start, 0 if one is None else 1)
+        return one
+    one = _read(run)
+    if one is None or one[0] is None:
+        return None
+    return one[0]
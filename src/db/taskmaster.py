@@ -1,6 +1,10 @@
 import os
 from .swen610_db_utils import exec_sql_file
 
-def rebuild_tables():
+def rebuild_tables(scale=None, seed=0):
     exec_sql_file("src/db/schema.sql")
-    exec_sql_file("src/db/seed.sql")
\ No newline at end of file
+    exec_sql_file("src/db/seed.sql")
+    if scale is not None:
+        # production-scale synthetic data on top of the fixed seed
+        from . import datagen
+        datagen.generate(scale, seed=seed)
\ No newline at end of file
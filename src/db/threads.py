@@ -0,0 +1,75 @@
+'''
+Comment threads, a page at a time.
+
+Pages are cut on (created_on, id) through idx_task_comments_thread, so every page costs
+one short index range scan however long the thread is:
+
+    page = threads.comments_page(task_id, limit=50)                     # newest first
+    older = threads.comments_page(task_id, before=page["older"])        # "load older"
+    newer = threads.comments_page(task_id, after=page["newer"])         # poll for new ones
+
+Comments are always returned newest first. `older` is None once the start of the
+thread is reached; `newer` is always set so a client can keep polling from it.
+'''
+from datetime import datetime
+from typing import Optional
+
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from utils.serialization import rows_to_dicts
+from .swen610_db_utils import exec_get_all
+
+# Same shape as the client's Comment (react-client/src/models/task.ts)
+SQL_COMMENTS_PAGE = """
+    SELECT c.id AS comment_id, m.username AS author, c.message AS content, c.created_on AS timestamp
+    FROM dev.task_comments c
+    LEFT JOIN dev.member m ON m.id = c.author_id
+    WHERE c.task_id = %(task_id)s {keyset}
+    ORDER BY c.created_on {direction}, c.id {direction}
+    LIMIT %(limit)s;
+"""
+
+
+def _key(cursor: str) -> tuple:
+    created_on, comment_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_on), int(comment_id)
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def _cursor(comment: dict) -> str:
+    return encode_cursor(comment["timestamp"], comment["comment_id"])
+
+
+def comments_page(task_id: int, before: Optional[str] = None, after: Optional[str] = None, limit: int = 50) -> dict:
+    '''
+    {"comments", "older", "newer", "has_newer"}: the newest `limit` comments, or those
+    just before / after a cursor. Raises InvalidCursorError for a malformed cursor.
+    '''
+    args = {"task_id": task_id, "limit": limit + 1}
+    if after is not None:
+        args["created_on"], args["id"] = _key(after)
+        keyset, direction = "AND (c.created_on, c.id) > (%(created_on)s, %(id)s)", "ASC"
+    elif before is not None:
+        args["created_on"], args["id"] = _key(before)
+        keyset, direction = "AND (c.created_on, c.id) < (%(created_on)s, %(id)s)", "DESC"
+    else:
+        keyset, direction = "", "DESC"
+
+    rows, columns = exec_get_all(SQL_COMMENTS_PAGE.format(keyset=keyset, direction=direction), args)
+    more = len(rows) > limit
+    comments = rows_to_dicts(rows[:limit], columns)
+    if direction == "ASC":
+        comments.reverse()
+    if not comments:
+        return {"comments": [], "older": None, "newer": after or before, "has_newer": False}
+
+    # `newer` is always returned so clients can poll from it; `older` only when older
+    # comments are known to exist
+    reading_back = direction == "DESC"
+    return {
+        "comments": comments,
+        "older": _cursor(comments[-1]) if (more or not reading_back) else None,
+        "newer": _cursor(comments[0]),
+        "has_newer": (more and not reading_back) or before is not None,
+    }
@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class BatchItem(BaseModel):
+    id: str
+    path: str                   # e.g. "/w/1/b/2?fields=id,title"
+    etag: Optional[str] = None  # the client's cached copy; answered with 304 when unchanged
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
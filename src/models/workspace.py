@@ -8,6 +8,7 @@ class WorkspaceOut(BaseModel):
     id: int
     name: str
     slug: str
+    short_id: Optional[str] = None
     description: Optional[str] = None
     created_on: datetime
     created_by: Optional[int] = None
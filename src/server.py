@@ -1,12 +1,65 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI, HTTPException, Response
-from src.api import members, workspaces, boards, tasks, comments, login, category
+from fastapi.responses import PlainTextResponse
+from src.api import members, workspaces, boards, tasks, comments, login, category, lookup
+from src.api import jobs, bulk, me, threads, activity, batch
 from src.db import swen610_db_utils as db_utils
 from src.db import taskmaster
+from src.db import purge
+from src.db import feeds
+from src.db import invalidation
+from src.api.responses import FastJSONResponse
+from src.api.middleware import (CompressionMiddleware, ConcurrencyLimitMiddleware, ETagMiddleware, MetricsMiddleware,
+                                RateLimitMiddleware, ReadYourWritesMiddleware, SQLTraceMiddleware)
+from utils import configs, metrics
 
 from fastapi.middleware.cors import CORSMiddleware
 
+logger = logging.getLogger("taskmaster.startup")
+
+# Seconds spent in each warm-up step of the last startup, for GET /manage/startup
+STARTUP = {}
+
+
+def warm_up(app: FastAPI):
+    '''
+    Pay the one-off costs before the worker takes traffic instead of on its first
+    requests: DB connections, lookup caches and the route schemas (otherwise built on
+    the first /docs or /openapi.json hit). A failing step is logged, not fatal.
+    '''
+    steps = (
+        ("db_pool", db_utils.warm_pool),
+        ("lookups", feeds.status_ids),
+        ("openapi", app.openapi),
+    )
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("warm-up step %s failed: %r", name, e)
+        STARTUP[name] = round(time.perf_counter() - start, 4)
+    logger.info("warm-up done: %s", STARTUP)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before warm-up fills the caches: subscribing clears them (events may have been missed)
+    invalidation.start()
+    if configs.WARMUP_ENABLED:
+        # On a worker thread, like the sync routes: this also loads anyio's thread
+        # backend and starts the first pool thread, ~20 ms otherwise paid by request one
+        await anyio.to_thread.run_sync(warm_up, app)
+    yield
+    invalidation.stop()
+    db_utils.close_pool()
 
-app = FastAPI()
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",   # Vite default
@@ -15,12 +68,24 @@ origins = [
 ]
 
 
+# Inside the rate limiter, whose token-bucket writes must not pin a client to the primary
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(SQLTraceMiddleware)
+# Inside compression, so the tag is computed over (and 304s skip) the uncompressed body
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(ConcurrencyLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Added last so it wraps everything: the limiters' 429/503 need CORS headers too, or the
+# browser hides them (and Retry-After) from the client behind a network error
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,     # Required for cookies
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],    # response cache; when to retry a 429/503
 )
 
 app.include_router(members.router)
@@ -30,6 +95,13 @@ app.include_router(boards.router)
 app.include_router(tasks.router)
 app.include_router(comments.router)
 app.include_router(category.router)
+app.include_router(lookup.router)
+app.include_router(jobs.router)
+app.include_router(bulk.router)
+app.include_router(me.router)
+app.include_router(threads.router)
+app.include_router(activity.router)
+app.include_router(batch.router)
 
 @app.get("/favicon.ico", include_in_schema=False)
 def favicon_no_content():
@@ -48,6 +120,26 @@ def version():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/manage/startup")
+def startup_timings():
+    return {"warmup": configs.WARMUP_ENABLED, "seconds": STARTUP}
+
+@app.get("/manage/replicas")
+def replica_status():
+    return {"replicas": [r.status() for r in db_utils.replicas()]}
+
+@app.get("/manage/statements")
+def prepared_statements():
+    return {"statements": db_utils.prepared_statement_stats()}
+
+@app.get("/manage/purges")
+def purges_in_progress():
+    return {"purges": purge.PROGRESS}
+
+@app.get("/manage/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # ------ App Setup
 @app.post("/taskmaster/init")
 def init_db():
@@ -0,0 +1,114 @@
+import asyncio
+import unittest
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.api import batch
+from src.api.auth import require_auth
+from src.api.middleware import ETagMiddleware, RateLimitMiddleware
+from utils import configs
+from utils.ratelimit import MemoryBackend
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+    app.include_router(batch.router)
+    app.dependency_overrides[require_auth] = lambda: {"member_id": 1, "token": "t"}
+
+    @app.get("/lookup")
+    def lookup():
+        return {"statuses": ["To Do", "Done"]}
+
+    @app.get("/echo")
+    def echo(q: str, ctx: dict = Depends(require_auth)):
+        return {"q": q, "member_id": ctx["member_id"]}
+
+    @app.get("/boom")
+    def boom():
+        raise ValueError("boom")
+
+    @app.get("/forbidden")
+    def forbidden():
+        raise HTTPException(status_code=403, detail="No access")
+    return app
+
+
+class TestETag(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(_app())
+
+    def test_not_modified(self):
+        first = self.client.get("/lookup")
+        tag = first.headers["etag"]
+        again = self.client.get("/lookup", headers={"If-None-Match": tag})
+        self.assertEqual(304, again.status_code)
+        self.assertEqual(b"", again.content)
+        self.assertEqual(tag, again.headers["etag"])
+        self.assertEqual(200, self.client.get("/lookup", headers={"If-None-Match": 'W/"other"'}).status_code)
+        self.assertNotIn("etag", self.client.get("/forbidden").headers)
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(_app())
+
+    def post(self, *items):
+        return self.client.post("/batch", json={"requests": list(items)})
+
+    def test_responses_in_order_with_etags(self):
+        tag = self.client.get("/lookup").headers["etag"]
+        res = self.post({"id": "a", "path": "/echo?q=x"}, {"id": "b", "path": "/lookup"},
+                        {"id": "c", "path": "/lookup", "etag": tag}, {"id": "d", "path": "/forbidden"},
+                        {"id": "e", "path": "/missing"})
+        self.assertEqual(200, res.status_code)
+        a, b, c, d, e = res.json()["responses"]
+        self.assertEqual(({"q": "x", "member_id": 1}, 200), (a["body"], a["status"]))
+        self.assertEqual((tag, {"statuses": ["To Do", "Done"]}), (b["etag"], b["body"]))
+        self.assertEqual((304, None), (c["status"], c["body"]))
+        self.assertEqual((403, {"detail": "No access"}), (d["status"], d["body"]))
+        self.assertEqual(404, e["status"])
+
+    def test_failed_read_keeps_the_others(self):
+        with self.assertLogs("taskmaster.batch", "ERROR"):
+            res = self.post({"id": "a", "path": "/lookup"}, {"id": "b", "path": "/boom"}, {"id": "c", "path": "/echo?q=y"})
+        self.assertEqual(200, res.status_code)
+        a, b, c = res.json()["responses"]
+        self.assertEqual((200, 500, 200), (a["status"], b["status"], c["status"]))
+        self.assertEqual({"detail": "Internal Server Error"}, b["body"])
+
+    def test_limits(self):
+        self.assertEqual(400, self.post({"id": "a", "path": "/batch"}).status_code)
+        self.assertEqual(400, self.post({"id": "a", "path": "http://elsewhere/lookup"}).status_code)
+        too_many = [{"id": str(i), "path": "/lookup"} for i in range(configs.BATCH_MAX_REQUESTS + 1)]
+        self.assertEqual(400, self.post(*too_many).status_code)
+
+    def test_charged_per_read(self):
+        app = _app()
+        app.add_middleware(RateLimitMiddleware, backend=MemoryBackend(),
+                           limits={"read": (0.01, 5), "auth": (1, 1), "write": (1, 1)})
+        client = TestClient(app)
+        reads = [{"id": str(i), "path": "/lookup"} for i in range(4)]
+        self.assertEqual(200, client.post("/batch", json={"requests": reads}).status_code)
+        res = client.post("/batch", json={"requests": reads})
+        self.assertEqual(429, res.status_code)
+        self.assertIn("retry-after", res.headers)
+
+    def test_bounded_concurrency(self):
+        app, running, peak = _app(), 0, 0
+
+        @app.get("/slow")
+        async def slow():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {}
+
+        reads = [{"id": str(i), "path": "/slow"} for i in range(configs.BATCH_MAX_REQUESTS)]
+        self.assertEqual(200, TestClient(app).post("/batch", json={"requests": reads}).status_code)
+        self.assertEqual(configs.BATCH_MAX_CONCURRENCY, peak)
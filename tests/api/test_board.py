@@ -2,7 +2,7 @@ import json
 import uuid
 import unittest
 from typing import Dict, List
-from tests.test_utils import get_rest_call, post_rest_call, put_rest_call, delete_rest_call
+from tests.test_utils import get_rest_call, post_rest_call, put_rest_call, delete_rest_call, assert_max_queries
 from src.db.swen610_db_utils import connect
 from src.api.auth import get_session_user
 from utils.tools import hash_given_entity
@@ -300,3 +300,18 @@ class TestBoard(unittest.TestCase):
         self.p(f"    => {json.dumps(res, indent=2)}")
         self.assertIn("message", res)
         self.assertEqual(res["message"].lower(), "logged out.")
+
+    # ==========================================================
+    # 9) Query budget for listing boards (SQL tracing only)
+    # ==========================================================
+    def test_09_list_boards_query_budget(self):
+        print("\n[TEST] GET /w/b/me stays within its SQL budget")
+        sid = self.login("alice", "ybg2gpa7YUH-gam*qay")
+        auth = {"Authorization": f"Bearer {sid}"}
+
+        self.step("GET /w/b/me with X-SQL-Trace")
+        trace = assert_max_queries(self, f"{BASE}/w/b/me", max_queries=6, get_header={**JSON_HDR, **auth})
+        self.p(f"    => {trace}")
+
+        res = post_rest_call(self, f"{BASE}/logout", params={}, post_header=auth, expected_code=200)
+        self.assertIn("message", res)
@@ -0,0 +1,62 @@
+import gzip
+import json
+import unittest
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from src.api import middleware
+from src.api.middleware import CompressionMiddleware
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return {"tasks": [{"id": i, "title": f"Task {i}"} for i in range(200)]}
+
+    @app.get("/export.bin")
+    def export():
+        return Response(bytes(2000), media_type="application/octet-stream")
+
+    @app.get("/small")
+    def small():
+        return {"status": "ok"}
+    return app
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(_app())
+
+    def test_gzip_over_threshold(self):
+        res = self.client.get("/big", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual("gzip", res.headers.get("content-encoding"))
+        self.assertEqual(200, len(res.json()["tasks"]))
+        self.assertEqual(res.content, gzip.decompress(self.raw("/big", "gzip")))
+
+    def test_small_body_not_compressed(self):
+        res = self.client.get("/small", headers={"Accept-Encoding": "gzip, br"})
+        self.assertIsNone(res.headers.get("content-encoding"))
+
+    @unittest.skipIf(middleware.brotli is None, "brotli not installed")
+    def test_brotli_preferred(self):
+        res = self.client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual("br", res.headers.get("content-encoding"))
+        self.assertIn("Accept-Encoding", res.headers.get("vary"))
+        self.assertEqual(200, len(json.loads(middleware.brotli.decompress(self.raw("/big", "br")))["tasks"]))
+
+    def test_binary_types_not_compressed(self):
+        for coding in ("gzip", "br"):
+            res = self.client.get("/export.bin", headers={"Accept-Encoding": coding})
+            self.assertIsNone(res.headers.get("content-encoding"))
+            self.assertEqual(2000, len(res.content))
+
+    def raw(self, path: str, coding: str) -> bytes:
+        '''The body as sent, before the client decodes it'''
+        with self.client.stream("GET", path, headers={"Accept-Encoding": coding}) as res:
+            self.assertEqual(coding, res.headers.get("content-encoding"))
+            return b"".join(res.iter_raw())
@@ -0,0 +1,47 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.middleware import ReadYourWritesMiddleware
+from src.db import routing
+from src.db import swen610_db_utils as db_utils
+from utils import configs
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.get("/read")
+    def read():
+        return {"replicas_allowed": routing.replicas_allowed()}
+
+    @app.post("/write")
+    def write():
+        routing.mark_write()
+        return {"replicas_allowed": routing.replicas_allowed()}
+    return app
+
+
+class TestReadYourWrites(unittest.TestCase):
+
+    def setUp(self):
+        # Routing only needs a replica to be configured, not reachable
+        db_utils.configure_replicas([{"host": "127.0.0.1", "port": 1}])
+        self.client = TestClient(_app())
+
+    def tearDown(self):
+        db_utils.configure_replicas()
+
+    def test_write_pins_client_to_primary(self):
+        self.assertTrue(self.client.get("/read").json()["replicas_allowed"])
+        self.assertNotIn(configs.PRIMARY_PIN_COOKIE, self.client.cookies)
+
+        res = self.client.post("/write")
+        self.assertFalse(res.json()["replicas_allowed"])
+        self.assertIn(configs.PRIMARY_PIN_COOKIE, res.cookies)
+
+        self.assertFalse(self.client.get("/read").json()["replicas_allowed"])
+        self.client.cookies.set(configs.PRIMARY_PIN_COOKIE, "0")
+        self.assertTrue(self.client.get("/read").json()["replicas_allowed"])
@@ -0,0 +1,11 @@
+import os
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def worker_database():
+    '''In-process runs get one database per pytest-xdist worker, cloned from the template'''
+    if os.getenv("TASKMASTER_TEST_INPROCESS") == "1":
+        from tests.provisioning import clone_database
+        clone_database()
+    yield
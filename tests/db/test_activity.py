@@ -0,0 +1,97 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+from src.db import activity
+from src.db.swen610_db_utils import connect, exec_get_all, exec_get_one
+from utils import configs
+from utils.pagination import InvalidCursorError
+
+
+def _execute(sql: str, args=None):
+    conn = connect()
+    conn.cursor().execute(sql, args)
+    conn.commit()
+    conn.close()
+
+
+class TestActivity(unittest.TestCase):
+
+    def tearDown(self):
+        activity.flush()
+        _execute("DELETE FROM dev.activity WHERE board_id = 2;")
+
+    def test_batched_records_read_back_newest_first(self):
+        for n in range(5):
+            activity.record("task.moved", 1, 2, task_id=n % 2 + 100, actor_id=1, step=n)
+        self.assertEqual(5, activity.flush())
+        self.assertEqual(0, activity.flush())
+
+        page = activity.feed(2, limit=3)
+        self.assertEqual([4, 3, 2], [a["detail"]["step"] for a in page["activity"]])
+        self.assertEqual("alice", page["activity"][0]["actor"])
+        rest = activity.feed(2, after=page["next"], limit=3)
+        self.assertEqual([1, 0], [a["detail"]["step"] for a in rest["activity"]])
+        self.assertIsNone(rest["next"])
+
+        self.assertEqual([4, 2, 0], [a["detail"]["step"] for a in activity.feed(2, task_id=100)["activity"]])
+        with self.assertRaises(InvalidCursorError):
+            activity.feed(2, after="bogus")
+
+    def test_buffer_is_bounded(self):
+        with mock.patch.object(configs, "ACTIVITY_MAX_BUFFERED", 2):
+            for n in range(3):
+                activity.record("task.moved", 1, 2)
+        self.assertEqual(2, activity.flush())
+
+    def test_rejected_record_does_not_block_the_rest(self):
+        activity.record("task.renamed", 1, 2, name="bad\x00name")
+        activity.record("task.moved", 1, 2, step=1)
+        activity.record("task.moved", 1, 2, step=object())
+        with self.assertLogs("taskmaster.activity", "WARNING"):
+            self.assertEqual(1, activity.flush())
+        self.assertEqual(0, activity.flush())
+        self.assertEqual([{"step": 1}], [a["detail"] for a in activity.feed(2)["activity"]])
+
+    def test_unreachable_database_keeps_the_batch(self):
+        activity.record("task.moved", 1, 2, step=1)
+        with mock.patch.object(activity, "connect", side_effect=activity.psycopg2.OperationalError("down")):
+            with self.assertRaises(activity.psycopg2.OperationalError):
+                activity.flush()
+        self.assertEqual(1, activity.flush())
+
+    def test_feed_skips_old_partitions(self):
+        _execute("SELECT dev.ensure_activity_partitions('2020-01-01', 1);")
+        try:
+            rows, _ = exec_get_all("EXPLAIN " + activity.SQL_FEED.format(task="", keyset=""),
+                                   {"board_id": 2, "since": activity.feed_since(), "limit": 10})
+            plan = "\n".join(line for (line,) in rows)
+            self.assertIn(date.today().strftime("activity_%Y_%m"), plan)
+            self.assertNotIn("activity_2020_01", plan)
+        finally:
+            _execute("DROP TABLE dev.activity_2020_01;")
+
+
+class TestActivityArchive(unittest.TestCase):
+
+    def setUp(self):
+        _execute("SELECT dev.ensure_activity_partitions('2020-01-01', 1);")
+        _execute("INSERT INTO dev.activity (occurred_at, workspace_id, board_id, action) "
+                 "VALUES ('2020-01-15', 1, 2, 'task.created');")
+
+    def tearDown(self):
+        _execute("DROP TABLE IF EXISTS dev.activity_2020_01; DROP SCHEMA IF EXISTS dev_archive CASCADE;")
+
+    def test_old_months_move_to_archive(self):
+        self.assertEqual(["activity_2020_01"], activity.archive())
+        self.assertNotIn("activity_2020_01", activity.partitions())
+        (count,), _ = exec_get_one("SELECT COUNT(*) FROM dev_archive.activity_2020_01;")
+        self.assertEqual(1, count)
+        self.assertEqual([], activity.archive())
+
+    def test_ensure_partitions_is_idempotent(self):
+        activity.ensure_partitions()
+        before = activity.partitions()
+        activity.ensure_partitions()
+        self.assertEqual(before, activity.partitions())
+        self.assertIn(date.today().strftime("activity_%Y_%m"), before)
@@ -0,0 +1,70 @@
+import io
+import unittest
+
+import orjson
+
+from src.db import bulk
+from src.db.swen610_db_utils import connect, exec_get_one
+
+CSV_TASKS = """title,description,points,priority,status,assignee,dueDate,categories
+Write importer,"COPY, then merge",3,high,To Do,alice,2030-01-15,Bug|Feature
+Plain task,,,,,,,
+"""
+
+
+class TestBulk(unittest.TestCase):
+
+    def setUp(self):
+        conn = connect()
+        cur = conn.cursor()
+        cur.execute("INSERT INTO dev.board (workspace_id, title) VALUES (1, 'Bulk') RETURNING id;")
+        self.board_id = cur.fetchone()[0]
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = connect()
+        conn.cursor().execute("DELETE FROM dev.board WHERE id = %s;", (self.board_id,))
+        conn.commit()
+        conn.close()
+
+    def export(self, fmt):
+        return b"".join(bulk.export_tasks(1, self.board_id, fmt, fetch_rows=1)).decode()
+
+    def test_csv_import_then_ndjson_round_trip(self):
+        result = bulk.import_tasks(1, self.board_id, 1, io.StringIO(CSV_TASKS), "csv", chunk_rows=1)
+        self.assertEqual(2, result["imported"])
+
+        tasks = [orjson.loads(line) for line in self.export("ndjson").splitlines()]
+        self.assertEqual(["Write importer", "Plain task"], [t["title"] for t in tasks])
+        self.assertEqual({"points": 3, "priority": "high", "status": "To Do", "assignee": "alice",
+                          "dueDate": "2030-01-15", "categories": ["Bug", "Feature"], "comments": []},
+                         {k: tasks[0][k] for k in ("points", "priority", "status", "assignee", "dueDate",
+                                                   "categories", "comments")})
+
+        # An NDJSON export imports as-is
+        bulk.import_tasks(1, self.board_id, 1, io.StringIO(self.export("ndjson")), "ndjson")
+        row, _ = exec_get_one("SELECT COUNT(*) FROM dev.task WHERE board_id = %s;", (self.board_id,))
+        self.assertEqual(4, row[0])
+        self.assertEqual(5, len(self.export("csv").splitlines()))
+
+    def test_invalid_rows_import_nothing(self):
+        body = "\n".join([
+            '{"title": "ok"}',
+            '{"title": ""}',
+            '{"title": "x", "priority": "urgent"}',
+            'not json',
+            '{"title": "y", "assignee": "nobody"}',
+            '{"title": "z", "categories": 5}',
+            '{"title": "z", "categories": {"Bug": true}}',
+        ])
+        with self.assertRaises(bulk.BulkImportError) as raised:
+            bulk.import_tasks(1, self.board_id, 1, io.StringIO(body), "ndjson")
+        self.assertEqual([2, 3, 4, 6, 7], [e["line"] for e in raised.exception.errors])
+
+        # Unknown assignees are only checked once every row parses
+        with self.assertRaises(bulk.BulkImportError) as raised:
+            bulk.import_tasks(1, self.board_id, 1, io.StringIO('{"title": "y", "assignee": "nobody"}'), "ndjson")
+        self.assertEqual([{"line": 1, "error": "unknown assignee 'nobody'"}], raised.exception.errors)
+        row, _ = exec_get_one("SELECT COUNT(*) FROM dev.task WHERE board_id = %s;", (self.board_id,))
+        self.assertEqual(0, row[0])
@@ -0,0 +1,59 @@
+import unittest
+from src.db import counters
+from src.db.swen610_db_utils import connect, exec_get_one
+
+
+def _run(sql, args=None):
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute(sql, args)
+    row = cur.fetchone() if cur.description else None
+    conn.commit()
+    conn.close()
+    return row
+
+
+class TestCounters(unittest.TestCase):
+
+    def setUp(self):
+        self.board_id = _run("INSERT INTO dev.board (workspace_id, title) VALUES (2, 'Counted') RETURNING id;")[0]
+
+    def tearDown(self):
+        _run("DELETE FROM dev.board WHERE id = %s;", (self.board_id,))
+
+    def board_count(self):
+        return exec_get_one("SELECT board_count FROM dev.workspace WHERE id = 2;")[0][0]
+
+    def test_triggers_track_writes(self):
+        boards = self.board_count()
+        _run("""INSERT INTO dev.task (board_id, workspace_id, title, status_id)
+                SELECT %s, 2, 'task ' || n, CASE WHEN n <= 3 THEN 1 END FROM generate_series(1, 5) n;""",
+             (self.board_id,))
+        self.assertEqual({"To Do": 3, "none": 2}, counters.board_task_counts(self.board_id))
+
+        _run("UPDATE dev.task SET status_id = 3 WHERE board_id = %s AND status_id IS NULL;", (self.board_id,))
+        _run("DELETE FROM dev.task WHERE id = (SELECT MIN(id) FROM dev.task WHERE board_id = %s);", (self.board_id,))
+        self.assertEqual({"To Do": 2, "Completed": 2}, counters.board_task_counts(self.board_id))
+
+        task_id = _run("SELECT MIN(id) FROM dev.task WHERE board_id = %s;", (self.board_id,))[0]
+        _run("""INSERT INTO dev.task_comments (task_id, board_id, workspace_id, message)
+                SELECT %s, %s, 2, 'c' FROM generate_series(1, 3);""", (task_id, self.board_id))
+        _run("DELETE FROM dev.task_comments WHERE id = (SELECT MIN(id) FROM dev.task_comments WHERE task_id = %s);",
+             (task_id,))
+        self.assertEqual(2, exec_get_one("SELECT comment_count FROM dev.task WHERE id = %s;", (task_id,))[0][0])
+
+        _run("UPDATE dev.board SET deleted_at = now() WHERE id = %s;", (self.board_id,))
+        self.assertEqual(boards - 1, self.board_count())
+        _run("UPDATE dev.board SET deleted_at = NULL WHERE id = %s;", (self.board_id,))
+        self.assertEqual(boards, self.board_count())
+        self.assertEqual({"workspace_boards": 0, "board_tasks": 0, "task_comments": 0}, counters.check())
+
+    def test_check_repairs_drift(self):
+        _run("INSERT INTO dev.task (board_id, workspace_id, title) VALUES (%s, 2, 'drifting');", (self.board_id,))
+        _run("UPDATE dev.board_task_count SET tasks = 40 WHERE board_id = %s;", (self.board_id,))
+        _run("UPDATE dev.workspace SET board_count = board_count + 7 WHERE id = 2;")
+
+        self.assertEqual({"workspace_boards": 1, "board_tasks": 1, "task_comments": 0}, counters.check())
+        self.assertEqual({"workspace_boards": 1, "board_tasks": 1, "task_comments": 0}, counters.check(repair=True))
+        self.assertEqual({"none": 1}, counters.board_task_counts(self.board_id))
+        self.assertEqual({"workspace_boards": 0, "board_tasks": 0, "task_comments": 0}, counters.check())
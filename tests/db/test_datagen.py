@@ -0,0 +1,32 @@
+import random
+import unittest
+from unittest import mock
+from src.db import datagen
+
+
+class TestDatagen(unittest.TestCase):
+
+    def test_shape_is_deterministic(self):
+        scale = datagen.Scale(workspaces=10)
+        self.assertEqual(datagen._shape(7, scale, 3), datagen._shape(7, scale, 3))
+        self.assertNotEqual(datagen._shape(7, scale, 3), datagen._shape(8, scale, 3))
+        self.assertGreaterEqual(len(datagen._shape(7, scale, 3)), 1)
+
+    def test_skewed_mean_and_tail(self):
+        rng = random.Random(1)
+        draws = [datagen._skewed(rng, 50) for _ in range(20000)]
+        self.assertAlmostEqual(50, sum(draws) / len(draws), delta=3)
+        self.assertGreater(max(draws), 5 * 50)
+
+    def test_chunks_cover_every_row(self):
+        covered = [n for first, last in datagen._chunks(10, 3) for n in range(first, last)]
+        self.assertEqual(list(range(1, 11)), covered)
+
+    def test_members_independent_of_chunking(self):
+        def rows(chunks):
+            copier = mock.Mock()
+            with mock.patch.object(datagen, "_open_loader", return_value=(mock.Mock(), copier)):
+                for first, last in chunks:
+                    datagen._load_members((7, datagen.Scale(), {"member": 100}, first, last))
+            return [c.args for c in copier.add.call_args_list]
+        self.assertEqual(rows([(1, 11)]), rows(datagen._chunks(10, 3)))
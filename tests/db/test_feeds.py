@@ -0,0 +1,51 @@
+import unittest
+from datetime import date
+
+from src.db import feeds
+from src.db.swen610_db_utils import connect
+
+
+class TestMemberTasks(unittest.TestCase):
+
+    def setUp(self):
+        conn = connect()
+        cur = conn.cursor()
+        # ben (2) is on boards 1 and 2 but not on board 4
+        cur.execute("""INSERT INTO dev.task (board_id, workspace_id, title, assigned_to, status_id, due_date)
+                       SELECT 1, 1, 'feed ' || n, 2, CASE WHEN n % 3 = 0 THEN NULL ELSE n % 3 END,
+                              DATE '2030-01-01' + (n % 4)
+                       FROM generate_series(1, 10) n;""")
+        cur.execute("""INSERT INTO dev.task (board_id, workspace_id, title, assigned_to, due_date)
+                       VALUES (4, 2, 'feed hidden', 2, '2000-01-01');""")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = connect()
+        conn.cursor().execute("DELETE FROM dev.task WHERE title LIKE 'feed %';")
+        conn.commit()
+        conn.close()
+
+    def test_keyset_pages_in_due_order(self):
+        seen, after = [], None
+        while True:
+            rows, cols = feeds.member_tasks(2, after=after, limit=4, fields=("title",))
+            seen.extend(dict(zip(cols, r)) for r in rows)
+            if len(rows) < 4:
+                break
+            after = (seen[-1]["dueDate"], seen[-1]["id"])
+        self.assertEqual(10, len(seen))
+        self.assertNotIn("feed hidden", [t["title"] for t in seen])
+        keys = [(t["dueDate"], t["id"]) for t in seen]
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual({"id", "title", "dueDate", "workspaceId", "boardId", "boardName"}, set(cols))
+
+    def test_status_and_overdue_filters(self):
+        rows, cols = feeds.member_tasks(2, statuses=["To Do", "none"], fields=("status",))
+        self.assertEqual({"To Do", None}, {dict(zip(cols, r))["status"] for r in rows})
+        self.assertEqual(7, len(rows))
+
+        rows, _ = feeds.member_tasks(2, due_before=date(2030, 1, 2))
+        self.assertEqual(2, len(rows))
+        with self.assertRaises(ValueError):
+            feeds.member_tasks(2, statuses=["Someday"])
@@ -0,0 +1,21 @@
+import unittest
+from src.db import fieldsets
+from src.db.fieldsets import TASK_FIELDS, UnknownFieldError
+
+
+class TestFieldSets(unittest.TestCase):
+
+    def test_parse_defaults_and_required(self):
+        self.assertEqual(TASK_FIELDS.default, TASK_FIELDS.parse(None))
+        self.assertEqual(("id", "title", "status"), TASK_FIELDS.parse("title, status,title"))
+        with self.assertRaises(UnknownFieldError):
+            TASK_FIELDS.parse("title,password")
+
+    def test_only_needed_joins(self):
+        fields = TASK_FIELDS.parse("title")
+        self.assertEqual("dev.task t", TASK_FIELDS.from_clause(fields))
+        self.assertIn("dev.task_status ts", TASK_FIELDS.from_clause(TASK_FIELDS.parse("status")))
+
+    def test_board_tasks_sparse(self):
+        _, cols = fieldsets.board_tasks(1, 1, TASK_FIELDS.parse("title,status"))
+        self.assertEqual(["id", "title", "status"], cols)
@@ -0,0 +1,15 @@
+import unittest
+from src.db import hierarchy
+
+
+class TestHierarchy(unittest.TestCase):
+
+    def test_first_failing_level(self):
+        self.assertIsNone(hierarchy.resolve(1))
+        self.assertIsNone(hierarchy.resolve(1, 1))
+        self.assertEqual("workspace", hierarchy.resolve(999999, 1))
+        self.assertEqual("board", hierarchy.resolve(1, 999999, 1))
+        self.assertEqual("task", hierarchy.resolve(1, 1, 999999, 1))
+
+    def test_board_in_other_workspace(self):
+        self.assertEqual("board", hierarchy.resolve(2, 1))
@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from src.db import invalidation, permissions
+from src.db.invalidation import Invalidation
+from src.db.swen610_db_utils import connect, exec_get_one
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# A stand-in API worker: subscribes like the server lifespan does, then answers
+# "which boards can member N see?" from its own cached permission snapshot
+WORKER = """
+import json, sys
+from src.db import invalidation, permissions
+invalidation.start()
+print("ready", flush=True)
+for line in sys.stdin:
+    print(json.dumps(sorted(permissions.snapshot(int(line)).boards)), flush=True)
+"""
+
+
+def member_id(username):
+    row, _ = exec_get_one("SELECT id FROM dev.member WHERE username = %s", (username,))
+    return row[0]
+
+
+def execute(sql, args):
+    conn = connect()
+    conn.cursor().execute(sql, args)
+    conn.commit()
+    conn.close()
+
+
+class TestInvalidation(unittest.TestCase):
+
+    def test_scoped_event_round_trip(self):
+        alice, ben = member_id("alice"), member_id("ben")
+        permissions.PERMISSIONS.clear()
+        permissions.snapshot(alice)
+        permissions.snapshot(ben)
+        event, origin = invalidation.decode(json.dumps({"cache": "permissions", "scope": "board", "key": 3,
+                                                         "origin": "elsewhere:1"}))
+        self.assertEqual(Invalidation("permissions", "board", 3), event)
+        self.assertEqual("elsewhere:1", origin)
+        invalidation.apply(event, source="remote")
+        # Only alice is on board 3
+        self.assertIsNone(permissions.PERMISSIONS.get(alice))
+        self.assertIsNotNone(permissions.PERMISSIONS.get(ben))
+
+
+class TestWorkersAgree(unittest.TestCase):
+
+    def setUp(self):
+        self.ben = member_id("ben")
+        self.workers = [subprocess.Popen([sys.executable, "-c", WORKER], cwd=ROOT, text=True,
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+                        for _ in range(3)]
+        for w in self.workers:
+            self.assertEqual("ready", w.stdout.readline().strip())
+
+    def tearDown(self):
+        execute("INSERT INTO dev.member_board (member_id, board_id, role_id) "
+                "SELECT %(id)s, 2, role_id FROM dev.member_board WHERE member_id = %(id)s AND board_id = 1 "
+                "AND NOT EXISTS (SELECT 1 FROM dev.member_board WHERE member_id = %(id)s AND board_id = 2);",
+                {"id": self.ben})
+        permissions.invalidate_member(self.ben)
+        for w in self.workers:
+            w.stdin.close()
+            w.wait(timeout=10)
+
+    def boards(self):
+        seen = []
+        for w in self.workers:
+            w.stdin.write(f"{self.ben}\n")
+            w.stdin.flush()
+            seen.append(json.loads(w.stdout.readline()))
+        return seen
+
+    def test_membership_change_reaches_every_worker(self):
+        self.assertEqual([[1, 2]] * 3, self.boards())
+
+        execute("DELETE FROM dev.member_board WHERE member_id = %s AND board_id = 2;", (self.ben,))
+        # Cached: without an event every worker keeps serving the old snapshot
+        self.assertEqual([[1, 2]] * 3, self.boards())
+
+        permissions.invalidate_member(self.ben)
+        deadline = time.monotonic() + 5
+        while (seen := self.boards()) != [[1]] * 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual([[1]] * 3, seen)
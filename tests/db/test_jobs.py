@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+from src.db import jobs
+from src.db.swen610_db_utils import connect, exec_commit_returning, exec_get_all
+
+RAN = []
+
+
+@jobs.handler("test_record")
+def _record(payload, job):
+    RAN.append(payload["n"])
+    job.progress(force=True, n=payload["n"])
+
+
+@jobs.handler("test_fail")
+def _fail(payload, job):
+    raise RuntimeError("boom")
+
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        RAN.clear()
+        exec_commit_returning("WITH d AS (DELETE FROM dev.job WHERE kind LIKE 'test\\_%%' RETURNING 1) SELECT COUNT(*) FROM d")
+
+    def worker(self):
+        return jobs.Worker("test", kinds=["test_record", "test_fail"], batch_size=2)
+
+    def test_priority_order_and_status(self):
+        low = jobs.enqueue("test_record", {"n": 1}, priority=200)
+        high = jobs.enqueue("test_record", {"n": 2}, priority=10)
+        later = jobs.enqueue("test_record", {"n": 3}, delay_seconds=3600)
+        self.assertEqual(2, self.worker().run(idle_exit=True))
+        self.assertEqual([2, 1], RAN)
+        self.assertEqual("done", jobs.job_status(high)["status"])
+        self.assertEqual({"n": 1}, jobs.job_status(low)["progress"])
+        self.assertEqual("queued", jobs.job_status(later)["status"])
+
+    def test_lost_worker_requeued_until_attempts_used(self):
+        alive = jobs.enqueue("test_record", {"n": 1})
+        lost = jobs.enqueue("test_record", {"n": 2}, max_attempts=2)
+        exhausted = jobs.enqueue("test_record", {"n": 3}, max_attempts=1)
+        exec_commit_returning("UPDATE dev.job SET status = 'running', attempts = 1, locked_at = now() - interval '1 day' "
+                              "WHERE id = ANY(%s) RETURNING id", ([alive, lost, exhausted],))
+        worker = self.worker()
+        worker.conn = connect()
+        try:
+            # Reporting progress is the heartbeat that keeps a long job claimed
+            jobs.JobContext(alive, "test_record", 1, worker).progress(force=True, step=1)
+            with mock.patch.dict(jobs.PERIODIC, clear=True):
+                worker.schedule_periodic()
+        finally:
+            worker.conn.close()
+        self.assertEqual("running", jobs.job_status(alive)["status"])
+        self.assertEqual("queued", jobs.job_status(lost)["status"])
+        self.assertEqual(("failed", "worker lost"),
+                         (jobs.job_status(exhausted)["status"], jobs.job_status(exhausted)["last_error"]))
+
+    def test_dedupe_key(self):
+        first = jobs.enqueue("test_record", {"n": 1}, dedupe_key="test:once")
+        self.assertIsNotNone(first)
+        self.assertIsNone(jobs.enqueue("test_record", {"n": 1}, dedupe_key="test:once"))
+        self.worker().run(idle_exit=True)
+        self.assertIsNotNone(jobs.enqueue("test_record", {"n": 1}, dedupe_key="test:once"))
+
+    def test_retry_then_fail(self):
+        job_id = jobs.enqueue("test_fail", max_attempts=2)
+        self.worker().run(idle_exit=True)
+        status = jobs.job_status(job_id)
+        self.assertEqual(("queued", 1), (status["status"], status["attempts"]))
+        self.assertIn("boom", status["last_error"])
+
+        exec_commit_returning("UPDATE dev.job SET run_at = now() WHERE id = %s RETURNING id", (job_id,))
+        self.worker().run(idle_exit=True)
+        self.assertEqual("failed", jobs.job_status(job_id)["status"])
+        summary, _ = exec_get_all("SELECT status FROM dev.job WHERE kind = 'test_fail'")
+        self.assertEqual([("failed",)], summary)
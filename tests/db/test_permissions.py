@@ -0,0 +1,29 @@
+import unittest
+from src.db import permissions
+from src.db.swen610_db_utils import exec_get_one
+
+
+class TestPermissions(unittest.TestCase):
+
+    def member_id(self, username):
+        row, _ = exec_get_one("SELECT id FROM dev.member WHERE username = %s", (username,))
+        return row[0]
+
+    def test_snapshot_flags(self):
+        ben = permissions.load_snapshot(self.member_id("ben"))
+        self.assertTrue(ben.can(1))
+        self.assertTrue(ben.can(1, "edit_board"))
+        self.assertFalse(ben.can(1, "delete_board"))
+        self.assertFalse(ben.can(3))
+        self.assertIsNone(ben.board(2, 1))
+
+        admin = permissions.load_snapshot(self.member_id("sys_admin"))
+        self.assertIn("delete_workspace", admin.global_flags)
+
+    def test_snapshot_cached_until_invalidated(self):
+        ben = self.member_id("ben")
+        permissions.invalidate_member(ben)
+        first = permissions.snapshot(ben)
+        self.assertIs(first, permissions.snapshot(ben))
+        permissions.invalidate_board(1)
+        self.assertIsNot(first, permissions.snapshot(ben))
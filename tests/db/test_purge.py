@@ -0,0 +1,46 @@
+import unittest
+from src.db import purge
+from src.db.swen610_db_utils import connect, exec_get_one
+
+
+class TestPurge(unittest.TestCase):
+
+    def setUp(self):
+        conn = connect()
+        cur = conn.cursor()
+        cur.execute("INSERT INTO dev.workspace (name, slug) VALUES ('Purge me', 'purge-me') RETURNING id;")
+        self.workspace_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO dev.board (workspace_id, title) VALUES (%s, 'Doomed') RETURNING id;", (self.workspace_id,))
+        self.board_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO dev.member_workspace (member_id, workspace_id) SELECT id, %s FROM dev.member;",
+                    (self.workspace_id,))
+        cur.execute("""INSERT INTO dev.task (board_id, workspace_id, title)
+                       SELECT %s, %s, 'task ' || n FROM generate_series(1, 25) n;""",
+                    (self.board_id, self.workspace_id))
+        cur.execute("""INSERT INTO dev.task_comments (task_id, board_id, workspace_id, message)
+                       SELECT id, board_id, workspace_id, 'c' FROM dev.task WHERE board_id = %s;""", (self.board_id,))
+        conn.commit()
+        conn.close()
+
+    def test_soft_delete_then_batched_purge(self):
+        self.assertTrue(purge.soft_delete_workspace(self.workspace_id))
+        self.assertFalse(purge.soft_delete_workspace(self.workspace_id))
+
+        # Purging something that was never soft-deleted is a no-op
+        conn = connect()
+        conn.cursor().execute("UPDATE dev.workspace SET deleted_at = NULL WHERE id = %s", (self.workspace_id,))
+        conn.commit()
+        conn.close()
+        self.assertEqual({}, purge.purge_workspace(self.workspace_id)["deleted"])
+        self.assertTrue(purge.soft_delete_workspace(self.workspace_id))
+
+        calls = []
+        result = purge.purge_workspace(self.workspace_id, batch_size=10, progress=lambda t, n: calls.append((t, n)))
+        self.assertTrue(result["done"])
+        self.assertIn(("member_workspace", result["deleted"]["member_workspace"]), calls)
+        self.assertEqual(1, result["deleted"]["workspace"])
+        row, _ = exec_get_one("SELECT COUNT(*) FROM dev.task WHERE workspace_id = %s", (self.workspace_id,))
+        self.assertEqual(0, row[0])
+        row, _ = exec_get_one("SELECT COUNT(*) FROM dev.board WHERE id = %s", (self.board_id,))
+        self.assertEqual(0, row[0])
+        self.assertEqual({}, purge.PROGRESS)
@@ -0,0 +1,91 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+from src.db import reminders
+from src.db.swen610_db_utils import connect, exec_get_all
+from utils import configs
+
+TODAY = date(2030, 1, 10)
+
+
+def _execute(sql: str, args=None):
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute(sql, args)
+    rows = cur.fetchall() if cur.description else None
+    conn.commit()
+    conn.close()
+    return rows
+
+
+class TestReminders(unittest.TestCase):
+
+    def setUp(self):
+        _execute("DELETE FROM dev.reminder; DELETE FROM dev.reminder_scan; DELETE FROM dev.job WHERE kind = 'send_reminders';")
+        rows = _execute("""
+            INSERT INTO dev.task (board_id, workspace_id, title, assigned_to, created_by, due_date, status_id)
+            SELECT 1, 1, title, 2, 1, due::date, (SELECT id FROM dev.task_status WHERE value = status)
+            FROM (VALUES ('today', '2030-01-10', 'To Do'), ('tomorrow', '2030-01-11', 'To Do'),
+                         ('later', '2030-01-12', 'To Do'), ('yesterday', '2030-01-09', 'In Progress'),
+                         ('long ago', '2029-12-01', 'To Do'), ('none', '9999-12-31', 'To Do'),
+                         ('finished', '2030-01-10', 'Completed')) AS t(title, due, status)
+            RETURNING title, id;""")
+        self.tasks = dict(rows)
+        # Pretend these tasks existed before: only due-date windows can find them
+        _execute("DELETE FROM dev.reminder_recheck;")
+
+    def tearDown(self):
+        _execute("DELETE FROM dev.task WHERE id = ANY(%s); DELETE FROM dev.reminder_scan; "
+                 "DELETE FROM dev.reminder_recheck; DELETE FROM dev.job WHERE kind = 'send_reminders';",
+                 (list(self.tasks.values()),))
+
+    def reminded(self):
+        rows, _ = exec_get_all("SELECT t.title, r.kind FROM dev.reminder r JOIN dev.task t ON t.id = r.task_id "
+                               "WHERE r.task_id = ANY(%s) ORDER BY r.id;", (list(self.tasks.values()),))
+        return sorted(rows)
+
+    def test_windows_advance_without_repeats(self):
+        with mock.patch.object(configs, "REMINDER_DUE_SOON_DAYS", 1):
+            reminders.scan(TODAY)
+            self.assertEqual([("today", "due_soon"), ("tomorrow", "due_soon"), ("yesterday", "overdue")],
+                             self.reminded())
+            # Same day again: nothing new
+            self.assertEqual({"due_soon": 0, "overdue": 0}, reminders.scan(TODAY))
+
+            reminders.scan(date(2030, 1, 11))
+            self.assertEqual([("later", "due_soon"), ("today", "due_soon"), ("today", "overdue"),
+                              ("tomorrow", "due_soon"), ("yesterday", "overdue")], self.reminded())
+
+    def test_changed_due_date_inside_scanned_window(self):
+        reminders.scan(TODAY)
+        _execute("UPDATE dev.task SET due_date = '2029-12-20' WHERE id = %s;", (self.tasks["none"],))
+        reminders.scan(TODAY)
+        self.assertIn(("none", "overdue"), self.reminded())
+
+    def test_window_uses_partial_index(self):
+        conn = connect()
+        cur = conn.cursor()
+        cur.execute("SET enable_seqscan = off;")
+        cur.execute("EXPLAIN SELECT id FROM dev.task WHERE due_date > %s AND due_date <= %s "
+                    "AND due_date <> DATE '9999-12-31';", (TODAY, TODAY))
+        plan = "\n".join(line for (line,) in cur.fetchall())
+        conn.close()
+        self.assertIn("idx_task_due", plan)
+
+    def test_one_batch_per_member(self):
+        reminders.scan(TODAY)
+        self.assertEqual([], reminders.queue_deliveries())  # scan queued ben's batch already
+        (payloads,) = _execute("SELECT array_agg(payload) FROM dev.job WHERE kind = 'send_reminders';")[0]
+        self.assertEqual([{"member_id": 2}], payloads)
+
+        with mock.patch.object(reminders, "deliver") as deliver:
+            self.assertEqual(3, reminders.send(2))
+            self.assertEqual(0, reminders.send(2))
+        member_id, batch = deliver.call_args.args
+        self.assertEqual((2, 3), (member_id, len(batch)))
+
+        rows, cols = reminders.member_reminders(2)
+        self.assertEqual({"id", "kind", "dueDate", "taskId", "title", "boardId", "workspaceId", "createdAt"},
+                         set(cols))
+        self.assertEqual(3, len(rows))
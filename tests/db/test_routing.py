@@ -0,0 +1,102 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+import psycopg2
+
+from src.db import routing
+from src.db import swen610_db_utils as db_utils
+from utils import configs
+
+# host:port of a streaming replica of the test database, e.g. started with
+#   pg_basebackup -h localhost -U swen610 -D /tmp/pgreplica -R -X stream
+#   pg_ctl -D /tmp/pgreplica -o "-p 5433" start
+REPLICA = os.getenv("TASKMASTER_TEST_REPLICA")
+
+SQL_WHERE = "SELECT pg_is_in_recovery();"
+
+
+def on_replica() -> bool:
+    (in_recovery,), _ = db_utils.exec_get_one(SQL_WHERE)
+    return in_recovery
+
+
+class TestJSONDocuments(unittest.TestCase):
+
+    def test_document_comes_back_as_bytes(self):
+        doc = db_utils.exec_get_json("SELECT json_build_object('id', %(id)s, 'tags', ARRAY['a'])::text;", {"id": 7})
+        self.assertEqual(b'{"id" : 7, "tags" : ["a"]}', doc)
+        self.assertIsNone(db_utils.exec_get_json("SELECT NULL::text;"))
+        # Other reads still decode text
+        self.assertEqual(("x",), db_utils.exec_get_one("SELECT 'x'::text;")[0])
+
+
+class TestRoutingFallback(unittest.TestCase):
+
+    def tearDown(self):
+        db_utils.configure_replicas()
+
+    def test_unreachable_replica_reads_from_primary(self):
+        replica, = db_utils.configure_replicas([{"host": "127.0.0.1", "port": 1}])
+        with routing.session():
+            self.assertFalse(on_replica())
+        self.assertFalse(replica.healthy)
+        self.assertFalse(replica.status()["usable"])
+
+    def test_primary_is_not_a_replica(self):
+        replica, = db_utils.configure_replicas([{}])
+        with routing.session():
+            self.assertFalse(on_replica())
+        self.assertIn("not a standby", replica.error)
+
+
+@unittest.skipUnless(REPLICA, "set TASKMASTER_TEST_REPLICA=host:port of a streaming replica")
+class TestReplicaRouting(unittest.TestCase):
+
+    def setUp(self):
+        host, port = REPLICA.split(":")
+        self.replica, = db_utils.configure_replicas([{"host": host, "port": port}])
+
+    def tearDown(self):
+        db_utils.configure_replicas()
+
+    def touch(self):
+        db_utils.exec_commit_returning("UPDATE dev.member SET username = username WHERE id = "
+                                       "(SELECT MIN(id) FROM dev.member) RETURNING id;")
+
+    def test_reads_in_a_session_use_the_replica(self):
+        self.assertFalse(on_replica())  # outside a request: primary
+        with routing.session():
+            self.assertTrue(on_replica())
+            self.assertEqual(1, db_utils.exec_get_all("SELECT 1;")[0][0][0])
+        with routing.session(pinned=True):
+            self.assertFalse(on_replica())
+
+    def test_read_your_writes_within_a_session(self):
+        with routing.session():
+            self.assertTrue(on_replica())
+            self.touch()
+            self.assertFalse(on_replica())
+
+    def test_lagging_replica_skipped(self):
+        conn = psycopg2.connect(**self.replica.args)
+        conn.autocommit = True
+        conn.cursor().execute("SELECT pg_wal_replay_pause();")
+        try:
+            self.touch()
+            with mock.patch.object(configs, "DB_REPLICA_MAX_LAG_SECONDS", 0), \
+                    mock.patch.object(configs, "DB_REPLICA_CHECK_SECONDS", 0):
+                # Wait for the write to be received (but not replayed)
+                deadline = time.monotonic() + 5
+                while time.monotonic() < deadline:
+                    db_utils._check_replica(self.replica)
+                    if not self.replica.usable():
+                        break
+                    time.sleep(0.01)
+                with routing.session():
+                    self.assertFalse(on_replica())
+            self.assertGreater(self.replica.lag, 0)
+        finally:
+            conn.cursor().execute("SELECT pg_wal_replay_resume();")
+            conn.close()
@@ -0,0 +1,29 @@
+import unittest
+from src.db import shortids
+from src.db.swen610_db_utils import connect, exec_get_one
+from utils.configs import SHORT_HASH_LEN
+from utils.tools import hash_given_entity
+
+
+class TestShortIds(unittest.TestCase):
+
+    def test_trigger_matches_python(self):
+        row, _ = exec_get_one("SELECT short_id FROM dev.workspace WHERE id = 1")
+        self.assertEqual(hash_given_entity("workspace:1", SHORT_HASH_LEN), row[0])
+
+    def test_collision_lengthens(self):
+        first = hash_given_entity("board:7", SHORT_HASH_LEN)
+        taken = {first}
+        self.assertEqual(hash_given_entity("board:7", SHORT_HASH_LEN + 2), shortids.allocate("board", 7, taken))
+        self.assertEqual(2, len(taken))
+
+    def test_duplicate_slug_gets_suffix(self):
+        conn = connect()
+        try:
+            cur = conn.cursor()
+            cur.execute("INSERT INTO dev.workspace (name, slug) VALUES ('Slug clash', 'acm') RETURNING slug, short_id;")
+            slug, short_id = cur.fetchone()
+            self.assertEqual(f"acm-{short_id}", slug)
+        finally:
+            conn.rollback()
+            conn.close()
@@ -0,0 +1,29 @@
+import unittest
+from src.db import sqltrace
+
+
+class TestSqlTrace(unittest.TestCase):
+
+    def test_repeated_statements_flagged(self):
+        trace, token = sqltrace.start("GET /w/b/me")
+        try:
+            for board_id in range(4):
+                sqltrace.record(f"SELECT * FROM dev.task WHERE board_id = {board_id}", {}, 0.001, 1)
+            sqltrace.record("SELECT 1", {}, 0.001, 1)
+        finally:
+            sqltrace.stop(token)
+
+        self.assertIsNone(sqltrace.current())
+        summary = trace.summary()
+        self.assertEqual(5, summary["queries"])
+        self.assertEqual([4], list(summary["n_plus_one"].values()))
+        self.assertIn("test_sqltrace.py", trace.statements[0]["callsite"])
+
+    def test_header_round_trip(self):
+        trace, token = sqltrace.start()
+        sqltrace.record("SELECT 1", {}, 0.002, 1)
+        sqltrace.stop(token)
+        parsed = sqltrace.parse_header(trace.header_value())
+        self.assertEqual(1, parsed["queries"])
+        self.assertEqual({}, parsed["n_plus_one"])
+        self.assertIsNone(sqltrace.parse_header(None))
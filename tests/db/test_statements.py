@@ -0,0 +1,58 @@
+import unittest
+
+import psycopg2
+
+from src.db import statements
+from src.db import swen610_db_utils as db_utils
+from src.db.swen610_db_utils import exec_get_one
+
+SHAPE = statements.register("test_shape", "SELECT * FROM dev.statement_test WHERE a = %(a)s OR %(a)s IS NULL;",
+                            types=("int",))
+
+
+class TestStatements(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = psycopg2.connect(**db_utils._connect_args(), connection_factory=statements.PreparingConnection)
+        self.conn.autocommit = True
+        self.cur = self.conn.cursor()
+        self.cur.execute("DROP TABLE IF EXISTS dev.statement_test; CREATE TABLE dev.statement_test (a int);"
+                         "INSERT INTO dev.statement_test VALUES (1), (2);")
+
+    def tearDown(self):
+        self.cur.execute("DROP TABLE IF EXISTS dev.statement_test;")
+        self.conn.close()
+
+    def run_shape(self, a):
+        statements.execute(self.cur, SHAPE, {"a": a})
+        return self.cur.fetchall()
+
+    def counts(self):
+        return statements.stats()["test_shape"]
+
+    def test_placeholders_numbered_once_each(self):
+        self.assertEqual(("a",), SHAPE.params)
+        self.assertIn("PREPARE test_shape (int) AS SELECT * FROM dev.statement_test WHERE a = $1 OR $1 IS NULL",
+                      SHAPE.prepare_sql)
+        self.assertEqual("EXECUTE test_shape (%(a)s);", SHAPE.execute_sql)
+
+    def test_prepared_once_per_connection(self):
+        before = self.counts().get("prepare", 0)
+        self.assertEqual([(2,)], self.run_shape(2))
+        self.assertEqual(2, len(self.run_shape(None)))
+        self.assertEqual(before + 1, self.counts()["prepare"])
+        self.assertEqual({"test_shape"}, self.conn.prepared)
+
+    def test_reprepared_after_discard_or_shape_change(self):
+        self.run_shape(1)
+        before = self.counts()["reprepare"]
+        self.cur.execute("DISCARD ALL;")
+        self.assertEqual([(1,)], self.run_shape(1))
+        self.cur.execute("ALTER TABLE dev.statement_test ADD COLUMN b text DEFAULT 'x';")
+        self.assertEqual([(1, "x")], self.run_shape(1))
+        self.assertEqual(before + 2, self.counts()["reprepare"])
+
+    def test_helpers_accept_statements(self):
+        row, columns = exec_get_one(SHAPE, {"a": 2})
+        self.assertEqual(((2,), ["a"]), (row, columns))
+        self.assertIn("plans", db_utils.prepared_statement_stats()["test_shape"])
@@ -0,0 +1,66 @@
+import unittest
+
+from src.db import threads
+from src.db.swen610_db_utils import connect, exec_get_one
+from utils.pagination import InvalidCursorError
+
+
+class TestThreads(unittest.TestCase):
+
+    def setUp(self):
+        conn = connect()
+        cur = conn.cursor()
+        cur.execute("INSERT INTO dev.task (board_id, workspace_id, title) VALUES (1, 1, 'thread') RETURNING id;")
+        self.task_id = cur.fetchone()[0]
+        # Two comments share a timestamp so the id tie-break is exercised
+        cur.execute("""INSERT INTO dev.task_comments (task_id, board_id, workspace_id, author_id, message, created_on)
+                       SELECT %s, 1, 1, 1, 'c' || n, TIMESTAMP '2030-01-01' + make_interval(mins => LEAST(n, 6))
+                       FROM generate_series(1, 7) n;""", (self.task_id,))
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = connect()
+        conn.cursor().execute("DELETE FROM dev.task WHERE id = %s;", (self.task_id,))
+        conn.commit()
+        conn.close()
+
+    def contents(self, page):
+        return [c["content"] for c in page["comments"]]
+
+    def test_load_older_then_poll_newer(self):
+        page = threads.comments_page(self.task_id, limit=3)
+        self.assertEqual(["c7", "c6", "c5"], self.contents(page))
+        self.assertEqual({"comment_id", "author", "content", "timestamp"}, set(page["comments"][0]))
+
+        older = threads.comments_page(self.task_id, before=page["older"], limit=3)
+        self.assertEqual(["c4", "c3", "c2"], self.contents(older))
+        oldest = threads.comments_page(self.task_id, before=older["older"], limit=3)
+        self.assertEqual(["c1"], self.contents(oldest))
+        self.assertIsNone(oldest["older"])
+
+        # Walking forward from the oldest page returns the rest, newest first
+        newer = threads.comments_page(self.task_id, after=oldest["newer"], limit=4)
+        self.assertEqual(["c5", "c4", "c3", "c2"], self.contents(newer))
+        self.assertTrue(newer["has_newer"])
+        rest = threads.comments_page(self.task_id, after=newer["newer"], limit=4)
+        self.assertEqual(["c7", "c6"], self.contents(rest))
+        self.assertFalse(rest["has_newer"])
+        self.assertEqual([], threads.comments_page(self.task_id, after=rest["newer"])["comments"])
+
+        with self.assertRaises(InvalidCursorError):
+            threads.comments_page(self.task_id, before="bogus")
+
+    def test_task_tracks_last_comment(self):
+        (count, last), _ = exec_get_one("SELECT comment_count, last_comment_at::text FROM dev.task WHERE id = %s;",
+                                        (self.task_id,))
+        self.assertEqual((7, "2030-01-01 00:06:00"), (count, last))
+
+        conn = connect()
+        conn.cursor().execute("DELETE FROM dev.task_comments WHERE task_id = %s AND created_on > '2030-01-01 00:04';",
+                              (self.task_id,))
+        conn.commit()
+        conn.close()
+        (count, last), _ = exec_get_one("SELECT comment_count, last_comment_at::text FROM dev.task WHERE id = %s;",
+                                        (self.task_id,))
+        self.assertEqual((4, "2030-01-01 00:04:00"), (count, last))
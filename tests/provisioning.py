@@ -0,0 +1,119 @@
+'''
+Per-worker test databases cloned from a template, and an in-process app client.
+
+schema.sql + seed.sql are loaded once into a template database; every test worker then
+gets its own copy with CREATE DATABASE ... TEMPLATE, which takes milliseconds instead of
+re-running the SQL. The template is rebuilt automatically when either file changes.
+
+    TASKMASTER_TEST_INPROCESS=1 python -m pytest -n auto tests/api
+    TASKMASTER_TEST_INPROCESS=1 python -m unittest -v
+
+With TASKMASTER_TEST_INPROCESS=1 the helpers in tests/test_utils.py send requests to the
+FastAPI app through TestClient instead of a live server on localhost:5001, with the rate
+limiter turned off.
+'''
+import atexit
+import hashlib
+import os
+
+from psycopg2 import sql
+
+from src.db.swen610_db_utils import connect
+
+MAINTENANCE_DB = "postgres"
+TEMPLATE_DB = os.getenv("TASKMASTER_TEMPLATE_DB", "swen610_template")
+SQL_FILES = ("src/db/schema.sql", "src/db/seed.sql")
+TEMPLATE_LOCK_ID = 610_032
+
+_ROOT = os.path.join(os.path.dirname(__file__), "..")
+_client = None
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256()
+    for path in SQL_FILES:
+        with open(os.path.join(_ROOT, path), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _admin():
+    conn = connect(MAINTENANCE_DB)
+    conn.autocommit = True
+    return conn
+
+
+def build_template(force: bool = False) -> str:
+    '''Create (or refresh) the template database; safe to call from concurrent workers'''
+    fingerprint = _fingerprint()
+    conn = _admin()
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s);", (TEMPLATE_LOCK_ID,))
+    try:
+        cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s;",
+                    (TEMPLATE_DB,))
+        row = cur.fetchone()
+        if row is not None and row[0] == fingerprint and not force:
+            return TEMPLATE_DB
+
+        ident = sql.Identifier(TEMPLATE_DB)
+        if row is not None:
+            cur.execute(sql.SQL("ALTER DATABASE {} IS_TEMPLATE false;").format(ident))
+            cur.execute(sql.SQL("DROP DATABASE {};").format(ident))
+        cur.execute(sql.SQL("CREATE DATABASE {};").format(ident))
+
+        tmpl = connect(TEMPLATE_DB)
+        tcur = tmpl.cursor()
+        for path in SQL_FILES:
+            with open(os.path.join(_ROOT, path), "r") as f:
+                tcur.execute(f.read())
+        tmpl.commit()
+        tmpl.close()
+
+        cur.execute(sql.SQL("COMMENT ON DATABASE {} IS {};").format(ident, sql.Literal(fingerprint)))
+        cur.execute(sql.SQL("ALTER DATABASE {} IS_TEMPLATE true;").format(ident))
+        return TEMPLATE_DB
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s);", (TEMPLATE_LOCK_ID,))
+        conn.close()
+
+
+def worker_id() -> str:
+    '''pytest-xdist worker ("gw0", ...) or the process id for plain unittest runs'''
+    return os.getenv("PYTEST_XDIST_WORKER") or f"p{os.getpid()}"
+
+
+def clone_database(name: str = None) -> str:
+    '''Fresh copy of the template for this worker; DB helpers in this process now use it'''
+    build_template()
+    name = name or f"swen610_test_{worker_id()}"
+    conn = _admin()
+    cur = conn.cursor()
+    cur.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE);").format(sql.Identifier(name)))
+    cur.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {};").format(sql.Identifier(name), sql.Identifier(TEMPLATE_DB)))
+    conn.close()
+    os.environ["TASKMASTER_DB_NAME"] = name
+    if not os.getenv("TASKMASTER_KEEP_TEST_DB"):
+        atexit.register(drop_database, name)
+    return name
+
+
+def drop_database(name: str):
+    conn = _admin()
+    conn.cursor().execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE);").format(sql.Identifier(name)))
+    conn.close()
+
+
+def app_client():
+    '''TestClient over src.server.app, bound to this worker's cloned database'''
+    global _client
+    if _client is None:
+        if not os.getenv("TASKMASTER_DB_NAME"):
+            clone_database()
+        from fastapi.testclient import TestClient
+        from src.server import app
+        from utils import configs
+        # Every TestClient request comes from one address: the login bucket would run dry
+        configs.RATE_LIMIT_ENABLED = False
+        _client = TestClient(app)
+    return _client
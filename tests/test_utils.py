@@ -1,11 +1,25 @@
+import os
 import requests
+from src.db.sqltrace import parse_header
+from utils.configs import SQL_TRACE_HEADER
 # The client (unittest) can only contact the server using RESTful API calls
 
+# With TASKMASTER_TEST_INPROCESS=1 the calls go to the app in-process (TestClient)
+# against this worker's own cloned database, see tests/provisioning.py
+
+def _send(method, url, params = None, data = None, headers = {}):
+    if os.getenv('TASKMASTER_TEST_INPROCESS') != '1':
+        return requests.request(method, url, params = params, data = data, headers = headers)
+    from tests.provisioning import app_client
+    if isinstance(data, str):
+        return app_client().request(method, url, params = params, content = data, headers = headers)
+    return app_client().request(method, url, params = params, data = data, headers = headers)
+
 
 # For API calls using GET.  params and header are defaulted to 'empty'
 
 def get_rest_call(test, url, params = {}, get_header = {}, expected_code = 200):
-    response = requests.get(url, params, headers = get_header)
+    response = _send('GET', url, params = params, headers = get_header)
     test.assertEqual(expected_code, response.status_code,
                      f'Response code to {url} not {expected_code}')
     return response.json()
@@ -14,7 +28,7 @@ def get_rest_call(test, url, params = {}, get_header = {}, expected_code = 200):
 
 def post_rest_call(test, url, params = {}, post_header = {},expected_code = 200):
     '''Implements a REST api using the POST verb'''
-    response = requests.post(url, params, headers = post_header)
+    response = _send('POST', url, data = params, headers = post_header)
     test.assertEqual(expected_code, response.status_code,
                      f'Response code to {url} not {expected_code}')
     return response.json()
@@ -23,7 +37,7 @@ def post_rest_call(test, url, params = {}, post_header = {},expected_code = 200)
 
 def put_rest_call(test, url, params = {}, put_header = {},expected_code = 200):
     '''Implements a REST api using the PUT verb'''
-    response = requests.put(url, params, headers = put_header)
+    response = _send('PUT', url, data = params, headers = put_header)
     test.assertEqual(expected_code, response.status_code,
                      f'Response code to {url} not {expected_code}')
     return response.json()
@@ -32,7 +46,21 @@ def put_rest_call(test, url, params = {}, put_header = {},expected_code = 200):
 
 def delete_rest_call(test, url, delete_header={}, expected_code = 200):
     '''Implements a REST api using the DELETE verb'''
-    response = requests.delete(url, headers = delete_header)
+    response = _send('DELETE', url, headers = delete_header)
     test.assertEqual(expected_code, response.status_code,
                      f'Response code to {url} not {expected_code}')
-    return response.json()
\ No newline at end of file
+    return response.json()
+
+# For asserting on the SQL a GET issues.  The server must run with
+# TASKMASTER_SQL_TRACE=1 and TASKMASTER_DEBUG=1, otherwise the test is skipped.
+
+def assert_max_queries(test, url, max_queries, get_header = {}):
+    '''Fails on query-count regressions and on repeated statement shapes (N+1)'''
+    response = _send('GET', url, headers = get_header)
+    trace = parse_header(response.headers.get(SQL_TRACE_HEADER))
+    if trace is None:
+        test.skipTest(f'{SQL_TRACE_HEADER} not returned; start the server with SQL tracing in debug mode')
+    test.assertLessEqual(trace['queries'], max_queries,
+                         f'{url} issued {trace["queries"]} statements, budget is {max_queries}')
+    test.assertEqual({}, trace['n_plus_one'], f'Possible N+1 statements on {url}')
+    return trace
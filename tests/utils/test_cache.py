@@ -0,0 +1,31 @@
+import time
+import unittest
+
+from utils import cache
+from utils.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_expiry_and_lru(self):
+        c = TTLCache("test_expiry", ttl=0.05, maxsize=2)
+        c.set("a", 1)
+        c.set("b", 2)
+        c.get("a")
+        c.set("c", 3)
+        self.assertIsNone(c.get("b"))
+        self.assertEqual(1, c.get("a"))
+        time.sleep(0.06)
+        self.assertIsNone(c.get("a"))
+
+    def test_invalidation_during_load_is_not_overwritten(self):
+        c = cache.register(TTLCache("test_race", ttl=60))
+
+        def loader():
+            cache.invalidate("test_race", "k")
+            return "stale"
+
+        self.assertEqual("stale", c.get_or_load("k", loader))
+        self.assertIsNone(c.get("k"))
+        self.assertEqual("fresh", c.get_or_load("k", lambda: "fresh"))
+        self.assertEqual("fresh", c.get_or_load("k", lambda: "never"))
@@ -0,0 +1,35 @@
+import unittest
+
+from utils.metrics import Counter, Histogram, Registry, normalize_statement, statement_fingerprint
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_renders_cumulative_buckets(self):
+        reg = Registry()
+        hist = reg.register(Histogram("req_seconds", "latency", ("route",), buckets=(0.1, 1.0)))
+        hist.observe(0.05, "/a")
+        hist.observe(0.5, "/a")
+        hist.observe(3.0, "/a")
+        text = reg.render()
+        self.assertIn('req_seconds_bucket{route="/a",le="0.1"} 1', text)
+        self.assertIn('req_seconds_bucket{route="/a",le="1.0"} 2', text)
+        self.assertIn('req_seconds_bucket{route="/a",le="+Inf"} 3', text)
+        self.assertIn('req_seconds_count{route="/a"} 3', text)
+        self.assertIn("# TYPE req_seconds histogram", text)
+
+    def test_counter_labels(self):
+        reg = Registry()
+        cnt = reg.register(Counter("hits_total", "hits", ("status",)))
+        cnt.inc("200")
+        cnt.inc("200")
+        cnt.inc("404")
+        self.assertEqual(2, cnt.value("200"))
+        self.assertIn('hits_total{status="404"} 1', reg.render())
+
+    def test_fingerprint_ignores_literals_and_whitespace(self):
+        a = "SELECT * FROM dev.task WHERE id = 5"
+        b = "SELECT *\n   FROM dev.task\n  WHERE id = 77"
+        self.assertEqual(statement_fingerprint(a), statement_fingerprint(b))
+        self.assertNotEqual(statement_fingerprint(a), statement_fingerprint("SELECT * FROM dev.board WHERE id = 5"))
+        self.assertEqual("SELECT ? WHERE x = ?", normalize_statement("SELECT 'it''s'  WHERE x = 3.5"))
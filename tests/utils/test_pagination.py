@@ -0,0 +1,17 @@
+import unittest
+from datetime import date
+
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class TestCursor(unittest.TestCase):
+
+    def test_round_trip(self):
+        cursor = encode_cursor(date(2030, 1, 15), 42)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(("2030-01-15", 42), decode_cursor(cursor, 2))
+
+    def test_rejects_garbage(self):
+        for bad in ("%%%", encode_cursor(1), "bm90IGpzb24"):
+            with self.assertRaises(InvalidCursorError):
+                decode_cursor(bad, 2)
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.middleware import RateLimitMiddleware
+from utils.ratelimit import Limit, MemoryBackend, client_key, route_class, session_token
+
+TOKENS = {"t1": 1, "t2": 2}
+
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_bucket_refills(self):
+        backend, limit = MemoryBackend(), Limit(rate=2, burst=3)
+        self.assertEqual([True, True, True, False], [backend.take("k", limit, now=0)[0] for _ in range(4)])
+        self.assertEqual((False, 1), backend.take("k", limit, now=0.1))
+        self.assertTrue(backend.take("k", limit, now=1.0)[0])
+        self.assertTrue(backend.take("other", limit, now=0)[0])
+
+    def test_cost(self):
+        backend, limit = MemoryBackend(), Limit(rate=1, burst=5)
+        self.assertEqual((True, 0), backend.take("k", limit, now=0, cost=4))
+        self.assertEqual((False, 3), backend.take("k", limit, now=0, cost=4))
+        self.assertTrue(backend.take("k", limit, now=0)[0])
+
+    def test_keys_and_classes(self):
+        self.assertEqual("auth", route_class("POST", "/login"))
+        self.assertEqual("read", route_class("GET", "/w/b/me"))
+        self.assertEqual("read", route_class("POST", "/batch"))
+        self.assertEqual("write", route_class("PUT", "/w/1/b/1/t/1/update"))
+        self.assertEqual("abc", session_token({"authorization": "Bearer abc"}, {"sid": "x"}, "sid"))
+        self.assertEqual("abc", session_token({}, {"sid": "abc"}, "sid"))
+        self.assertIsNone(session_token({}, {}, "sid"))
+        self.assertEqual("m:7", client_key(7, ("10.0.0.1", 1)))
+        self.assertEqual("ip:10.0.0.1", client_key(None, ("10.0.0.1", 1)))
+
+    def app(self):
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, backend=MemoryBackend(), limits={"read": (0.5, 2), "auth": (1, 1), "write": (1, 1)})
+
+        @app.get("/w/b/me")
+        def boards():
+            return {"boards": []}
+        return TestClient(app)
+
+    @mock.patch("src.api.middleware.member_for_token", TOKENS.get)
+    def test_middleware_returns_429(self):
+        client = self.app()
+        codes = [client.get("/w/b/me", headers={"Authorization": "Bearer t1"}).status_code for _ in range(3)]
+        self.assertEqual([200, 200, 429], codes)
+        res = client.get("/w/b/me", headers={"Authorization": "Bearer t1"})
+        self.assertEqual("2", res.headers["retry-after"])
+        self.assertEqual(200, client.get("/w/b/me", headers={"Authorization": "Bearer t2"}).status_code)
+
+    @mock.patch("src.api.middleware.member_for_token", TOKENS.get)
+    def test_made_up_tokens_share_the_address_bucket(self):
+        client = self.app()
+        codes = [client.get("/w/b/me", headers={"Authorization": f"Bearer junk{i}"}).status_code for i in range(4)]
+        self.assertEqual([200, 200, 429, 429], codes)
+        self.assertEqual(200, client.get("/w/b/me", headers={"Authorization": "Bearer t1"}).status_code)
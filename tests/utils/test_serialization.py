@@ -0,0 +1,34 @@
+import json
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+
+from src.api.responses import rows_response
+from utils.serialization import column_keys, rows_to_dicts, rows_to_json
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_rows_to_dicts(self):
+        rows = [(1, "alice", None), (2, "ben", "Harris")]
+        res = rows_to_dicts(rows, ["id", "username", "last_name"])
+        self.assertEqual([{"id": 1, "username": "alice", "last_name": None},
+                          {"id": 2, "username": "ben", "last_name": "Harris"}], res)
+
+    def test_column_keys_cached(self):
+        column_keys.cache_clear()
+        rows_to_dicts([(1,)], ["id"])
+        rows_to_dicts([(2,)], ["id"])
+        self.assertEqual(1, column_keys.cache_info().hits)
+
+    def test_rows_to_json_matches_default_encoder(self):
+        rows = [(1, datetime(2025, 1, 2, 3, 4, 5), date(9999, 12, 31), Decimal("2.5"))]
+        cols = ["id", "created_on", "due_date", "points"]
+        res = json.loads(rows_to_json(rows, cols))
+        self.assertEqual([{"id": 1, "created_on": "2025-01-02T03:04:05",
+                           "due_date": "9999-12-31", "points": 2.5}], res)
+
+    def test_rows_response_envelope(self):
+        res = rows_response([(1, Decimal("2.5"))], ["id", "points"], key="tasks", status="success", total=1)
+        self.assertEqual({"status": "success", "total": 1, "tasks": [{"id": 1, "points": 2.5}]}, json.loads(res.body))
+        self.assertEqual({"items": []}, json.loads(rows_response([], ["id"]).body))
@@ -0,0 +1,97 @@
+'''
+Small in-process TTL caches with explicit invalidation.
+
+Caches register under a name so invalidation can be driven from anywhere (a router
+after a write, or a cross-process notification) without importing the owner:
+
+    PERMISSIONS = cache.register(TTLCache("permissions", ttl=60))
+    cache.invalidate("permissions", member_id)
+'''
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from utils import metrics
+
+_MISSING = object()
+
+CACHES: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    '''LRU-bounded mapping whose entries expire `ttl` seconds after they were stored'''
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a load that started before one is not stored
+        self._generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                metrics.CACHE_REQUESTS.inc(self.name, "miss")
+                return default
+            self._data.move_to_end(key)
+        metrics.CACHE_REQUESTS.inc(self.name, "hit")
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            generation = self._generation
+            value = loader()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]):
+        with self._lock:
+            self._generation += 1
+            for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def register(cache: TTLCache) -> TTLCache:
+    CACHES[cache.name] = cache
+    return cache
+
+
+def invalidate(name: str, key: Hashable = _MISSING):
+    '''Drop one key (or the whole cache) by cache name; unknown names are ignored'''
+    cache = CACHES.get(name)
+    if cache is None:
+        return
+    if key is _MISSING:
+        cache.clear()
+    else:
+        cache.invalidate(key)
@@ -1,3 +1,5 @@
+import os
+
 from argon2 import PasswordHasher
 
 SESSION_LIFETIME_SECONDS = 1800 
@@ -9,4 +11,83 @@ SHORT_HASH_LEN = 6
 WORKSPACE_ERROR_404_MSG = "Workspace not found"
 BOARD_ERROR_404_MSG = "Board not found in workspace"
 TASK_ERROR_404_MSG = "Task not found on this board/workspace"
-COMMENT_ERROR_404_MSG = "Comment not found for this task"
\ No newline at end of file
+COMMENT_ERROR_404_MSG = "Comment not found for this task"
+
+# SQL tracing (opt-in): per-request statement capture, N+1 detection, slow-query log
+SQL_TRACE_ENABLED = os.getenv("TASKMASTER_SQL_TRACE", "0") == "1"
+DEBUG_MODE = os.getenv("TASKMASTER_DEBUG", "0") == "1"
+SQL_TRACE_HEADER = "X-SQL-Trace"
+SLOW_QUERY_MS = float(os.getenv("TASKMASTER_SLOW_QUERY_MS", "0"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("TASKMASTER_N_PLUS_ONE_THRESHOLD", "3"))
+
+# Response compression: bodies smaller than the threshold are sent as-is
+COMPRESSION_ENABLED = os.getenv("TASKMASTER_COMPRESSION", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.getenv("TASKMASTER_COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("TASKMASTER_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("TASKMASTER_BROTLI_QUALITY", "4"))
+
+# Admission control: per-client token buckets by route class (rate/s, burst) and a global
+# in-flight cap; the postgres backend shares buckets across uvicorn workers
+RATE_LIMIT_ENABLED = os.getenv("TASKMASTER_RATE_LIMIT", "1") == "1"
+RATE_LIMIT_BACKEND = os.getenv("TASKMASTER_RATE_LIMIT_BACKEND", "memory")
+RATE_LIMITS = {
+    "auth": (1, 10),
+    "read": (20, 60),
+    "write": (10, 30),
+}
+RATE_LIMIT_EXEMPT_PATHS = ("/", "/favicon.ico", "/manage/metrics", "/manage/version", "/manage/startup")
+MAX_CONCURRENT_REQUESTS = int(os.getenv("TASKMASTER_MAX_CONCURRENT_REQUESTS", "64"))
+
+# Per-member permission snapshots (src/db/permissions.py); writes invalidate explicitly,
+# the TTL bounds staleness from changes made outside this process
+PERMISSION_CACHE_TTL_SECONDS = float(os.getenv("TASKMASTER_PERMISSION_CACHE_TTL", "60"))
+PERMISSION_CACHE_SIZE = 10_000
+
+# Background jobs (src/db/jobs.py)
+JOB_WORKERS = int(os.getenv("TASKMASTER_JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("TASKMASTER_JOB_POLL_INTERVAL", "5"))
+JOB_VISIBILITY_TIMEOUT_SECONDS = 900
+JOB_MAX_BACKOFF_SECONDS = 600
+JOB_PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Connection pool behind the exec_* helpers (per process): DB_POOL_MIN connections are
+# opened at startup and kept; bursts beyond that open short-lived ones, and past
+# DB_POOL_MAX every extra call connects on its own
+DB_POOL_MIN = int(os.getenv("TASKMASTER_DB_POOL_MIN", "8"))
+DB_POOL_MAX = int(os.getenv("TASKMASTER_DB_POOL_MAX", "32"))
+
+# Read replicas (src/db/routing.py): request reads skip a replica that is down or more
+# than DB_REPLICA_MAX_LAG_SECONDS behind; a client that wrote reads from the primary
+# for DB_READ_YOUR_WRITES_SECONDS (kept longer than the lag allowed)
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("TASKMASTER_DB_REPLICA_MAX_LAG", "2"))
+DB_REPLICA_CHECK_SECONDS = 5
+DB_REPLICA_CONNECT_TIMEOUT_SECONDS = 2
+DB_READ_YOUR_WRITES_SECONDS = int(os.getenv("TASKMASTER_READ_YOUR_WRITES", "5"))
+PRIMARY_PIN_COOKIE = "tm_primary"
+
+# Startup warm-up in src/server.py (pool, lookup caches, OpenAPI schema)
+WARMUP_ENABLED = os.getenv("TASKMASTER_WARMUP", "1") == "1"
+
+# Activity log (src/db/activity.py): buffered records are written in batches of up to
+# ACTIVITY_BATCH_SIZE at least every ACTIVITY_FLUSH_SECONDS; feeds read the last
+# ACTIVITY_FEED_MONTHS monthly partitions; older than ACTIVITY_RETENTION_MONTHS is archived
+ACTIVITY_BATCH_SIZE = 500
+ACTIVITY_FLUSH_SECONDS = 1.0
+ACTIVITY_MAX_BUFFERED = 50_000
+ACTIVITY_FEED_MONTHS = 3
+ACTIVITY_PARTITIONS_AHEAD = 2
+ACTIVITY_RETENTION_MONTHS = int(os.getenv("TASKMASTER_ACTIVITY_RETENTION_MONTHS", "12"))
+
+# Due-date reminders (src/db/reminders.py): due_soon covers tasks due within
+# REMINDER_DUE_SOON_DAYS days; the first scan also picks up tasks that went overdue in the
+# last REMINDER_CATCHUP_DAYS; a member's new reminders go out together, one batch per
+# REMINDER_BATCH_DELAY_SECONDS
+REMINDER_DUE_SOON_DAYS = int(os.getenv("TASKMASTER_REMINDER_DUE_SOON_DAYS", "1"))
+REMINDER_SCAN_SECONDS = 300
+REMINDER_CATCHUP_DAYS = 7
+REMINDER_BATCH_DELAY_SECONDS = 60
+REMINDER_DONE_STATUSES = ("completed",)
+
+# POST /batch (src/api/batch.py): most GETs one call may carry, and how many of them run at once
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_CONCURRENCY = 4
\ No newline at end of file
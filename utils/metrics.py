@@ -0,0 +1,187 @@
+import re
+import threading
+from functools import lru_cache
+
+from utils.tools import hash_given_entity
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_FINGERPRINT_LEN = 12
+
+
+def _fmt_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_one(labels, value))
+        return lines
+
+    def _render_one(self, labels, value) -> list:
+        return [f"{self.name}{_fmt_labels(self.labelnames, labels)} {value}"]
+
+    def value(self, *labels):
+        return self._values.get(labels)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_one(self, labels, state) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state[0]):
+            cumulative += count
+            le = _fmt_labels(self.labelnames, labels, f'le="{bound}"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        inf = _fmt_labels(self.labelnames, labels, 'le="+Inf"')
+        lines.append(f"{self.name}_bucket{inf} {state[2]}")
+        lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {state[1]}")
+        lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {state[2]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "taskmaster_http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "taskmaster_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "taskmaster_http_requests_in_flight", "HTTP requests currently being served"))
+HTTP_SQL_STATEMENTS = REGISTRY.register(Histogram(
+    "taskmaster_http_sql_statements", "SQL statements issued per request (SQL tracing only)", ("route",),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100)))
+HTTP_REJECTED = REGISTRY.register(Counter(
+    "taskmaster_http_rejected_total", "Requests shed by admission control", ("reason", "route_class")))
+BATCH_SUBREQUESTS = REGISTRY.register(Counter(
+    "taskmaster_batch_subrequests_total", "GETs served inside POST /batch calls", ("route", "status")))
+
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    "taskmaster_db_query_duration_seconds", "SQL statement latency by statement fingerprint", ("fingerprint",)))
+DB_ROWS = REGISTRY.register(Counter(
+    "taskmaster_db_rows_total", "Rows returned or affected by statement fingerprint", ("fingerprint",)))
+DB_STATEMENTS = REGISTRY.register(Gauge(
+    "taskmaster_db_statement_info", "Normalized SQL text behind each fingerprint", ("fingerprint", "statement")))
+DB_CONNECT_LATENCY = REGISTRY.register(Histogram(
+    "taskmaster_db_connection_acquire_seconds", "Time spent acquiring a DB connection"))
+PREPARED_STATEMENTS = REGISTRY.register(Counter(
+    "taskmaster_db_prepared_statements_total", "Registered statement prepares, re-prepares and executions",
+    ("statement", "event")))
+DB_READS = REGISTRY.register(Counter(
+    "taskmaster_db_reads_total", "Read-only helper calls by where they ran", ("target",)))
+DB_REPLICA_LAG = REGISTRY.register(Gauge(
+    "taskmaster_db_replica_lag_seconds", "Replay lag at the last health check", ("replica",)))
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "taskmaster_cache_requests_total", "In-process cache lookups by cache and result", ("cache", "result")))
+CACHE_INVALIDATIONS = REGISTRY.register(Counter(
+    "taskmaster_cache_invalidations_total", "Cache invalidation events applied, local or from another process",
+    ("cache", "source")))
+COUNTER_DRIFT = REGISTRY.register(Counter(
+    "taskmaster_counter_drift_rows_total", "Denormalized counter rows found wrong by counters_check", ("counter",)))
+ACTIVITY_EVENTS = REGISTRY.register(Counter(
+    "taskmaster_activity_records_total", "Activity log records written or dropped (buffer full, or rejected by the database)", ("result",)))
+REMINDERS = REGISTRY.register(Counter(
+    "taskmaster_reminders_total", "Due-date reminders created by the scan and sent to members", ("kind", "event")))
+BULK_ROWS = REGISTRY.register(Counter(
+    "taskmaster_bulk_rows_total", "Task rows moved by bulk import/export", ("direction", "format")))
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def statement_fingerprint(sql: str) -> str:
+    '''Short, stable id for a statement shape (literals and whitespace normalized)'''
+    normalized = normalize_statement(sql)
+    fingerprint = hash_given_entity(normalized, SQL_FINGERPRINT_LEN)
+    DB_STATEMENTS.set(fingerprint, normalized[:200], value=1)
+    return fingerprint
+
+
+def normalize_statement(sql: str) -> str:
+    return _WHITESPACE.sub(" ", _LITERALS.sub("?", sql)).strip()
+
+
+def observe_query(sql: str, seconds: float, rows: int):
+    fingerprint = statement_fingerprint(sql)
+    DB_QUERY_LATENCY.observe(seconds, fingerprint)
+    if rows:
+        DB_ROWS.inc(fingerprint, amount=rows)
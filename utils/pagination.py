@@ -0,0 +1,43 @@
+'''
+Opaque cursors for keyset pagination.
+
+A page ends at the sort key of its last row; the next page asks for rows after that key
+(`WHERE (due_date, id) > (%s, %s)`), which an index on the same columns answers without
+skipping over earlier pages the way OFFSET does:
+
+    rows = fetch(after=page.after, limit=page.limit + 1)
+    next_cursor = encode_cursor(last["dueDate"], last["id"]) if len(rows) > page.limit else None
+'''
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import orjson
+
+from utils.serialization import dumps
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Page:
+    after: Optional[tuple]      # decoded cursor values, None for the first page
+    limit: int
+
+
+def encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(dumps(list(values))).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple:
+    '''The `size` values encoded in `cursor`; InvalidCursorError for anything else'''
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor")
+    return tuple(values)
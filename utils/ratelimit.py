@@ -0,0 +1,78 @@
+'''
+Token buckets for per-client rate limiting.
+
+A bucket holds up to `burst` tokens and refills at `rate` tokens per second; each request
+takes one, and POST /batch one per GET it carries. Buckets are keyed by
+"<route class>:<client>", where the client is the member behind a valid session token and
+the peer address otherwise, so made-up tokens all land in their sender's bucket.
+'''
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float   # tokens per second
+    burst: int    # bucket capacity
+
+
+def route_class(method: str, path: str) -> str:
+    '''auth (login/logout/sign-up), read (GET/HEAD, and POST /batch of GETs) or write'''
+    if path in ("/login", "/logout") or (method == "POST" and path == "/members"):
+        return "auth"
+    if method in ("GET", "HEAD") or (method == "POST" and path == "/batch"):
+        return "read"
+    return "write"
+
+
+def session_token(headers, cookies: Dict[str, str], cookie_name: str) -> Optional[str]:
+    '''Same token sources as require_auth: Bearer, X-Session, then the session cookie'''
+    auth = headers.get("authorization", "")
+    return (auth[7:] if auth[:7].lower() == "bearer " else headers.get("x-session") or cookies.get(cookie_name)) or None
+
+
+def client_key(member_id: Optional[int], peer: Optional[Tuple[str, int]]) -> str:
+    '''m:<member id> for a request with a valid session, else ip:<peer address>'''
+    if member_id is not None:
+        return f"m:{member_id}"
+    return "ip:" + (peer[0] if peer else "unknown")
+
+
+def retry_after(tokens: float, rate: float, cost: int = 1) -> int:
+    '''Whole seconds until the bucket holds `cost` tokens again'''
+    return max(1, math.ceil((cost - tokens) / rate))
+
+
+class MemoryBackend:
+    '''Buckets in this process; limits are per uvicorn worker'''
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, now: float = None, cost: int = 1) -> Tuple[bool, int]:
+        '''(allowed, retry-after seconds); takes `cost` tokens, or none if the bucket holds fewer'''
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._evict(now, limit)
+                bucket = self._buckets[key] = [float(limit.burst), now]
+            tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return True, 0
+            bucket[0] = tokens
+            return False, retry_after(tokens, limit.rate, cost)
+
+    def _evict(self, now: float, limit: Limit):
+        '''Drop buckets that have refilled completely; they carry no state worth keeping'''
+        full = [k for k, (tokens, ts) in self._buckets.items() if tokens + (now - ts) * limit.rate >= limit.burst]
+        for k in full or list(self._buckets)[: len(self._buckets) // 10]:
+            del self._buckets[k]
@@ -0,0 +1,37 @@
+import sys
+from decimal import Decimal
+from functools import lru_cache
+
+import orjson
+
+
+@lru_cache(maxsize=512)
+def column_keys(columns: tuple) -> tuple:
+    '''Interned keys for a cursor's column names, computed once per distinct column list'''
+    return tuple(sys.intern(str(c)) for c in columns)
+
+
+def rows_to_dicts(rows, columns) -> list:
+    '''Zip DB tuples with their column names without going through Pydantic models'''
+    keys = column_keys(tuple(columns))
+    out = [None] * len(rows)
+    for i, row in enumerate(rows):
+        out[i] = dict(zip(keys, row))
+    return out
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def rows_to_json(rows, columns) -> bytes:
+    '''DB tuples straight to a JSON array of objects'''
+    return dumps(rows_to_dicts(rows, columns))
@@ -1,7 +1,13 @@
 import hashlib
+from functools import lru_cache
+
+@lru_cache(maxsize=4096)
+def _sha256_hex(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
 
 def hash_given_entity(root: int, num_char : int = -1) -> str:
-    gen_hash = hashlib.sha256(str(root).encode()).hexdigest()
+    # Memoized on str(root), so any root type works and hot callers skip the digest
+    gen_hash = _sha256_hex(str(root))
     if num_char is None or num_char < 0:
         return gen_hash
     return gen_hash[:num_char]
\ No newline at end of file